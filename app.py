@@ -1,7 +1,8 @@
 import pandas as pd
 import os
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Callable, Optional
 import streamlit as st
 
 # Diagnostic Print for Streamlit Cloud Logs (Detecting stale code)
@@ -14,34 +15,54 @@ if root_path not in sys.path:
     sys.path.insert(0, root_path)
 
 # Internal Imports
-from src.config.constants import APP_TITLE, APP_ICON, DATA_DIR, APP_SUBTITLE_TEMPLATE
+from src.config.constants import APP_TITLE, APP_ICON, DATA_DIR, APP_SUBTITLE_TEMPLATE, ANALYSIS_HISTORY_DAYS
 from src.views.styles import apply_custom_styles
 from src.views.sidebar import render_sidebar
 from src.views.dashboard import render_dashboard
 from src.services.scraper import TrustpilotScraper
+from src.services.crawl_scheduler import CrawlScheduler
+from src.services.pipeline import StreamingAnalysisPipeline
 from src.services.preprocessor import SpanishTextPreprocessor
+from src.services.feature_cache import FeatureCache
 from src.services.analyzer import SentimentAnalyzerES
-from src.services.storage import ReviewRepository
+from src.services.storage import get_repository
+from src.services.doc_frequency import global_document_frequencies
 
 # --- Optimized Service Helpers with Caching ---
 # Removing cache for pipeline to ensure latest data is saved/loaded
 # caching should happen at the data loading level if needed, but for now we want fresh save
-def run_analysis_pipeline(domain: str, max_rev: int):
-    """Pipeline with Persistence: Scrape -> Save -> Load History -> Analyze."""
-    repo = ReviewRepository()
+def run_analysis_pipeline(domain: str, max_rev: int, df_new: pd.DataFrame = None,
+                          history_days: int = ANALYSIS_HISTORY_DAYS, stream: bool = False,
+                          on_batch: Optional[Callable[[pd.DataFrame], None]] = None,
+                          scraper: Optional[TrustpilotScraper] = None):
+    """Pipeline with Persistence: Scrape -> Save -> Load History -> Analyze.
+    `df_new` lets the caller pass reviews already fetched by the CrawlScheduler.
+    `history_days` limits the analysed history to the last N days (read by the storage backend).
+    `stream=True` scrapes through the StreamingAnalysisPipeline: every page is saved, preprocessed
+    and partially analyzed while the crawl goes on, and handed to `on_batch` as it arrives."""
+    repo = get_repository()
+    scraper = scraper or TrustpilotScraper(domain)
     
-    # 1. Scraping (Try to get new data)
-    scraper = TrustpilotScraper(domain)
-    df_new = scraper.scrape_reviews(max_reviews=max_rev)
-    
-    # 2. Persistence (Save new data)
+    # 1-2. Scraping (Only what is newer than the stored high-water mark) + Persistence
     new_count = 0
-    if not df_new.empty:
-        new_count = repo.save_reviews(domain, df_new)
+    if df_new is None and stream:
+        # Each batch is saved by the scrape stage, so the history below already includes it
+        pipeline = StreamingAnalysisPipeline(domain, max_reviews=max_rev, since=repo.get_high_water_mark(domain),
+                                             scraper=scraper, repository=repo)
+        for df_batch in pipeline.run():
+            new_count += len(df_batch)
+            if on_batch:
+                on_batch(df_batch)
+    else:
+        if df_new is None:
+            df_new = scraper.scrape_reviews(max_reviews=max_rev, since=repo.get_high_water_mark(domain))
+        if not df_new.empty:
+            new_count = repo.save_reviews(domain, df_new)
         
     # 3. Load Cumulative History (The "Learning" Step)
-    # We analyze the full history, not just the new batch
-    df_history = repo.load_history(domain)
+    # We analyze the full history (or its last `history_days`), not just the new batch
+    since = (datetime.now() - timedelta(days=history_days)).strftime("%Y-%m-%d") if history_days else None
+    df_history = repo.load_history(domain, since=since)
     
     if df_history.empty:
         return None
@@ -49,9 +70,9 @@ def run_analysis_pipeline(domain: str, max_rev: int):
     # 4. Preprocessing (Dynamic Noise Filtering)
     # Apply to full history
     preprocessor = SpanishTextPreprocessor()
-    # We re-process everything to ensure consistency (or we could store processed)
-    # For now, re-processing ensures latest stopwords/logic are applied
-    processed_results = [preprocessor.process_pipeline(text, domain=domain) for text in df_history['text']]
+    # Only new reviews (or entries invalidated by a preprocessor/stopword change) are processed;
+    # the rest comes from the feature cache
+    processed_results = FeatureCache().process(preprocessor, list(df_history['text']), domain=domain)
     df_proc = pd.DataFrame(processed_results)
     
     # Merge results
@@ -79,14 +100,31 @@ def run_analysis_pipeline(domain: str, max_rev: int):
     # Note: analyze_batch already uses the input df to build the index.
     # If we want to add *extra* context from other domains, we pass it as 'global_corpus'.
     # Let's try to get a broader context if available.
-    extra_context = repo.get_global_corpus()
-    # Filter out texts already in df_merged to avoid double counting if we were strict, 
-    # but InvertedIndex with negative IDs handles separation.
+    # The corpus statistics come from the persisted document-frequency table (kept up to date
+    # by save_reviews), so the global IDF no longer re-tokenizes every stored review.
+    doc_frequencies = global_document_frequencies(repo, analyzer.preprocessor)
     
-    df_final = analyzer.analyze_batch(df_merged, global_corpus=extra_context)
+    df_final = analyzer.analyze_batch(df_merged, doc_frequencies=doc_frequencies)
     
     return df_final
 
+def make_stream_progress(domain: str, placeholder):
+    """on_batch callback of the streaming mode: running totals of the pages analyzed so far."""
+    totals = {'reviews': 0, 'score': 0.0, 'categories': {}}
+
+    def on_batch(df_batch: pd.DataFrame):
+        totals['reviews'] += len(df_batch)
+        totals['score'] += float(df_batch['rating_score'].sum())
+        for category, count in df_batch['categoria_predom'].value_counts().items():
+            totals['categories'][category] = totals['categories'].get(category, 0) + int(count)
+        top = sorted(totals['categories'].items(), key=lambda kv: -kv[1])[:3]
+        placeholder.caption(
+            f"⚡ {domain}: {totals['reviews']} reseñas nuevas analizadas · "
+            f"puntuación media {totals['score'] / totals['reviews']:+.2f} · "
+            f"temas: {', '.join(f'{c} ({n})' for c, n in top) or '—'}"
+        )
+    return on_batch
+
 # Session State Initialization
 if 'df' not in st.session_state:
     st.session_state.df = pd.DataFrame()
@@ -103,12 +141,24 @@ def main():
     apply_custom_styles()
     
     # Sidebar Navigation & Controls
-    domain, max_rev, analyze_clicked, compare_mode, compare_domain = render_sidebar()
+    domain, max_rev, analyze_clicked, compare_mode, compare_domain, stream_mode = render_sidebar()
     
     # Analysis Execution
     if analyze_clicked:
         with st.spinner(f"🚀 Analizando {domain}..."):
-            result_df = run_analysis_pipeline(domain, max_rev)
+            crawl_domains = [domain] + ([compare_domain] if compare_mode and compare_domain else [])
+            if stream_mode:
+                # Each brand streams page by page (one after the other) with live progress
+                scraped, scrapers, progress = {}, {d: TrustpilotScraper(d) for d in crawl_domains}, st.empty()
+                stream_kwargs = lambda d: {'stream': True, 'scraper': scrapers[d],
+                                           'on_batch': make_stream_progress(d, progress)}
+            else:
+                # Both brands are crawled together over one worker pool
+                scheduler = CrawlScheduler(crawl_domains, max_reviews=max_rev, repository=get_repository())
+                scraped = scheduler.run()
+                st.session_state.scrape_metrics = {d: m.summary() for d, m in scheduler.metrics.items()}
+                stream_kwargs = lambda d: {}
+            result_df = run_analysis_pipeline(domain, max_rev, df_new=scraped.get(domain), **stream_kwargs(domain))
             if result_df is not None:
                 st.session_state.df = result_df
                 st.session_state.analyzed_domain = domain
@@ -117,10 +167,15 @@ def main():
                 # Comparison mode
                 if compare_mode and compare_domain:
                     with st.spinner(f"⚔️ Comparando con {compare_domain}..."):
-                        st.session_state.df_comp = run_analysis_pipeline(compare_domain, max_rev)
+                        st.session_state.df_comp = run_analysis_pipeline(compare_domain, max_rev, df_new=scraped.get(compare_domain),
+                                                                         **stream_kwargs(compare_domain))
                         st.session_state.compare_domain_name = compare_domain
                 else:
                     st.session_state.df_comp = pd.DataFrame()
+
+                if stream_mode:
+                    progress.empty()
+                    st.session_state.scrape_metrics = {d: s.metrics.summary() for d, s in scrapers.items()}
                     
                 st.success(f"✅ Análisis completado!")
             else:
@@ -0,0 +1,78 @@
+"""
+Synthetic Trustpilot listing pages for offline benchmarks.
+The markup mimics the real layout (navigation noise + review cards) and uses the
+*fallback* selector variants so the extraction plan has something to learn.
+"""
+import json
+import random
+from datetime import datetime, timedelta
+
+USERS = ["Lucía", "Javier M.", "Carmen", "Pedro López", "Ana", "Miguel", "Laura R.", "Sergio"]
+SENTENCES = [
+    "El pedido llegó tarde y la atención al cliente no dio ninguna solución.",
+    "Entrega rápida, producto perfecto y muy buena comunicación.",
+    "Tuve un problema con la devolución pero el reembolso llegó en pocos días.",
+    "Servicio excelente, lo recomiendo sin dudarlo.",
+    "El repartidor dejó el paquete en el locker equivocado.",
+    "Pésima experiencia, cancelación del pedido sin previo aviso.",
+]
+
+def _noise_block(i: int) -> str:
+    links = "".join(f'<li><a href="/categories/{i}-{j}">Categoría {j}</a></li>' for j in range(15))
+    return f'<div class="styles_nav__{i}"><ul>{links}</ul><p>Texto promocional {i}</p></div>'
+
+def _review_fields(idx: int, published: datetime, rng: random.Random) -> dict:
+    return {
+        'id': f"r{idx:08d}",
+        'user': rng.choice(USERS),
+        'rating': rng.randint(1, 5),
+        'text': " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 4))),
+        'published': published.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        'review_count': rng.randint(1, 30),
+    }
+
+def build_review_card(idx: int, fields: dict) -> str:
+    user, rating, text = fields['user'], fields['rating'], fields['text']
+    return (
+        f'<article data-service-review="{idx}" class="styles_reviewCard__{idx}">'
+        f'<aside><div data-consumer-name-typography="true">{user}</div>'
+        f'<span>{fields["review_count"]} reseñas</span></aside>'
+        f'<section><div class="styles_reviewHeader"><img alt="Valorada con {rating} de 5 estrellas" src="stars.svg"/>'
+        f'<time datetime="{fields["published"]}">hace {idx} días</time></div>'
+        f'<h2>Opinión {idx}</h2>'
+        f'<p data-review-content-typography="true">{text}</p></section>'
+        f'</article>'
+    )
+
+def _next_data_script(reviews: list) -> str:
+    payload = {
+        'props': {'pageProps': {'reviews': [
+            {
+                'id': r['id'], 'text': r['text'], 'rating': r['rating'], 'title': 'Opinión',
+                'dates': {'publishedDate': r['published'], 'experiencedDate': r['published']},
+                'consumer': {'displayName': r['user'], 'numberOfReviews': r['review_count'], 'countryCode': 'ES'},
+            }
+            for r in reviews
+        ]}},
+        'page': '/review/[businessUnitDisplayName]',
+    }
+    return f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(payload, ensure_ascii=False)}</script>'
+
+def build_listing_page(page: int, cards_per_page: int = 20, seed: int = 42, embed_json: bool = False) -> bytes:
+    """Returns the HTML bytes of a synthetic listing page (newest reviews first)."""
+    rng = random.Random(seed * 10007 + page)
+    start = datetime(2026, 1, 1) - timedelta(days=(page - 1) * cards_per_page)
+    reviews = [
+        _review_fields((page - 1) * cards_per_page + i, start - timedelta(days=i), rng)
+        for i in range(cards_per_page)
+    ]
+    cards = "".join(build_review_card((page - 1) * cards_per_page + i, r) for i, r in enumerate(reviews))
+    noise = "".join(_noise_block(i) for i in range(30))
+    next_data = _next_data_script(reviews) if embed_json else ""
+    html = (
+        '<!DOCTYPE html><html lang="es"><head><meta charset="utf-8"><title>Opiniones</title>'
+        '<script>window.dataLayer = [];</script></head><body>'
+        f'<header>{noise}</header><main><section class="styles_reviewsContainer">{cards}</section></main>'
+        f'<footer>{noise}</footer>{next_data}</body></html>'
+    )
+    return html.encode('utf-8')
@@ -0,0 +1,59 @@
+"""
+Micro-benchmark: review cards/second of the legacy extraction (html.parser, full tree,
+every fallback selector on every card) versus the compiled extraction plan
+(lxml + SoupStrainer + remembered selector variants) and the JSON-first path that
+reads the embedded __NEXT_DATA__ blob. Runs fully offline.
+
+Usage: python scripts/benchmark_extraction.py [pages] [cards_per_page]
+"""
+import os
+import sys
+import time
+
+root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from bs4 import BeautifulSoup
+from src.config.constants import TRUSTPILOT_SELECTORS
+from src.services.scraper import ReviewPageParser, ExtractionPlan, HTML_PARSER
+from scripts.bench_fixtures import build_listing_page
+
+def legacy_parse(parser: ReviewPageParser, content: bytes) -> list:
+    """Extraction exactly as it worked before the compiled plan."""
+    soup = BeautifulSoup(content, 'html.parser')
+    elements = []
+    for selector in TRUSTPILOT_SELECTORS['review_card']:
+        elements = soup.select(selector)
+        if elements:
+            break
+    return [r for r in (parser._extract_review_details(el) for el in elements) if r]
+
+def run(label: str, parse, pages: list) -> float:
+    start = time.perf_counter()
+    cards = sum(len(parse(content)) for content in pages)
+    elapsed = time.perf_counter() - start
+    rate = cards / elapsed if elapsed else 0.0
+    print(f"{label:<32} {cards:>6} cards in {elapsed:7.3f}s -> {rate:9.1f} cards/s")
+    return rate
+
+def main():
+    n_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    per_page = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    pages = [build_listing_page(p, per_page) for p in range(1, n_pages + 1)]
+
+    ExtractionPlan._plans.pop("benchmark.example", None)
+    parser = ReviewPageParser("benchmark.example")
+    parse = lambda content: parser.parse(content)[0]
+
+    print(f"Parser for compiled plan: {HTML_PARSER}")
+    before = run("legacy (html.parser, full scan)", lambda c: legacy_parse(parser, c), pages)
+    parse(pages[0])  # Warm-up: learn the selector variants
+    after = run("compiled plan", parse, pages)
+    json_pages = [build_listing_page(p, per_page, embed_json=True) for p in range(1, n_pages + 1)]
+    json_first = run("json-first (__NEXT_DATA__)", parse, json_pages)
+    if before:
+        print(f"Speed-up plan: x{after / before:.2f} | json-first: x{json_first / before:.2f}")
+
+if __name__ == "__main__":
+    main()
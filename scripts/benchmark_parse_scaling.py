@@ -0,0 +1,84 @@
+"""
+Parse scaling benchmark: parses N saved listing pages with 1..N parser processes
+(the worker side of the scraper's fetch/parse split) and reports pages/s and the
+speed-up over parsing inline in the main process.
+
+Pages come from the replay fixtures directory; missing pages are generated as
+synthetic DOM-only pages (no embedded JSON), which is the CPU-heavy parse path.
+A full replay run through the scraper with the fastest worker count is printed
+at the end as a sanity check of the end-to-end path.
+
+Usage:
+    python scripts/benchmark_parse_scaling.py --pages 100
+    python scripts/benchmark_parse_scaling.py --pages 200 --max-workers 8
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.config.constants import TRUSTPILOT_BASE_URL, DATA_DIR
+from src.services.scraper import TrustpilotScraper, parse_listing_page, parse_page_bytes, _init_parse_worker
+from src.services.http_replay import load_fixture
+from scripts.benchmark_replay import ensure_synthetic_fixtures
+
+DEFAULT_FIXTURES = os.path.join(DATA_DIR, "fixtures")
+
+def load_pages(fixtures_dir: str, domain: str, pages: int, per_page: int):
+    ensure_synthetic_fixtures(fixtures_dir, domain, pages, per_page, embed_json=False)
+    bodies = []
+    for page in range(1, pages + 1):
+        fixture = load_fixture(fixtures_dir, f"{TRUSTPILOT_BASE_URL}{domain}?page={page}")
+        bodies.append(fixture['body'])
+    return bodies
+
+def parse_inline(domain: str, bodies) -> float:
+    start = time.perf_counter()
+    for body in bodies:
+        parse_listing_page(domain, body)
+    return time.perf_counter() - start
+
+def parse_with_workers(domain: str, bodies, workers: int) -> float:
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker, initargs=(domain, {})) as pool:
+        # Warm-up so process start-up is not counted as parse time
+        list(pool.map(parse_page_bytes, [domain] * workers, bodies[:workers]))
+        start = time.perf_counter()
+        list(pool.map(parse_page_bytes, [domain] * len(bodies), bodies))
+        return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES, help="Fixtures directory")
+    parser.add_argument('--domain', default="benchmark-dom.example", help="Domain of the saved pages")
+    parser.add_argument('--pages', type=int, default=100, help="Number of pages to parse")
+    parser.add_argument('--per-page', type=int, default=20, help="Cards per synthetic page")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1, help="Largest parser pool")
+    args = parser.parse_args()
+
+    bodies = load_pages(args.fixtures, args.domain, args.pages, args.per_page)
+    baseline = parse_inline(args.domain, bodies)
+    print(f"{'workers':>8} {'seconds':>9} {'pages/s':>9} {'speed-up':>9}")
+    print(f"{'inline':>8} {baseline:>9.3f} {len(bodies) / baseline:>9.1f} {1.0:>8.2f}x")
+
+    best_workers, best_time = 1, None
+    for workers in range(1, max(1, args.max_workers) + 1):
+        elapsed = parse_with_workers(args.domain, bodies, workers)
+        print(f"{workers:>8} {elapsed:>9.3f} {len(bodies) / elapsed:>9.1f} {baseline / elapsed:>8.2f}x")
+        if best_time is None or elapsed < best_time:
+            best_workers, best_time = workers, elapsed
+
+    scraper = TrustpilotScraper(args.domain, concurrency=2, parse_workers=best_workers,
+                                throttle=False, replay_dir=args.fixtures)
+    start = time.perf_counter()
+    df = scraper.scrape_reviews(max_reviews=args.pages * args.per_page)
+    elapsed = time.perf_counter() - start
+    print(f"\nEnd-to-end replay with {best_workers} parser process(es): "
+          f"{len(df)} reviews in {elapsed:.3f}s ({len(df) / elapsed:.1f} reviews/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Offline scraping benchmark: replays N recorded listing pages through
+TrustpilotScraper.scrape_reviews and reports pages/s, reviews/s and the time
+split between fetching (replay transport) and parsing, as measured by the
+scraper's own per-page metrics.
+
+If the fixtures directory is empty, synthetic pages are generated first, so the
+benchmark never touches the network. Use --record to capture live pages instead.
+
+Usage:
+    python scripts/benchmark_replay.py --pages 50
+    python scripts/benchmark_replay.py --record --domain www.amazon.es --pages 5
+"""
+import os
+import sys
+import time
+import argparse
+
+root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.config.constants import TRUSTPILOT_BASE_URL, DATA_DIR
+from src.services.scraper import TrustpilotScraper
+from src.services.http_replay import save_fixture, load_fixture
+from scripts.bench_fixtures import build_listing_page
+
+DEFAULT_FIXTURES = os.path.join(DATA_DIR, "fixtures")
+
+def ensure_synthetic_fixtures(fixtures_dir: str, domain: str, pages: int, per_page: int, embed_json: bool):
+    """Generates synthetic fixtures for every page that was not recorded yet."""
+    for page in range(1, pages + 1):
+        url = f"{TRUSTPILOT_BASE_URL}{domain}?page={page}"
+        if load_fixture(fixtures_dir, url) is None:
+            body = build_listing_page(page, per_page, embed_json=embed_json)
+            save_fixture(fixtures_dir, url, 200, {'Content-Type': 'text/html; charset=utf-8'}, body)
+
+def record(fixtures_dir: str, domain: str, pages: int):
+    """Scrapes the live site once, saving every raw response as a fixture."""
+    scraper = TrustpilotScraper(domain, use_cache=False, record_dir=fixtures_dir)
+    df = scraper.scrape_reviews(max_reviews=pages * 20)
+    print(f"Recorded {len(df)} reviews from {domain} into {fixtures_dir}")
+
+def replay(fixtures_dir: str, domain: str, pages: int, per_page: int, concurrency: int):
+    scraper = TrustpilotScraper(domain, concurrency=concurrency, throttle=False, replay_dir=fixtures_dir)
+
+    start = time.perf_counter()
+    df, metrics = scraper.scrape_reviews(max_reviews=pages * per_page, return_metrics=True)
+    elapsed = time.perf_counter() - start
+    summary = metrics.summary()
+
+    reviews = len(df)
+    busy = (summary['network_time'] + summary['parse_time']) or 1.0  # Summed over workers when concurrency > 1
+    print(f"Pages replayed : {summary['pages']}")
+    print(f"Reviews        : {reviews}")
+    print(f"Wall time      : {elapsed:.3f}s")
+    print(f"Pages/s        : {summary['pages'] / elapsed:.1f}")
+    print(f"Reviews/s      : {reviews / elapsed:.1f}")
+    print(f"Fetch          : {summary['network_time']:.3f}s ({100 * summary['network_time'] / busy:.1f}% of fetch+parse)")
+    print(f"Parse          : {summary['parse_time']:.3f}s ({100 * summary['parse_time'] / busy:.1f}% of fetch+parse)")
+    print(f"Selectors      : {summary['selectors']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES, help="Fixtures directory")
+    parser.add_argument('--domain', default="benchmark.example", help="Domain to record or replay")
+    parser.add_argument('--pages', type=int, default=50, help="Number of pages")
+    parser.add_argument('--per-page', type=int, default=20, help="Cards per synthetic page")
+    parser.add_argument('--concurrency', type=int, default=1, help="Page requests in flight")
+    parser.add_argument('--dom', action='store_true', help="Synthetic pages without the embedded JSON blob")
+    parser.add_argument('--record', action='store_true', help="Record live pages instead of replaying")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.fixtures, args.domain, args.pages)
+        return
+
+    ensure_synthetic_fixtures(args.fixtures, args.domain, args.pages, args.per_page, embed_json=not args.dom)
+    replay(args.fixtures, args.domain, args.pages, args.per_page, args.concurrency)
+
+if __name__ == "__main__":
+    main()
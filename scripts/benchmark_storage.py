@@ -0,0 +1,177 @@
+"""
+Storage benchmark: compares the legacy single-file JSON history (full rewrite per
+save) with the review storage backends (JSONL segments, SQLite, Parquet) on
+synthetic histories of 10k, 100k and 1M reviews.
+
+For every size and format it reports:
+  bulk     - writing the whole history once
+  append   - saving 20 new reviews on top of it (dedupe included)
+  load     - loading the full history as a DataFrame
+  corpus   - reading only the review texts (get_global_corpus)
+  window   - reviews of the last month (load_history since/until: Parquet prunes partitions,
+             SQLite uses its (domain, date) index, JSONL filters while streaming)
+  disk     - bytes on disk
+
+Dates are relative to today (the last 24 months), and every load is checked
+against the expected row count before its timing is reported, so a backend
+cannot look fast by reading an empty tier. Everything runs in a temporary directory. The 1M size needs several GB of RAM
+for the JSON formats; use --sizes to pick smaller ones.
+
+Usage:
+    python scripts/benchmark_storage.py
+    python scripts/benchmark_storage.py --sizes 10000,100000 --formats json,jsonl,parquet
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+import pandas as pd
+from src.services.storage import get_repository, review_signature
+
+WORDS = ("pedido entrega cliente servicio producto envío reembolso atención rápido lento "
+         "bueno malo excelente terrible devolución paquete amazon precio calidad recomiendo").split()
+
+def synthetic_reviews(n: int, seed: int = 7) -> pd.DataFrame:
+    """n reviews spread over the last 24 months (oldest first), shaped like the scraper output."""
+    rng = random.Random(seed)
+    today = datetime.now()
+    rows = []
+    for i in range(n):
+        days_ago = (n - 1 - i) * 730 // max(n, 1) + rng.randint(0, 27)
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40)))
+        rows.append({
+            'user_id': f"id{rng.randint(0, n // 3 + 1)}",
+            'user': f"Usuario {i}",
+            'text': f"{i} {text}",
+            'rating': rng.randint(1, 5),
+            'product_id': "",
+            'date': f"{today - timedelta(days=days_ago):%Y-%m-%d}",
+            'keywords': ", ".join(rng.sample(WORDS, 3)),
+            'longitud': len(text.split()),
+            'timestamp_scraping': "2025-01-01T00:00:00",
+        })
+    return pd.DataFrame(rows)
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def disk_bytes(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+def last_month_window(df: pd.DataFrame):
+    newest = max(df['date'])
+    return newest[:7] + "-01", newest[:7] + "-31"
+
+def bench_legacy_json(df: pd.DataFrame, extra: pd.DataFrame, since: str, until: str) -> dict:
+    """The pre-segment ReviewRepository: one JSON file rewritten (indent=2) on every save."""
+    path = os.path.join("data", "bench_legacy.json")
+    records = df.to_dict('records')
+
+    def write_all():
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+
+    def load():
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def append():
+        current = load()
+        known = {review_signature(r) for r in current}
+        current.extend(r for r in extra.to_dict('records') if review_signature(r) not in known)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+
+    result = {'bulk': timed(write_all)[0], 'append': timed(append)[0]}
+    result['load'] = timed(lambda: pd.DataFrame(load()))[0]
+    result['corpus'] = timed(lambda: [d.get('text', '') for d in load() if d.get('text')])[0]
+
+    def window():
+        history = pd.DataFrame(load())
+        return history[(history['date'] >= since) & (history['date'] <= until)]
+    result['window'] = timed(window)[0]
+    result['disk'] = disk_bytes(path)
+    return result
+
+def check_rows(backend: str, what: str, loaded: pd.DataFrame, expected: int):
+    """A timing only counts if the backend returned every row it should have."""
+    if len(loaded) != expected:
+        raise AssertionError(f"{backend} {what} returned {len(loaded):,} rows, expected {expected:,}")
+
+def bench_backend(backend: str, domain: str, df: pd.DataFrame, extra: pd.DataFrame, since: str, until: str) -> dict:
+    repo = get_repository(backend)
+    result = {'bulk': timed(lambda: repo.save_reviews(domain, df))[0]}
+    result['append'] = timed(lambda: repo.save_reviews(domain, extra))[0]
+    result['load'], loaded = timed(lambda: repo.load_history(domain))
+    check_rows(backend, "load", loaded, len(df) + len(extra))
+    result['corpus'] = timed(repo.get_global_corpus)[0]
+
+    result['window'], loaded = timed(lambda: repo.load_history(domain, since=since, until=until))
+    history = pd.concat([df, extra])
+    check_rows(backend, "window", loaded, int(((history['date'] >= since) & (history['date'] <= until)).sum()))
+
+    paths = {
+        'jsonl': os.path.join("data", f"{domain}_history"),
+        'sqlite': os.path.join("data", "reviews.db"),
+        'parquet': os.path.join("data", "parquet"),
+    }
+    # SQLite keeps recent pages in its -wal file until a checkpoint
+    result['disk'] = sum(disk_bytes(paths[backend] + suffix) for suffix in ("", "-wal")
+                         if os.path.exists(paths[backend] + suffix))
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default="10000,100000,1000000", help="Comma-separated history sizes")
+    parser.add_argument('--formats', default="json,sqlite,parquet,jsonl", help="Formats to compare")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    formats = [f.strip() for f in args.formats.split(',') if f.strip()]
+    metrics = ('bulk', 'append', 'load', 'corpus', 'window')
+
+    original_cwd = os.getcwd()
+    for n in sizes:
+        df = synthetic_reviews(n)
+        extra = synthetic_reviews(20, seed=n + 1)
+        extra['date'] = max(df['date'])
+        since, until = last_month_window(df)
+
+        print(f"\n=== {n:,} reviews ===")
+        print(f"{'format':<8}" + "".join(f"{m:>10}" for m in metrics) + f"{'disk MB':>10}")
+        workdir = tempfile.mkdtemp(prefix="bench_storage_")
+        try:
+            os.chdir(workdir)
+            os.makedirs("data", exist_ok=True)
+            # JSON-backend domains are imported by the other backends, so JSONL runs last
+            for fmt in sorted(formats, key=lambda f: f == "jsonl"):
+                try:
+                    if fmt == "json":
+                        result = bench_legacy_json(df, extra, since, until)
+                    else:
+                        result = bench_backend(fmt, f"bench{n}-{fmt}.com", df, extra, since, until)
+                except ImportError as e:
+                    print(f"{fmt:<8} skipped ({e})")
+                    continue
+                print(f"{fmt:<8}" + "".join(f"{result[m]:>9.3f}s" for m in metrics)
+                      + f"{result['disk'] / 1e6:>10.1f}")
+        finally:
+            os.chdir(original_cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Bulk import of CSV review exports in the data/raw/dataset_raw.csv schema
+(usuario, ubicacion, total_resenas_usuario, puntuacion, fecha, titulo,
+texto_comentario, fecha_sistema) into the review repository of a domain.
+
+The file is streamed in chunks (--chunk-size rows): each chunk is mapped onto
+the repository schema and saved in one batch, de-duplicated against the stored
+history by content signature, so re-running an import adds nothing. Rows
+without text or without any date (fecha / fecha_sistema) are skipped. Progress
+lines report rows read, reviews imported, duplicates, skipped rows (no text),
+undated rows and rows/s.
+
+Usage:
+    python scripts/import_csv.py data/raw/dataset_raw.csv --domain www.amazon.es
+    python scripts/import_csv.py export.csv --domain www.amazon.es --backend sqlite --chunk-size 50000
+"""
+import os
+import sys
+import argparse
+
+root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from src.config.constants import STORAGE_BACKEND, IMPORT_CHUNK_SIZE
+from src.services.storage import get_repository
+from src.services.importer import CsvReviewImporter
+
+def report(stats: dict):
+    print(f"{stats['rows']:>12,} rows | {stats['imported']:>10,} imported | {stats['duplicates']:>10,} duplicates | "
+          f"{stats['skipped']:>8,} skipped | {stats['undated']:>8,} undated | {stats['rows_per_sec']:>9,.0f} rows/s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', help="CSV file to import")
+    parser.add_argument('--domain', required=True, help="Domain the reviews belong to (e.g. www.amazon.es)")
+    parser.add_argument('--backend', default=STORAGE_BACKEND, choices=("jsonl", "sqlite", "parquet"))
+    parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help="Rows read and saved per batch")
+    args = parser.parse_args()
+
+    importer = CsvReviewImporter(args.domain, repository=get_repository(args.backend), chunk_size=args.chunk_size)
+    stats = importer.run(args.path, progress=report)
+    print(f"Imported {stats['imported']:,} new reviews from {stats['rows']:,} rows into {args.domain} "
+          f"({args.backend}) in {stats['seconds']:.1f}s, {stats['rows_per_sec']:,.0f} rows/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Concurrency stress test for the JSONL history store and the model registry: several
+writer processes (like separate Streamlit sessions) save overlapping review batches
+of the same domain and overwrite the same models, while reader processes keep
+loading the history and the models.
+
+Checks at the end:
+  - every distinct review was stored exactly once (no lost reviews, no duplicates)
+  - every history line parses (no torn or interleaved writes)
+  - the signature index agrees with the stored history
+  - readers never failed and never saw a partial model
+and reports the writers' throughput and the readers' worst load latency.
+
+Everything runs in a temporary directory.
+
+Usage:
+    python scripts/stress_concurrent_writes.py
+    python scripts/stress_concurrent_writes.py --writers 8 --batches 60 --batch-size 200
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import multiprocessing as mp
+
+root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+import pandas as pd
+
+DOMAIN = "stress.com"
+WORDS = ("pedido entrega cliente servicio producto envío reembolso atención rápido lento "
+         "bueno malo excelente terrible devolución paquete precio calidad recomiendo").split()
+
+def review(i: int) -> dict:
+    rng = random.Random(i)
+    text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 90)))
+    return {'user_id': f"id{i}", 'user': f"Usuario {i % 500}", 'text': f"{i} {text}",
+            'rating': 1 + i % 5, 'product_id': "", 'date': f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            'keywords': ", ".join(rng.sample(WORDS, 3))}
+
+def writer(worker: int, args, result_q):
+    from src.services.storage import ReviewRepository, ModelRegistry
+    from src.services.ir_engine import InvertedIndex, VectorSpaceModel
+    repo, registry = ReviewRepository(), ModelRegistry()
+    rng = random.Random(1000 + worker)
+    sampled, added, start = set(), 0, time.perf_counter()
+    for b in range(args.batches):
+        ids = rng.sample(range(args.universe), args.batch_size)
+        sampled.update(ids)
+        added += repo.save_reviews(DOMAIN, pd.DataFrame([review(i) for i in ids]))
+
+        payload = list(range(worker * 1000 + b, worker * 1000 + b + 5000))
+        registry.save_model("stress_pickle", {'payload': payload, 'checksum': sum(payload)})
+        index = InvertedIndex()
+        for d, i in enumerate(ids[:50]):
+            index.add_document(d, review(i)['text'].split())
+        registry.save_model("stress_arrays", VectorSpaceModel(index))
+    result_q.put(('writer', worker, sorted(sampled), added, time.perf_counter() - start))
+
+def reader(worker: int, stop, result_q):
+    from src.services.storage import ReviewRepository, ModelRegistry, content_hash
+    repo, registry = ReviewRepository(), ModelRegistry()
+    loads, errors, worst = 0, [], 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            history = repo.load_history(DOMAIN)
+            if not history.empty:
+                hashes = [content_hash(r) for r in history.to_dict('records')]
+                if len(hashes) != len(set(hashes)):
+                    errors.append("duplicate reviews in a history load")
+            model = registry.load_model("stress_pickle")
+            if model is not None and sum(model['payload']) != model['checksum']:
+                errors.append("partial pickle model")
+            vsm = registry.load_model("stress_arrays")
+            if vsm is not None and len(vsm.vocab) != len(vsm.idf_vector):
+                errors.append("inconsistent array model")
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+        worst = max(worst, time.perf_counter() - start)
+        loads += 1
+    result_q.put(('reader', worker, loads, errors[:5], worst))
+
+def verify(expected: set) -> list:
+    from src.services.storage import ReviewRepository, content_hash
+    from src.services.signature_index import SignatureIndex
+    problems = []
+    repo = ReviewRepository()
+    store = repo._get_store(DOMAIN)
+    raw_lines = 0
+    for path in store.segments():
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    raw_lines += 1
+                    try:
+                        json.loads(line)
+                    except ValueError:
+                        problems.append(f"torn line in {os.path.basename(path)}")
+    records = list(store.iter_records(include_cold=True))  # 2024 reviews may be tiered out meanwhile
+    ids = [int(r['user_id'][2:]) for r in records]
+    if len(ids) != len(set(ids)):
+        problems.append(f"{len(ids) - len(set(ids))} duplicate reviews stored")
+    if set(ids) != expected:
+        problems.append(f"{len(expected - set(ids))} reviews lost, {len(set(ids) - expected)} unexpected")
+    index = SignatureIndex(store.directory)
+    if len(index) != len(set(ids)) or not all(content_hash(r) in index for r in records):
+        problems.append(f"signature index has {len(index)} entries for {len(set(ids))} reviews")
+    print(f"Stored {len(records):,} reviews in {len(store.segments())} live segments ({raw_lines:,} lines) "
+          f"and {len(store.cold_segments())} cold segments")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--batches', type=int, default=40)
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--universe', type=int, default=20000, help="Distinct reviews the batches are drawn from")
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")  # Fresh interpreters, like independent Streamlit servers
+    original_cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="stress_writes_")
+    try:
+        os.chdir(workdir)
+        result_q, stop = ctx.Queue(), ctx.Event()
+        readers = [ctx.Process(target=reader, args=(i, stop, result_q)) for i in range(args.readers)]
+        writers = [ctx.Process(target=writer, args=(i, args, result_q)) for i in range(args.writers)]
+        start = time.perf_counter()
+        for p in readers + writers:
+            p.start()
+
+        expected, added, results = set(), 0, []
+        for _ in writers:
+            kind, worker, sampled, count, elapsed = result_q.get()
+            expected.update(sampled)
+            added += count
+            results.append((worker, elapsed))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        reader_results = [result_q.get() for _ in readers]
+        for p in readers + writers:
+            p.join()
+
+        saves = args.writers * args.batches
+        print(f"{args.writers} writers x {args.batches} batches of {args.batch_size}: "
+              f"{saves / elapsed:.1f} saves/s, {args.writers * args.batches * args.batch_size / elapsed:,.0f} reviews/s "
+              f"({added:,} new, {len(expected):,} distinct)")
+        problems = verify(expected)
+        if added != len(expected):
+            problems.append(f"save_reviews reported {added} new reviews for {len(expected)} distinct")
+        for _, worker, loads, errors, worst in reader_results:
+            print(f"reader {worker}: {loads} loads, worst latency {worst * 1000:.0f} ms")
+            problems.extend(f"reader {worker}: {e}" for e in errors)
+
+        if problems:
+            print("FAIL")
+            for problem in problems:
+                print(f"  - {problem}")
+            sys.exit(1)
+        print("PASS")
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
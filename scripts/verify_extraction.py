@@ -0,0 +1,111 @@
+"""
+Verification of review extraction on synthetic listing pages (no network):
+short reviews (10 characters or fewer) must survive both the legacy selector
+loop and the extraction plan, also after the plan has remembered the text
+selector from a longer review; the embedded JSON and the DOM cards of the same
+reviews must give identical records (whitespace normalized the same way, hence
+the same content signatures); and a parser process must extract exactly what
+the scraper extracts inline.
+
+Exits with status 1 on any failure.
+
+Usage:
+    python scripts/verify_extraction.py
+"""
+import os
+import sys
+from datetime import datetime
+
+root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+scripts_path = os.path.dirname(os.path.abspath(__file__))
+if scripts_path not in sys.path:
+    sys.path.insert(0, scripts_path)
+
+from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor
+from bench_fixtures import build_review_card, build_listing_page, _next_data_script
+from src.services.scraper import ReviewPageParser, ExtractionPlan, parse_listing_page, parse_page_bytes, _init_parse_worker
+from src.services.storage import content_hash
+
+def card(idx: int, text: str, user: str = "Lucía") -> str:
+    return build_review_card(idx, {
+        'user': user, 'rating': 5, 'text': text, 'review_count': 3,
+        'published': f"{datetime(2026, 1, 1):%Y-%m-%dT%H:%M:%S.000Z}",
+    })
+
+def new_parser(domain: str) -> ReviewPageParser:
+    ExtractionPlan.for_domain(domain).chosen.clear()  # Start from an empty plan
+    return ReviewPageParser(domain)
+
+def check_short_reviews() -> list:
+    """A short review after a long one is kept, with and without a plan."""
+    problems = []
+    texts = ["El pedido llegó a tiempo y en perfecto estado.", "Genial"]
+    html = "<main>" + "".join(card(i, text) for i, text in enumerate(texts)) + "</main>"
+    for label, use_plan in (("legacy", False), ("plan", True)):
+        parser = new_parser(f"short-{label}.verify.com")
+        soup = BeautifulSoup(html, 'html.parser')
+        elements = soup.select('article[data-service-review]')
+        plan = parser.plan if use_plan else None
+        found = [r['text'] for r in (parser._extract_review_details(e, plan) for e in elements) if r]
+        if found != texts:
+            problems.append(f"{label}: extracted {found}, expected {texts}")
+        if use_plan and parser.plan.chosen.get('text') != 'p[data-review-content-typography="true"]':
+            problems.append(f"plan remembered text selector {parser.plan.chosen.get('text')!r}")
+    return problems
+
+def check_json_matches_dom() -> list:
+    """Reviews with irregular whitespace get the same records (and signatures) from both paths."""
+    reviews = [
+        {'id': "r1", 'user': "Ana  María ", 'rating': 4, 'review_count': 2,
+         'text': "Muy  bien,\n  entrega rápida y   sin problemas.", 'published': "2026-01-02T10:00:00.000Z"},
+        {'id': "r2", 'user': "Pedro", 'rating': 1, 'review_count': 7,
+         'text': " Fatal.\n\nNo vuelvo a pedir ", 'published': "2026-01-01T09:00:00.000Z"},
+    ]
+    cards = "".join(build_review_card(i, r) for i, r in enumerate(reviews))
+    dom_page = f"<html><body><main>{cards}</main></body></html>".encode('utf-8')
+    json_page = f"<html><body>{_next_data_script(reviews)}</body></html>".encode('utf-8')
+    dom, dom_stats = new_parser("paths.verify.com").parse(dom_page)
+    embedded, json_stats = new_parser("paths.verify.com").parse(json_page)
+    problems = []
+    if dom_stats['selector'] == 'json' or json_stats['selector'] != 'json':
+        problems.append(f"unexpected paths: DOM page via {dom_stats['selector']}, JSON page via {json_stats['selector']}")
+    fields = ('user', 'text', 'date', 'rating')
+    for d, j in zip(dom, embedded):
+        if [d[f] for f in fields] != [j[f] for f in fields]:
+            problems.append(f"DOM {[d[f] for f in fields]} != JSON {[j[f] for f in fields]}")
+    if len(dom) != len(reviews) or [content_hash(r) for r in dom] != [content_hash(r) for r in embedded]:
+        problems.append("content signatures differ between the DOM and JSON paths")
+    return problems
+
+def check_worker_parse() -> list:
+    """The process-pool entry point returns the same records as the inline parse."""
+    domain = "workers.verify.com"
+    pages = [build_listing_page(p) for p in (1, 2)]
+    inline = [parse_listing_page(domain, page)[0] for page in pages]
+    with ProcessPoolExecutor(max_workers=1, initializer=_init_parse_worker, initargs=(domain, {})) as pool:
+        in_worker = [reviews for reviews, _ in pool.map(parse_page_bytes, [domain] * len(pages), pages)]
+    if not inline[0]:
+        return ["inline parse found no reviews"]
+    return [] if inline == in_worker else ["parser process output differs from the inline parse"]
+
+def main():
+    problems = []
+    for name, check in (("short reviews are kept (legacy and plan)", check_short_reviews),
+                        ("JSON and DOM paths give the same records", check_json_matches_dom),
+                        ("parser processes match the inline parse", check_worker_parse)):
+        found = check()
+        print(f"[{'ERROR' if found else 'OK'}] {name}")
+        problems.extend(found)
+
+    if problems:
+        print("FAIL")
+        for problem in problems[:20]:
+            print(f"  - {problem}")
+        sys.exit(1)
+    print("PASS")
+
+if __name__ == "__main__":
+    main()
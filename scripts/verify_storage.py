@@ -0,0 +1,148 @@
+"""
+Verification of the review storage backends: every available backend (JSONL
+segments, SQLite, Parquet when pyarrow is installed) must give back the reviews
+it stored, field by field, in the shape the scraper produces them (keywords as a
+"a, b, c" string, extra fields such as title). On the JSONL backend, reviews
+older than the retention window must move to the compressed cold tier with
+their daily rollups, even in a history small enough to fit in one segment,
+while a history holding only old reviews (e.g. a CSV import) stays loadable
+and returns the same rows as SQLite and Parquet.
+
+Everything runs in a temporary directory; exits with status 1 on any failure.
+
+Usage:
+    python scripts/verify_storage.py
+"""
+import os
+import sys
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+import pandas as pd
+
+FIELDS = ('user_id', 'user', 'text', 'rating', 'date', 'keywords', 'title')
+
+def scraped_reviews(domain: str, n: int = 20) -> pd.DataFrame:
+    """Reviews shaped like `TrustpilotScraper` output (plus an extra field)."""
+    return pd.DataFrame([{
+        'user_id': f"Usuario {i}", 'user': f"Usuario {i}", 'text': f"Reseña {i}: pedido y entrega correctos",
+        'rating': 1 + i % 5, 'product_id': domain, 'date': f"{datetime.now() - timedelta(days=i):%Y-%m-%d}T10:00:00.000Z",
+        'keywords': "pedido, entrega" if i % 2 else "Ninguna", 'domain': domain, 'title': f"Título {i}",
+    } for i in range(n)])
+
+def backends() -> list:
+    names = ["jsonl", "sqlite"]
+    try:
+        import pyarrow  # noqa: F401
+        names.append("parquet")
+    except ImportError:
+        print("[SKIP] parquet: pyarrow is not installed")
+    return names
+
+def check_round_trip(backend: str) -> list:
+    """Saved reviews load back with every field intact, and saving them again adds nothing."""
+    from src.services.storage import get_repository
+    problems = []
+    domain = f"{backend}.verify.com"  # One domain per backend: SQLite/Parquet import JSONL histories
+    df = scraped_reviews(domain)
+    repo = get_repository(backend)
+    added = repo.save_reviews(domain, df)
+    if added != len(df):
+        problems.append(f"{backend}: saved {added} of {len(df)} reviews")
+    if repo.save_reviews(domain, df) != 0:
+        problems.append(f"{backend}: saving the same reviews again added rows")
+
+    loaded = get_repository(backend).load_history(domain)
+    loaded = {row['text']: row for row in loaded.to_dict('records')}
+    for expected in df.to_dict('records'):
+        row = loaded.get(expected['text'])
+        if row is None:
+            problems.append(f"{backend}: review {expected['user']} not loaded")
+            continue
+        for field in FIELDS:
+            if row.get(field) != expected[field]:
+                problems.append(f"{backend}: {field} {expected[field]!r} loaded as {row.get(field)!r}")
+    return problems
+
+def check_tiering() -> list:
+    """Old reviews of a one-segment history move to cold/, get rolled up, and stay readable with full=True."""
+    from src.services.storage import ReviewRepository
+    problems = []
+    domain = "tiering.verify.com"
+    old_day = (datetime.now() - timedelta(days=800)).strftime("%Y-%m-%d")
+    df = scraped_reviews(domain)
+    old = df.index % 2 == 1
+    df.loc[old, 'date'] = f"{old_day}T10:00:00.000Z"
+    repo = ReviewRepository()
+    repo.save_reviews(domain, df)
+    repo.apply_retention(domain, max_age_days=365, keep_newest=0)
+
+    store = repo._get_store(domain)
+    cold = [r['text'] for path in store.cold_segments() for r in store._iter_cold(path)]
+    if sorted(cold) != sorted(df.loc[old, 'text']):
+        problems.append(f"cold tier holds {len(cold)} reviews, expected the {int(old.sum())} old ones")
+    hot = repo.load_history(domain)
+    if sorted(hot['text']) != sorted(df.loc[~old, 'text']):
+        problems.append(f"hot history has {len(hot)} reviews, expected {int((~old).sum())}")
+    if len(repo.load_history(domain, full=True)) != len(df):
+        problems.append("full history does not include the cold reviews")
+    rollups = repo.load_rollups(domain)
+    if rollups.empty or rollups.set_index('date')['count'].get(old_day) != int(old.sum()):
+        problems.append(f"rollups missing or wrong for {old_day}: {rollups.to_dict('records')}")
+    if repo.save_reviews(domain, df) != 0:
+        problems.append("tiered reviews were stored again")
+    return problems
+
+def check_old_history(backend: str) -> list:
+    """A history of reviews older than the hot window loads in full, on the first save and after tiering."""
+    from src.services.storage import get_repository
+    problems = []
+    domain = f"old.{backend}.verify.com"
+    df = scraped_reviews(domain, n=50)
+    df['date'] = [f"{datetime.now() - timedelta(days=800 + i):%Y-%m-%d}T10:00:00.000Z" for i in range(len(df))]
+    repo = get_repository(backend)
+    repo.save_reviews(domain, df)
+    loaded = len(repo.load_history(domain))
+    if loaded != len(df):
+        problems.append(f"{backend}: old-only history loads {loaded} of {len(df)} reviews")
+    if backend == "jsonl":
+        repo.apply_retention(domain, max_age_days=365, keep_newest=20)
+        hot = repo.load_history(domain)
+        if len(hot) != 20 or sorted(hot['text']) != sorted(df['text'][:20]):
+            problems.append(f"jsonl: tiering kept {len(hot)} reviews hot, expected the 20 newest")
+    return problems
+
+def main():
+    original_cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="verify_storage_")
+    problems = []
+    try:
+        os.chdir(workdir)
+        for backend in backends():
+            found = check_round_trip(backend)
+            print(f"[{'ERROR' if found else 'OK'}] {backend}: round-trip of scraped reviews")
+            problems.extend(found)
+            found = check_old_history(backend)
+            print(f"[{'ERROR' if found else 'OK'}] {backend}: history of old reviews stays loadable")
+            problems.extend(found)
+        found = check_tiering()
+        print(f"[{'ERROR' if found else 'OK'}] jsonl: retention moves old reviews to the cold tier")
+        problems.extend(found)
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if problems:
+        print("FAIL")
+        for problem in problems[:20]:
+            print(f"  - {problem}")
+        sys.exit(1)
+    print("PASS")
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,24 @@ DEFAULT_DOMAIN = "dominio.com"
 DEFAULT_COMPARE_DOMAIN = "competencia.com"
 SCRAPE_MAX_REVIEWS = 50  # Increased for laboratory depth
 SCRAPE_REVIEWS_PER_PAGE = 20
+SCRAPE_CONCURRENCY = 1  # Page requests in flight per host (1 = legacy serial mode)
+SCRAPE_PARSE_WORKERS = 0  # HTML parser processes (0 = parse inside the fetch threads)
+CRAWL_WORKERS = 4  # Shared worker pool of the multi-domain crawl scheduler
+CRAWL_GLOBAL_RATE = 4.0  # Global budget across all hosts (requests/s)
+
+# Streaming Pipeline
+PIPELINE_QUEUE_SIZE = 4  # Page batches buffered between stages (backpressure bound)
+PIPELINE_STREAMING = False  # Default of the sidebar toggle: analyze each page while the crawl runs
+
+# Adaptive Throttling (AIMD token bucket per host)
+SCRAPE_RATE_INITIAL = 1 / 1.5  # Requests/s at start (the legacy 1.5 s pause)
+SCRAPE_RATE_MIN = 0.1  # Floor after repeated 429/503
+SCRAPE_RATE_MAX = 3.0  # Politeness ceiling per host (requests/s)
+SCRAPE_RATE_INCREASE = 0.1  # Additive increase per healthy response (requests/s)
+SCRAPE_RATE_DECREASE = 0.5  # Multiplicative decrease on 429/503
+SCRAPE_MAX_RETRIES = 4  # Retries of a throttled page before giving up
+SCRAPE_BACKOFF_BASE = 1.0  # Seconds; doubled per attempt, with jitter
+SCRAPE_BACKOFF_MAX = 60.0  # Backoff cap (seconds)
 
 # CSS Selectors (Maintenance)
 TRUSTPILOT_SELECTORS = {
@@ -40,10 +58,75 @@ TRUSTPILOT_SELECTORS = {
 DATA_DIR = "data"
 ASSETS_DIR = "assets"
 
+# Review Storage Backend: "jsonl" (append-only segments), "sqlite" or "parquet" (needs pyarrow)
+STORAGE_BACKEND = "jsonl"
+SQLITE_PATH = os.path.join(DATA_DIR, "reviews.db")
+PARQUET_DIR = os.path.join(DATA_DIR, "parquet")
+
+# Review History Segments (append-only JSONL per domain)
+SEGMENT_MAX_BYTES = 1 * 1024 * 1024  # Active segment rolls over past this size
+SEGMENT_COMPACT_MIN = 4  # Merge once this many small closed segments are adjacent
+SEGMENT_COMPACT_TARGET = 16 * 1024 * 1024  # Upper size of a merged segment
+SEGMENT_GC_GRACE = 300  # Seconds superseded segments are kept for readers still using them
+
+# History Tiering (JSONL backend)
+HISTORY_HOT_DAYS = 365  # Reviews older than this move to compressed cold segments
+HISTORY_HOT_MIN_REVIEWS = 1000  # Newest reviews kept hot whatever their age (an old-only history stays loadable)
+HISTORY_COLD_COMPRESSION = "gzip"  # "gzip" or "zstd" (needs the zstandard package)
+HISTORY_ROLLUPS_ENABLED = True  # Keep daily aggregates of the reviews moved to the cold tier
+HISTORY_TIERING_INTERVAL = 24 * 3600  # Seconds between tiering passes triggered by saves
+HISTORY_CHUNK_SIZE = 5000  # Reviews per DataFrame yielded by iter_history
+ANALYSIS_HISTORY_DAYS = None  # Days of history analysed per run (None = the whole hot tier)
+
+# Signature Index (persistent content hashes used for de-duplication)
+SIGNATURE_BLOOM_ENABLED = True  # Bloom filter in front of the index (~1% false positives)
+SIGNATURE_BLOOM_BITS_PER_KEY = 10
+SIGNATURE_LOG_MAX = 65536  # Appended hashes merged into the sorted index file beyond this
+
+# Preprocessed-feature cache (texto_limpio / tokens per review)
+FEATURE_CACHE_PATH = os.path.join(DATA_DIR, "features.db")
+DOC_FREQ_PATH = os.path.join(DATA_DIR, "doc_freq.db")  # Global term -> document frequency table
+
+# Bulk CSV Import (data/raw/dataset_raw.csv schema -> repository schema)
+IMPORT_CHUNK_SIZE = 20000  # CSV rows read, mapped and saved per batch
+CSV_IMPORT_COLUMNS = {
+    'usuario': 'user', 'texto_comentario': 'text', 'puntuacion': 'rating', 'fecha': 'date',
+    'titulo': 'title', 'ubicacion': 'location', 'total_resenas_usuario': 'user_reviews_total',
+    'fecha_sistema': 'timestamp_scraping'
+}
+CSV_IMPORT_PLACEHOLDERS = ("Texto no disponible", "Sin título", "Desconocida")  # Legacy scraper fill values
+
+# Scrape Checkpoints (resumable backfills): only runs asking for this many reviews, or started
+# with resume=True, write one; short interactive scrapes never touch data/checkpoints
+SCRAPE_CHECKPOINT_MIN_REVIEWS = 1000
+CHECKPOINT_DIR = os.path.join(DATA_DIR, "checkpoints")
+
+# Shared HTTP connection pool (keep-alive connections per host)
+HTTP_POOL_MAXSIZE = max(SCRAPE_CONCURRENCY, CRAWL_WORKERS)
+
+# HTTP Cache (Conditional requests for review pages)
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_DIR = os.path.join(DATA_DIR, "http_cache")
+HTTP_CACHE_MAX_BYTES = 200 * 1024 * 1024  # LRU eviction above this size
+HTTP_CACHE_TTL = 24 * 3600  # Seconds before a cached page is fetched unconditionally
+
 # Sentiment Settings
 SENTIMENT_THRESHOLD_POSITIVE = 0.1
 SENTIMENT_THRESHOLD_NEGATIVE = -0.1
 
+# Keyword -> business category (multi-word keywords are allowed)
+CATEGORY_KEYWORDS = {
+    'cliente': 'Servicio al Cliente', 'atención': 'Servicio al Cliente', 'servicio': 'Servicio al Cliente',
+    'soporte': 'Servicio al Cliente', 'ayuda': 'Servicio al Cliente', 'amabilidad': 'Servicio al Cliente',
+    'entrega': 'Logística y Envío', 'pedido': 'Logística y Envío', 'envío': 'Logística y Envío',
+    'transporte': 'Logística y Envío', 'retraso': 'Logística y Envío', 'paquete': 'Logística y Envío',
+    'problema': 'Incidencias', 'error': 'Incidencias', 'fallo': 'Incidencias', 'roto': 'Incidencias',
+    'estafa': 'Seguridad y Fraude', 'fraude': 'Seguridad y Fraude', 'engaño': 'Seguridad y Fraude',
+    'precio': 'Económico', 'dinero': 'Económico', 'coste': 'Económico', 'barato': 'Económico',
+    'calidad': 'Producto', 'material': 'Producto', 'funciona': 'Producto', 'útil': 'Producto',
+    'devolución': 'Postventa', 'reembolso': 'Postventa', 'garantía': 'Postventa'
+}
+
 # Export Filenames
 CSV_RAW_SUFFIX = "_raw_scraped.csv"
 CSV_PROCESSED_SUFFIX = "_processed.csv"
@@ -4,14 +4,16 @@ from textblob import TextBlob
 from googletrans import Translator
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
-from src.config.constants import SENTIMENT_THRESHOLD_POSITIVE, SENTIMENT_THRESHOLD_NEGATIVE
+from typing import Dict, List, Optional, Tuple
+from src.config.constants import SENTIMENT_THRESHOLD_POSITIVE, SENTIMENT_THRESHOLD_NEGATIVE, CATEGORY_KEYWORDS
 
 from src.services.recommender import CollaborativeFilteringService
 from src.services.storage import ModelRegistry
 from src.services.ir_engine import InvertedIndex, VectorSpaceModel
 from src.services.authority import UserAuthorityService
 from src.services.preprocessor import SpanishTextPreprocessor
+from src.services.feature_cache import FeatureCache
+from src.services.keyword_matcher import get_matcher
 
 class SentimentAnalyzerES:
     """Hybrid Multidimensional Sentiment Analysis System."""
@@ -38,8 +40,21 @@ class SentimentAnalyzerES:
         self.ir_model = None
         self.model_registry = ModelRegistry()
 
-    def analyze_batch(self, df: pd.DataFrame, global_corpus: Optional[List[str]] = None) -> pd.DataFrame:
-        """Processes reviews using the hybrid pipeline with optional Global Learning."""
+    def analyze_partial(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Batch-local part of the analysis (needs no corpus-wide statistics), so it can run
+        on each streamed page: normalized rating score and dominant category.
+        """
+        if df.empty: return df
+        df = df.copy()
+        df['rating_score'] = (df['rating'] - 3) / 2
+        df['categoria_predom'] = df['tokens'].apply(self._get_dominant_category)
+        return df
+
+    def analyze_batch(self, df: pd.DataFrame, global_corpus: Optional[List[str]] = None,
+                      doc_frequencies: Optional[Tuple[Dict[str, int], int]] = None) -> pd.DataFrame:
+        """Processes reviews using the hybrid pipeline with optional Global Learning.
+        `doc_frequencies` (term -> df, total docs) supplies global IDF without tokenizing a corpus."""
         if df.empty: return df
 
         # 1. Build IR Engine
@@ -54,11 +69,9 @@ class SentimentAnalyzerES:
         # 1a. Global Learning Phase (Train on History)
         if global_corpus:
             # We use negative IDs for training docs to distinguish from active batch
-            for i, text in enumerate(global_corpus):
-                # We need consistent tokenization. 
-                # This might be slow for huge datasets, but correct for "Learning".
-                # For big data, we would load a pre-computed model.
-                res = self.preprocessor.process_pipeline(text)
+            # Consistent tokenization; texts seen on earlier runs come from the feature cache
+            processed = FeatureCache().process(self.preprocessor, list(global_corpus))
+            for i, res in enumerate(processed):
                 idx.add_document(-(i+1), res['tokens'])
         
         # 1b. Active Batch Indexing
@@ -66,7 +79,8 @@ class SentimentAnalyzerES:
             idx.add_document(i, row['tokens'])
         
         # 1c. Vectorize and Save Model
-        self.ir_model = VectorSpaceModel(idx)
+        global_df, global_docs = doc_frequencies if doc_frequencies else (None, 0)
+        self.ir_model = VectorSpaceModel(idx, global_df=global_df, global_docs=global_docs)
         # Persistent Learning: Save vocabulary and IDF weights
         self.model_registry.save_model("global_vsm", self.ir_model)
         
@@ -139,8 +153,9 @@ class SentimentAnalyzerES:
         res_df = pd.DataFrame(final_results)
         df = pd.concat([df.reset_index(drop=True), res_df], axis=1)
         
-        # Category classification (Existing logic)
-        df['categoria_predom'] = df['tokens'].apply(self._get_dominant_category)
+        # Category classification (Existing logic); reuse streamed results when complete
+        if 'categoria_predom' not in df.columns or df['categoria_predom'].isna().any():
+            df['categoria_predom'] = df['tokens'].apply(self._get_dominant_category)
         
         return df
 
@@ -159,17 +174,6 @@ class SentimentAnalyzerES:
         return pd.DataFrame(interactions)
 
     def _get_dominant_category(self, tokens: List[str]) -> str:
-        categorias_palabras = {
-            'cliente': 'Servicio al Cliente', 'atención': 'Servicio al Cliente', 'servicio': 'Servicio al Cliente',
-            'soporte': 'Servicio al Cliente', 'ayuda': 'Servicio al Cliente', 'amabilidad': 'Servicio al Cliente',
-            'entrega': 'Logística y Envío', 'pedido': 'Logística y Envío', 'envío': 'Logística y Envío',
-            'transporte': 'Logística y Envío', 'retraso': 'Logística y Envío', 'paquete': 'Logística y Envío',
-            'problema': 'Incidencias', 'error': 'Incidencias', 'fallo': 'Incidencias', 'roto': 'Incidencias',
-            'estafa': 'Seguridad y Fraude', 'fraude': 'Seguridad y Fraude', 'engaño': 'Seguridad y Fraude',
-            'precio': 'Económico', 'dinero': 'Económico', 'coste': 'Económico', 'barato': 'Económico',
-            'calidad': 'Producto', 'material': 'Producto', 'funciona': 'Producto', 'útil': 'Producto',
-            'devolución': 'Postventa', 'reembolso': 'Postventa', 'garantía': 'Postventa'
-        }
-        cats = [categorias_palabras.get(w) for w in tokens if w in categorias_palabras]
+        cats = get_matcher(CATEGORY_KEYWORDS).values_found(' '.join(tokens))
         if not cats: return "Opinión General"
         return max(set(cats), key=cats.count)
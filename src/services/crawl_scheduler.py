@@ -0,0 +1,146 @@
+# Professional Streamlit Opinion Intelligence Monitor - Crawl Scheduler Service
+
+import time
+import heapq
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Optional
+import pandas as pd
+from src.config.constants import SCRAPE_MAX_REVIEWS, CRAWL_WORKERS, CRAWL_GLOBAL_RATE
+from src.services.scraper import TrustpilotScraper
+from src.services.throttle import TokenBucket
+from src.services.scrape_metrics import ScrapeMetrics
+
+class _DomainCrawl:
+    """Crawl state of one domain inside the scheduler."""
+
+    def __init__(self, domain: str, order: int, scraper: TrustpilotScraper):
+        self.domain = domain
+        self.order = order
+        self.scraper = scraper
+        self.reviews: List[Dict] = []
+        self.new_on_first_page = 0
+        self.first_page = 1       # Page probed first (later than 1 when resuming a checkpoint)
+        self.last_page = 1
+        self.next_page = 2        # Next page to submit
+        self.next_to_consume = 2  # Pages are consumed strictly in order
+        self.buffer: Dict[int, Optional[List[Dict]]] = {}
+        self.done = False
+
+    def accept(self, page: int, page_reviews: Optional[List[Dict]]):
+        """Hands a fetched page to the scraper's run (checkpoint, dedupe, stop conditions)."""
+        if page_reviews is None:
+            self.done = True
+            return
+        batch, keep_going = self.scraper.accept_page(page, page_reviews)
+        self.reviews.extend(batch)
+        self.done = not keep_going or page >= self.last_page
+
+    @property
+    def priority(self) -> tuple:
+        # Most new reviews first; input order breaks ties
+        return (-self.new_on_first_page, self.order)
+
+class CrawlScheduler:
+    """
+    Crawls several domains over one shared worker pool.
+    Every request passes a global rate limit and the per-host limit of its scraper;
+    domains whose first page shows the most new reviews get workers first.
+    Pages go through each scraper's public run API (begin_run / fetch_page / accept_page /
+    finish_run), so checkpoints, resume and metrics work as in `TrustpilotScraper.scrape_reviews`.
+    """
+
+    def __init__(self, domains: List[str], max_reviews: int = SCRAPE_MAX_REVIEWS,
+                 workers: int = CRAWL_WORKERS, global_rate: float = CRAWL_GLOBAL_RATE,
+                 repository=None, resume: bool = False):
+        self.domains = list(dict.fromkeys(d for d in domains if d))
+        self.max_reviews = max_reviews
+        self.resume = resume  # Continue each domain's interrupted run from its checkpoint
+        self.workers = max(1, int(workers))
+        self.global_limiter = TokenBucket(global_rate)
+        self.repository = repository
+        self.metrics: Dict[str, ScrapeMetrics] = {}  # Per-domain page metrics of the last run
+
+    def run(self) -> Dict[str, pd.DataFrame]:
+        """Returns one DataFrame per input domain, shaped like `TrustpilotScraper.scrape_reviews`."""
+        crawls = []
+        for order, domain in enumerate(self.domains):
+            since = self.repository.get_high_water_mark(domain) if self.repository else None
+            # Every worker may hit the same host, so its shared connection pool is sized to the workers
+            crawl = _DomainCrawl(domain, order, TrustpilotScraper(domain, concurrency=self.workers))
+            crawl.first_page, restored = crawl.scraper.begin_run(self.max_reviews, since, self.resume)
+            crawl.reviews.extend(restored)
+            crawl.done = crawl.scraper.remaining <= 0
+            crawls.append(crawl)
+
+        start = time.monotonic()
+        completed = False
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                self._probe_first_pages(pool, crawls)
+                self._crawl_remaining_pages(pool, crawls)
+            completed = True
+        finally:
+            elapsed = time.monotonic() - start
+            for c in crawls:
+                c.scraper.finish_run(completed, elapsed=elapsed)
+        self.metrics = {c.domain: c.scraper.metrics for c in crawls}
+        return {
+            c.domain: c.scraper.to_dataframe(c.reviews, self.max_reviews)
+            for c in crawls
+        }
+
+    def _fetch(self, crawl: _DomainCrawl, page: int) -> Optional[List[Dict]]:
+        self.global_limiter.acquire()
+        return crawl.scraper.fetch_page(page)
+
+    def _probe_first_pages(self, pool: ThreadPoolExecutor, crawls: List[_DomainCrawl]):
+        """Fetches the first page of every domain to size the crawl and rank domains by new reviews."""
+        futures = {pool.submit(self._fetch, c, c.first_page): c for c in crawls if not c.done}
+        for future, crawl in futures.items():
+            first_page = future.result()
+            if first_page is not None:
+                crawl.last_page = crawl.first_page + crawl.scraper.pages_needed(first_page, crawl.scraper.remaining) - 1
+            restored = len(crawl.reviews)
+            crawl.accept(crawl.first_page, first_page)
+            crawl.new_on_first_page = len(crawl.reviews) - restored
+            crawl.next_page = crawl.next_to_consume = crawl.first_page + 1
+
+    def _crawl_remaining_pages(self, pool: ThreadPoolExecutor, crawls: List[_DomainCrawl]):
+        """Keeps the pool busy with the highest-priority pending pages and consumes results in page order."""
+        ready = [(c.priority, c.order) for c in crawls if not c.done]
+        heapq.heapify(ready)
+        by_order = {c.order: c for c in crawls}
+        pending = {}
+
+        def fill():
+            while len(pending) < self.workers and ready:
+                _, order = heapq.heappop(ready)
+                crawl = by_order[order]
+                if crawl.done or crawl.next_page > crawl.last_page:
+                    continue
+                page = crawl.next_page
+                crawl.next_page += 1
+                pending[pool.submit(self._fetch, crawl, page)] = (crawl, page)
+                if crawl.next_page <= crawl.last_page:
+                    heapq.heappush(ready, (crawl.priority, order))
+
+        fill()
+        while pending:
+            finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in finished:
+                crawl, page = pending.pop(future)
+                crawl.buffer[page] = future.result()
+                self._drain(crawl)
+
+            # Drop queued work of finished domains
+            for future, (crawl, _) in list(pending.items()):
+                if crawl.done and future.cancel():
+                    pending.pop(future)
+            fill()
+
+    def _drain(self, crawl: _DomainCrawl):
+        """Consumes buffered pages of a domain in order until a gap or a stop condition."""
+        while not crawl.done and crawl.next_to_consume in crawl.buffer:
+            page = crawl.next_to_consume
+            crawl.next_to_consume += 1
+            crawl.accept(page, crawl.buffer.pop(page))
@@ -0,0 +1,137 @@
+# Professional Streamlit Opinion Intelligence Monitor - Document Frequency Service
+
+import os
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+from src.config.constants import DATA_DIR, DOC_FREQ_PATH
+from src.services.feature_cache import FeatureCache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS doc_freq (
+    term TEXT PRIMARY KEY,
+    df INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS doc_freq_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_shared_preprocessor = None
+_preprocessor_lock = threading.Lock()
+
+def _get_preprocessor():
+    """Process-wide preprocessor for incremental updates (spaCy/NLTK load only when first needed)."""
+    global _shared_preprocessor
+    with _preprocessor_lock:
+        if _shared_preprocessor is None:
+            from src.services.preprocessor import SpanishTextPreprocessor
+            _shared_preprocessor = SpanishTextPreprocessor()
+        return _shared_preprocessor
+
+def _tokenizer_version(preprocessor) -> str:
+    """Statistics are only valid for the tokenization they were counted with."""
+    return f"{preprocessor.VERSION}:{preprocessor.stopword_fingerprint(preprocessor.stopwords_for(None))}"
+
+class DocumentFrequencyStore:
+    """
+    Persisted global document frequencies (term -> number of stored reviews containing it,
+    plus the total review count) over every domain, with the tokenization the analyzer
+    applies to the global corpus. Repositories add each newly stored review in `save_reviews`,
+    so global IDF is a table load instead of a corpus-wide NLP pass.
+    The table is built from the full corpus once, and again whenever the preprocessor
+    version or stopword set changes.
+    """
+
+    _lock = threading.RLock()
+
+    def __init__(self, db_path: str = DOC_FREQ_PATH):
+        if not os.path.exists(DATA_DIR):
+            os.makedirs(DATA_DIR)
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, timeout=30)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM doc_freq_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def is_built(self) -> bool:
+        return self._meta('version') is not None
+
+    def is_current(self, preprocessor) -> bool:
+        return self._meta('version') == _tokenizer_version(preprocessor)
+
+    def _count(self, texts: Iterable[str], preprocessor) -> Tuple[Counter, int]:
+        texts = [t for t in texts if isinstance(t, str) and t]
+        counts = Counter()
+        for res in FeatureCache().process(preprocessor, texts):
+            counts.update(set(res['tokens']))
+        return counts, len(texts)
+
+    def add_texts(self, texts: Iterable[str], preprocessor=None):
+        """Counts newly stored reviews. Skipped until the table is built (the build counts them)."""
+        texts = [t for t in texts if isinstance(t, str) and t]
+        if not texts:
+            return
+        with DocumentFrequencyStore._lock:
+            if not self.is_built():
+                return
+            preprocessor = preprocessor or _get_preprocessor()
+            if not self.is_current(preprocessor):
+                return  # Rebuilt with the new tokenization on the next load
+            counts, n_docs = self._count(texts, preprocessor)
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO doc_freq (term, df) VALUES (?, ?) "
+                    "ON CONFLICT(term) DO UPDATE SET df = df + excluded.df",
+                    counts.items()
+                )
+                self._conn.execute(
+                    "UPDATE doc_freq_meta SET value = CAST(value AS INTEGER) + ? WHERE key = 'num_docs'", (n_docs,)
+                )
+
+    def rebuild(self, texts: Iterable[str], preprocessor):
+        """Recounts the whole corpus (first use or tokenization change)."""
+        with DocumentFrequencyStore._lock:
+            counts, n_docs = self._count(texts, preprocessor)
+            with self._conn:
+                self._conn.execute("DELETE FROM doc_freq")
+                self._conn.executemany("INSERT INTO doc_freq (term, df) VALUES (?, ?)", counts.items())
+                self._conn.execute("DELETE FROM doc_freq_meta")
+                self._conn.executemany("INSERT INTO doc_freq_meta (key, value) VALUES (?, ?)", [
+                    ('version', _tokenizer_version(preprocessor)), ('num_docs', str(n_docs))
+                ])
+
+    def load(self) -> Tuple[Dict[str, int], int]:
+        """(term -> document frequency, total documents)."""
+        with DocumentFrequencyStore._lock:
+            doc_freq = dict(self._conn.execute("SELECT term, df FROM doc_freq"))
+            return doc_freq, int(self._meta('num_docs') or 0)
+
+def record_document_frequencies(records: Iterable[Dict]):
+    """Adds newly stored reviews to the global statistics; a failure never blocks the save."""
+    try:
+        store = DocumentFrequencyStore()
+        try:
+            store.add_texts(r.get('text') for r in records)
+        finally:
+            store.close()
+    except Exception as e:
+        print(f"Error updating document frequencies: {e}")
+
+def global_document_frequencies(repository, preprocessor) -> Tuple[Dict[str, int], int]:
+    """Global (term -> df, total docs), building the table from the repository corpus when needed."""
+    store = DocumentFrequencyStore()
+    try:
+        with DocumentFrequencyStore._lock:
+            if not store.is_current(preprocessor):
+                store.rebuild(repository.get_global_corpus(), preprocessor)
+        return store.load()
+    finally:
+        store.close()
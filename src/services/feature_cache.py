@@ -0,0 +1,149 @@
+# Professional Streamlit Opinion Intelligence Monitor - Feature Cache Service
+
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+from src.config.constants import DATA_DIR, FEATURE_CACHE_PATH
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS features (
+    domain TEXT NOT NULL,
+    text_hash BLOB NOT NULL,
+    version TEXT NOT NULL,
+    stop_fingerprint TEXT NOT NULL,
+    texto_limpio TEXT,
+    texto_sin_stopwords TEXT,
+    palabras_original INTEGER,
+    palabras_limpias INTEGER,
+    PRIMARY KEY (domain, text_hash)
+);
+CREATE TABLE IF NOT EXISTS stopword_sets (
+    fingerprint TEXT PRIMARY KEY,
+    words TEXT NOT NULL
+);
+"""
+
+_LOOKUP_CHUNK = 500  # Keys per SELECT (SQLite host-parameter limit)
+
+def _text_hash(text) -> bytes:
+    return hashlib.blake2b(str(text).encode('utf-8'), digest_size=16).digest()
+
+class FeatureCache:
+    """
+    Persistent output of `SpanishTextPreprocessor.process_pipeline` per (domain, review text).
+
+    Entries are keyed by a hash of the text and tagged with the preprocessor VERSION (the
+    cleaning step) and the fingerprint of the stopword set they were filtered with. Only
+    texts without an entry, or with an entry of another VERSION, are fully reprocessed.
+    When the stopword set changes, an entry is re-filtered from its stored `texto_limpio`
+    only if one of its words was added to or removed from the set; the rest stay valid.
+    """
+
+    _local = threading.local()
+    _write_lock = threading.Lock()
+
+    def __init__(self, db_path: str = FEATURE_CACHE_PATH):
+        if not os.path.exists(DATA_DIR):
+            os.makedirs(DATA_DIR)
+        self.db_path = db_path
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread and database (sqlite3 connections must not cross threads)."""
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get(self.db_path)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            connections[self.db_path] = conn
+        return conn
+
+    def _lookup(self, domain: str, hashes: List[bytes]) -> Dict[bytes, tuple]:
+        conn = self._connect()
+        rows = {}
+        for start in range(0, len(hashes), _LOOKUP_CHUNK):
+            chunk = hashes[start:start + _LOOKUP_CHUNK]
+            cursor = conn.execute(
+                "SELECT text_hash, version, stop_fingerprint, texto_limpio, texto_sin_stopwords, "
+                "palabras_original, palabras_limpias FROM features "
+                f"WHERE domain = ? AND text_hash IN ({', '.join('?' * len(chunk))})",
+                (domain, *chunk)
+            )
+            for row in cursor:
+                rows[row[0]] = row[1:]
+        return rows
+
+    def _stopword_set(self, fingerprint: str) -> Optional[set]:
+        row = self._connect().execute(
+            "SELECT words FROM stopword_sets WHERE fingerprint = ?", (fingerprint,)
+        ).fetchone()
+        return set(json.loads(row[0])) if row else None
+
+    def process(self, preprocessor, texts: List[str], domain: Optional[str] = None) -> List[Dict]:
+        """`process_pipeline` results for `texts`, computing only what the cache cannot answer."""
+        key_domain = domain or ""
+        stops = preprocessor.stopwords_for(domain)
+        fingerprint = preprocessor.stopword_fingerprint(stops)
+        hashes = [_text_hash(t) for t in texts]
+        cached = self._lookup(key_domain, list(set(hashes)))
+
+        changed_words: Dict[str, Optional[set]] = {}  # Old fingerprint -> words added/removed since
+        results, updates, done = [], [], {}
+        for text, digest in zip(texts, hashes):
+            if digest in done:
+                results.append({'original': text, **done[digest]})
+                continue
+            row = cached.get(digest)
+            features = None
+            if row is not None and row[0] == preprocessor.VERSION:
+                version, old_fingerprint, cleaned, no_stopwords, n_original, n_clean = row
+                if old_fingerprint == fingerprint:
+                    features = (cleaned, no_stopwords, n_original)
+                else:
+                    if old_fingerprint not in changed_words:
+                        old_stops = self._stopword_set(old_fingerprint)
+                        changed_words[old_fingerprint] = (old_stops ^ stops) if old_stops is not None else None
+                    delta = changed_words[old_fingerprint]
+                    if delta is not None and not delta.intersection(cleaned.split()):
+                        features = (cleaned, no_stopwords, n_original)  # Unaffected by the change
+                    else:
+                        no_stopwords = preprocessor.remove_stopwords(cleaned, stops=stops)
+                        features = (cleaned, no_stopwords, n_original)
+                        updates.append((key_domain, digest, version, fingerprint, cleaned, no_stopwords,
+                                        n_original, len(no_stopwords.split())))
+            if features is None:
+                cleaned = preprocessor.clean_text(text)
+                no_stopwords = preprocessor.remove_stopwords(cleaned, stops=stops)
+                features = (cleaned, no_stopwords, len(str(text).split()))
+                updates.append((key_domain, digest, preprocessor.VERSION, fingerprint, cleaned, no_stopwords,
+                                features[2], len(no_stopwords.split())))
+
+            cleaned, no_stopwords, n_original = features
+            tokens = no_stopwords.split()
+            done[digest] = {
+                'texto_limpio': cleaned,
+                'texto_sin_stopwords': no_stopwords,
+                'tokens': tokens,
+                'palabras_original': n_original,
+                'palabras_limpias': len(tokens)
+            }
+            results.append({'original': text, **done[digest]})
+
+        if updates:
+            self._store(fingerprint, stops, updates)
+        return results
+
+    def _store(self, fingerprint: str, stops: set, updates: List[tuple]):
+        conn = self._connect()
+        with FeatureCache._write_lock, conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO stopword_sets (fingerprint, words) VALUES (?, ?)",
+                (fingerprint, json.dumps(sorted(stops), ensure_ascii=False))
+            )
+            conn.executemany("INSERT OR REPLACE INTO features VALUES (?, ?, ?, ?, ?, ?, ?, ?)", updates)
@@ -0,0 +1,76 @@
+# Professional Streamlit Opinion Intelligence Monitor - File Lock Service
+
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, IO
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+def _try_lock(f) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+def _unlock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+@contextmanager
+def file_lock(path: str, blocking: bool = True, poll: float = 0.01) -> Iterator[bool]:
+    """
+    Advisory exclusive lock on `path` (a dedicated lock file) shared by every process on the
+    machine. Only writers take it; readers never do. With `blocking=False` the context
+    yields False instead of waiting when another holder has it.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    f = open(path, 'a+b')
+    try:
+        acquired = _try_lock(f)
+        while not acquired and blocking:
+            time.sleep(poll)
+            acquired = _try_lock(f)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                _unlock(f)
+    finally:
+        f.close()
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'wb', encoding: str = None) -> Iterator[IO]:
+    """
+    Writes `path` through a unique dot-prefixed temp file in the same directory, flushed to disk
+    and renamed over the target on success; readers see the old or the new file, never a partial one.
+    """
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+    f = open(tmp_path, mode, encoding=encoding)
+    try:
+        yield f
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        f.close()
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,264 @@
+# Professional Streamlit Opinion Intelligence Monitor - HTTP Cache Service
+
+import os
+import json
+import time
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from src.config.constants import HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_TTL
+from src.services.file_lock import file_lock, atomic_write
+
+_FILE_SUFFIXES = (".body", ".reviews.json")
+
+class HttpCache:
+    """
+    On-disk conditional-request cache for review pages.
+    Stores the body, the validators (ETag / Last-Modified) and the extraction result per URL,
+    expires entries after a TTL and evicts least-recently-used entries above a size budget.
+    Stores rewrite the index immediately; reads only update the LRU/TTL bookkeeping in memory,
+    which `flush()` persists at the end of a crawl. Processes sharing the directory write under
+    its lock file and merge their changes into the on-disk index instead of overwriting it;
+    eviction also deletes body files no index entry points to, so they count against the budget.
+    """
+
+    _instances: Dict[str, "HttpCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, cache_dir: str = HTTP_CACHE_DIR, max_bytes: int = HTTP_CACHE_MAX_BYTES,
+                 ttl: float = HTTP_CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._lock_path = os.path.join(cache_dir, "index.lock")
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+        self._index: Dict[str, Dict] = self._load_index()
+        # Changes of this process not written to the index yet: stored/touched keys, and
+        # dropped keys with the `stored_at` of the entry that was dropped
+        self._changed = set()
+        self._removed: Dict[str, float] = {}
+        self._dirty = False
+
+    @classmethod
+    def shared(cls, cache_dir: str = HTTP_CACHE_DIR) -> "HttpCache":
+        """Returns the process-wide cache for a directory so scraper instances share one index."""
+        with cls._instances_lock:
+            if cache_dir not in cls._instances:
+                cls._instances[cache_dir] = cls(cache_dir)
+            return cls._instances[cache_dir]
+
+    # --- Index persistence ---
+    def _load_index(self) -> Dict[str, Dict]:
+        if not os.path.exists(self._index_path):
+            return {}
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    @contextmanager
+    def _locked(self):
+        """Thread lock plus the directory's lock file (held by every writer of the cache files)."""
+        with self._lock, file_lock(self._lock_path):
+            yield
+
+    def _save_index(self):
+        """
+        Merges this process's changes into the on-disk index (the newer `stored_at` of a key wins,
+        access times keep the latest), evicts and writes it. Caller holds `_locked()`.
+        """
+        merged = self._load_index()
+        for key, stored_at in self._removed.items():
+            entry = merged.get(key)
+            if entry is not None and entry.get('stored_at', 0) <= stored_at:
+                del merged[key]
+        for key in self._changed:
+            local = self._index.get(key)
+            if local is None:
+                continue
+            disk = merged.get(key)
+            if disk is None or disk.get('stored_at', 0) <= local.get('stored_at', 0):
+                if disk is not None:
+                    local['last_access'] = max(local.get('last_access', 0), disk.get('last_access', 0))
+                merged[key] = local
+            else:
+                disk['last_access'] = max(disk.get('last_access', 0), local.get('last_access', 0))
+        self._index = merged
+        for key in self._removed:
+            if key not in self._index:
+                self._remove_files(key)  # Unless another process stored it again meanwhile
+        self._changed.clear()
+        self._removed.clear()
+        self._evict()
+        with atomic_write(self._index_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        self._dirty = False
+
+    def flush(self):
+        """Persists the access times and expiries recorded by reads since the last write."""
+        with self._lock:
+            if not self._dirty:
+                return
+        with self._locked():
+            if self._dirty:
+                self._save_index()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, key: str):
+        return (os.path.join(self.cache_dir, f"{key}.body"),
+                os.path.join(self.cache_dir, f"{key}.reviews.json"))
+
+    def _remove_files(self, key: str):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _drop(self, key: str):
+        """Forgets an entry; its files go at the next index write (another process may have renewed it)."""
+        entry = self._index.pop(key, None)
+        if entry is not None:
+            self._removed[key] = max(self._removed.get(key, 0), entry.get('stored_at', 0))
+            self._changed.discard(key)
+            self._dirty = True
+
+    def _entry(self, url: str) -> Optional[Dict]:
+        """Returns the live index entry for a URL, dropping it first if the TTL elapsed."""
+        key = self._key(url)
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry['stored_at'] > self.ttl:
+            self._drop(key)
+            return None
+        return entry
+
+    # --- Public API ---
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Validators to send on revalidation (empty if the URL is not cached)."""
+        with self._lock:
+            entry = self._entry(url)
+            if entry is None:
+                return {}
+            headers = {}
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+            return headers
+
+    def get_reviews(self, url: str, extractor_version: str) -> Optional[List[Dict]]:
+        """Cached extraction result, or None if missing or produced by another extractor version."""
+        with self._lock:
+            entry = self._entry(url)
+            if entry is None or entry.get('extractor') != extractor_version:
+                return None
+            _, reviews_path = self._paths(self._key(url))
+            try:
+                with open(reviews_path, 'r', encoding='utf-8') as f:
+                    reviews = json.load(f)
+            except Exception:
+                return None
+            entry['last_access'] = time.time()
+            self._changed.add(self._key(url))
+            self._dirty = True
+            return reviews
+
+    def get_body(self, url: str) -> Optional[bytes]:
+        """Cached raw body (lets a newer extractor re-parse after a 304)."""
+        with self._lock:
+            if self._entry(url) is None:
+                return None
+            body_path, _ = self._paths(self._key(url))
+            try:
+                with open(body_path, 'rb') as f:
+                    return f.read()
+            except Exception:
+                return None
+
+    def store(self, url: str, response, reviews: List[Dict], extractor_version: str):
+        """Stores a 200 response together with its extraction result."""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return  # Nothing to revalidate against
+
+        with self._locked():
+            key = self._key(url)
+            body_path, reviews_path = self._paths(key)
+            with atomic_write(body_path) as f:
+                f.write(response.content)
+            with atomic_write(reviews_path, 'w', encoding='utf-8') as f:
+                json.dump(reviews, f, ensure_ascii=False)
+
+            now = time.time()
+            self._index[key] = {
+                'url': url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'extractor': extractor_version,
+                'stored_at': now,
+                'last_access': now,
+                'size': os.path.getsize(body_path) + os.path.getsize(reviews_path)
+            }
+            self._removed.pop(key, None)
+            self._changed.add(key)
+            self._save_index()
+
+    def update_reviews(self, url: str, reviews: List[Dict], extractor_version: str):
+        """Replaces the extraction result of a cached body (after re-parsing it)."""
+        with self._locked():
+            key = self._key(url)
+            entry = self._index.get(key)
+            if entry is None:
+                return
+            body_path, reviews_path = self._paths(key)
+            with atomic_write(reviews_path, 'w', encoding='utf-8') as f:
+                json.dump(reviews, f, ensure_ascii=False)
+            entry['extractor'] = extractor_version
+            entry['last_access'] = time.time()
+            entry['size'] = os.path.getsize(body_path) + os.path.getsize(reviews_path)
+            self._changed.add(key)
+            self._save_index()
+
+    def _remove_orphans(self):
+        """Deletes cached files whose index entry was lost (crash, or an older unmerged writer)."""
+        for name in os.listdir(self.cache_dir):
+            if name.startswith('.'):
+                continue  # In-flight atomic writes
+            for suffix in _FILE_SUFFIXES:
+                if name.endswith(suffix) and name[:-len(suffix)] not in self._index:
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        pass
+
+    def _evict(self):
+        """Drops orphan files, then least-recently-used entries until the cache fits its size budget (lock held)."""
+        self._remove_orphans()
+        total = sum(e.get('size', 0) for e in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._index.items(), key=lambda kv: kv[1].get('last_access', 0)):
+            if total <= self.max_bytes:
+                break
+            total -= entry.get('size', 0)
+            del self._index[key]
+            self._remove_files(key)
+
+    def clear(self):
+        """Removes every cached entry."""
+        with self._locked():
+            self._index = self._load_index()  # Entries stored by other processes too
+            for key in list(self._index):
+                self._drop(key)
+            self._save_index()
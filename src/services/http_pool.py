@@ -0,0 +1,144 @@
+# Professional Streamlit Opinion Intelligence Monitor - HTTP Connection Pool Service
+
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+from src.config.constants import HTTP_POOL_MAXSIZE
+
+def transport_retry() -> Retry:
+    """Transport-level retries (connection errors, 5xx); 429/503 go through the adaptive throttle."""
+    return Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=[500, 502, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=False,  # Otherwise urllib3 would swallow 429/503 itself
+        raise_on_status=False
+    )
+
+class ConnectionStats:
+    """Thread-safe per-host counters of TCP/TLS connections opened vs taken warm from the pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, host: str, created: int = 0, checkouts: int = 0):
+        with self._lock:
+            counts = self._hosts.setdefault(host, {'created': 0, 'checkouts': 0})
+            counts['created'] += created
+            counts['checkouts'] += checkouts
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """{host: {'created', 'reused', 'requests'}}; every checkout that did not open a connection is a reuse."""
+        with self._lock:
+            return {
+                host: {
+                    'created': c['created'],
+                    'reused': max(0, c['checkouts'] - c['created']),
+                    'requests': c['checkouts']
+                }
+                for host, c in self._hosts.items()
+            }
+
+_stats = ConnectionStats()
+
+class _CountingPoolMixin:
+    def _new_conn(self):
+        _stats.record(self.host, created=1)
+        return super()._new_conn()
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+        _stats.record(self.host, checkouts=1)
+        return conn
+
+class _CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+class _CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    pass
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose urllib3 pools report connection creation and reuse to `ConnectionStats`."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+
+class SessionPool:
+    """
+    Process-wide `requests.Session` per host, shared by every scraper instance, thread and
+    Streamlit session, so keep-alive connections survive across runs instead of each
+    scraper paying a fresh TCP/TLS handshake. Sessions are only configured at creation;
+    per-request headers must be passed to `get`.
+    """
+
+    _instance: Optional["SessionPool"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, default_pool_size: int = HTTP_POOL_MAXSIZE):
+        self.default_pool_size = max(1, int(default_pool_size))
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._pool_sizes: Dict[str, int] = {}
+
+    @classmethod
+    def shared(cls) -> "SessionPool":
+        """Returns the process-wide pool."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return urlparse(url).netloc or url
+
+    def session_for(self, url: str, pool_size: int = 1, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+        """
+        Shared session for the host of `url`, with room for at least `pool_size` concurrent
+        connections. `headers` become the session defaults when the session is first created.
+        """
+        host = self._host(url)
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                if headers:
+                    session.headers.update(headers)
+                self._sessions[host] = session
+            self._ensure_capacity(host, session, pool_size)
+            return session
+
+    def ensure_capacity(self, url: str, pool_size: int):
+        """Grows the host pool ahead of a run that will use `pool_size` concurrent requests."""
+        self.session_for(url, pool_size)
+
+    def _ensure_capacity(self, host: str, session: requests.Session, pool_size: int):
+        size = max(self.default_pool_size, int(pool_size))
+        if size <= self._pool_sizes.get(host, 0):
+            return
+        # A bigger pool needs a new adapter; the old one keeps serving requests already in flight
+        adapter = PooledHTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=transport_retry())
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        self._pool_sizes[host] = size
+
+    def pool_size(self, url: str) -> int:
+        with self._lock:
+            return self._pool_sizes.get(self._host(url), 0)
+
+    def stats(self, url: Optional[str] = None) -> Dict:
+        """Connections created vs reused, per host (or for the host of `url`)."""
+        snapshot = _stats.snapshot()
+        if url is None:
+            return snapshot
+        return snapshot.get(urlparse(url).hostname or url, {'created': 0, 'reused': 0, 'requests': 0})
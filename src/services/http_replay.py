@@ -0,0 +1,78 @@
+# Professional Streamlit Opinion Intelligence Monitor - HTTP Record/Replay Service
+
+import os
+import json
+import hashlib
+from typing import Dict, Optional
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+def fixture_key(url: str) -> str:
+    """Stable file stem for a URL inside a fixtures directory."""
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+def save_fixture(fixtures_dir: str, url: str, status: int, headers: Dict[str, str], body: bytes):
+    """Writes one recorded response as <key>.json (metadata) + <key>.body (raw bytes)."""
+    os.makedirs(fixtures_dir, exist_ok=True)
+    key = fixture_key(url)
+    with open(os.path.join(fixtures_dir, f"{key}.body"), 'wb') as f:
+        f.write(body)
+    with open(os.path.join(fixtures_dir, f"{key}.json"), 'w', encoding='utf-8') as f:
+        json.dump({'url': url, 'status': status, 'headers': dict(headers)}, f, ensure_ascii=False, indent=2)
+
+def load_fixture(fixtures_dir: str, url: str) -> Optional[Dict]:
+    """Reads a recorded response, or None if the URL was never recorded."""
+    key = fixture_key(url)
+    meta_path = os.path.join(fixtures_dir, f"{key}.json")
+    body_path = os.path.join(fixtures_dir, f"{key}.body")
+    if not os.path.exists(meta_path) or not os.path.exists(body_path):
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    with open(body_path, 'rb') as f:
+        meta['body'] = f.read()
+    return meta
+
+class RecordingAdapter(HTTPAdapter):
+    """Transport adapter that performs real requests and saves every response as a fixture."""
+
+    def __init__(self, fixtures_dir: str, **kwargs):
+        super().__init__(**kwargs)
+        self.fixtures_dir = fixtures_dir
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        # Headers describing the wire encoding no longer apply to the decoded body
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() not in ('content-encoding', 'transfer-encoding', 'content-length')}
+        save_fixture(self.fixtures_dir, request.url, response.status_code, headers, response.content)
+        return response
+
+class ReplayAdapter(BaseAdapter):
+    """Local stand-in for the remote site: serves recorded fixtures, 404 for anything unknown."""
+
+    def __init__(self, fixtures_dir: str):
+        super().__init__()
+        self.fixtures_dir = fixtures_dir
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        fixture = load_fixture(self.fixtures_dir, request.url)
+
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        response.encoding = 'utf-8'
+        if fixture is None:
+            response.status_code = 404
+            response.headers = CaseInsensitiveDict()
+            response._content = b""
+        else:
+            response.status_code = fixture['status']
+            response.headers = CaseInsensitiveDict(fixture.get('headers', {}))
+            response._content = fixture['body']
+        response.reason = "OK" if response.status_code == 200 else "Replay"
+        return response
+
+    def close(self):
+        pass
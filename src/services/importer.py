@@ -0,0 +1,90 @@
+# Professional Streamlit Opinion Intelligence Monitor - CSV Import Service
+
+import time
+import pandas as pd
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from src.config.constants import IMPORT_CHUNK_SIZE, CSV_IMPORT_COLUMNS, CSV_IMPORT_PLACEHOLDERS
+from src.services.keyword_matcher import get_matcher
+from src.services.scraper import TrustpilotScraper
+from src.services.storage import get_repository
+
+class CsvReviewImporter:
+    """
+    Bulk import of review exports in the `data/raw/dataset_raw.csv` schema into a review repository.
+    The file is read `chunk_size` rows at a time; each chunk is mapped onto the record schema the
+    scraper produces and stored with one `save_reviews` call, so memory stays bounded by the chunk
+    and duplicates (already stored or repeated in the file) are dropped by the repository's
+    content signatures. Rows without review text (legacy "Texto no disponible") are skipped, and
+    so are rows with neither `fecha` nor `fecha_sistema`: the date is part of the signature, so
+    dating them at import time would store them again on every re-import.
+    """
+
+    def __init__(self, domain: str, repository=None, chunk_size: int = IMPORT_CHUNK_SIZE,
+                 column_map: Dict[str, str] = CSV_IMPORT_COLUMNS):
+        self.domain = domain
+        self.repository = repository or get_repository()
+        self.chunk_size = chunk_size
+        self.column_map = column_map
+        self.keywords = get_matcher(TrustpilotScraper.ECOMMERCE_KEYWORDS)
+
+    def map_chunk(self, chunk: pd.DataFrame) -> Tuple[pd.DataFrame, int, int]:
+        """CSV rows -> repository records (same fields as the scraper). Returns (records, rows without text, undated rows)."""
+        df = chunk.rename(columns=self.column_map)
+        for column in self.column_map.values():
+            if column not in df.columns:
+                df[column] = ""
+        df = df[list(dict.fromkeys(self.column_map.values()))]
+        df = df.apply(lambda col: col.str.strip().replace(list(CSV_IMPORT_PLACEHOLDERS), ""))
+
+        df['text'] = df['text'].str.replace(r'\s+', ' ', regex=True)
+        valid = df['text'] != ""
+        skipped = int((~valid).sum())
+        df = df[valid].copy()
+        df['date'] = df['date'].mask(df['date'] == "", df['timestamp_scraping'].str[:10])
+        dated = df['date'] != ""
+        undated = int((~dated).sum())
+        df = df[dated].copy()
+        if df.empty:
+            return df, skipped, undated
+
+        df['user'] = df['user'].mask(df['user'] == "", "Anónimo")
+        df['user_id'] = df['user']  # Using name as ID, as the scraper does
+        # Missing or unparsable ratings get the scraper's neutral default
+        df['rating'] = pd.to_numeric(df['rating'], errors='coerce').round().clip(1, 5).fillna(3).astype(int)
+        df['user_reviews_total'] = pd.to_numeric(df['user_reviews_total'], errors='coerce').fillna(0).astype(int)
+        df['timestamp_scraping'] = df['timestamp_scraping'].mask(df['timestamp_scraping'] == "", datetime.now().isoformat())
+        # Rows repeated within the chunk share a content signature; drop them before the per-row work
+        df = df.drop_duplicates(subset=['user', 'date', 'text'])
+        df['product_id'] = self.domain
+        df['domain'] = self.domain
+        df['keywords'] = [", ".join(self.keywords.matches(text)[:5]) or "Ninguna" for text in df['text']]
+        df['longitud'] = df['text'].str.count(' ') + 1
+        return df, skipped, undated
+
+    def iter_import(self, path: str) -> Iterator[Dict]:
+        """Imports the file chunk by chunk, yielding the running totals after each stored chunk."""
+        stats = {'rows': 0, 'imported': 0, 'duplicates': 0, 'skipped': 0, 'undated': 0, 'seconds': 0.0, 'rows_per_sec': 0.0}
+        start = time.perf_counter()
+        reader = pd.read_csv(path, chunksize=self.chunk_size, dtype=str, keep_default_na=False,
+                             encoding='utf-8-sig', usecols=lambda c: c in self.column_map)
+        with reader:
+            for chunk in reader:
+                records, skipped, undated = self.map_chunk(chunk)
+                added = self.repository.save_reviews(self.domain, records) if not records.empty else 0
+                stats['rows'] += len(chunk)
+                stats['skipped'] += skipped
+                stats['undated'] += undated
+                stats['imported'] += added
+                stats['duplicates'] += len(chunk) - skipped - undated - added
+                stats['seconds'] = time.perf_counter() - start
+                stats['rows_per_sec'] = stats['rows'] / stats['seconds'] if stats['seconds'] else 0.0
+                yield dict(stats)
+
+    def run(self, path: str, progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Imports the whole file; `progress` receives the running totals after every chunk."""
+        stats = {'rows': 0, 'imported': 0, 'duplicates': 0, 'skipped': 0, 'undated': 0, 'seconds': 0.0, 'rows_per_sec': 0.0}
+        for stats in self.iter_import(path):
+            if progress:
+                progress(stats)
+        return stats
@@ -1,6 +1,6 @@
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Set, Tuple
+from typing import List, Dict, Set, Tuple, Optional
 from collections import Counter
 import math
 
@@ -31,12 +31,15 @@ class InvertedIndex:
         return len(self.index.get(term, []))
 
 class VectorSpaceModel:
-    """Implements TF-IDF and Cosine Similarity for sentiment analysis."""
-    def __init__(self, index: InvertedIndex):
+    """Implements TF-IDF and Cosine Similarity for sentiment analysis.
+    `global_df` / `global_docs` add precomputed corpus statistics (DocumentFrequencyStore)
+    to the document frequencies of the index, without indexing the corpus itself."""
+    def __init__(self, index: InvertedIndex, global_df: Optional[Dict[str, int]] = None, global_docs: int = 0):
         self.index = index
         self.vocab = sorted(list(index.get_vocabulary()))
         self.term_to_idx = {term: i for i, term in enumerate(self.vocab)}
-        self.num_docs = index.num_docs
+        self.global_df = global_df or {}
+        self.num_docs = index.num_docs + global_docs
 
     def get_tf(self, count: int) -> float:
         """TF = 1 + log2(f_ij) if f_ij > 0 else 0"""
@@ -44,9 +47,30 @@ class VectorSpaceModel:
             return 1 + math.log2(count)
         return 0
 
+    def to_arrays(self) -> Tuple[Dict[str, np.ndarray], Dict]:
+        """Registry export: vocabulary and its IDF vector (the postings are not needed to vectorize)."""
+        idf = np.array([self.get_idf(term) for term in self.vocab], dtype=np.float64)
+        vocab = np.array(self.vocab, dtype=str) if self.vocab else np.array([], dtype='<U1')
+        return {'vocab': vocab, 'idf': idf}, {'num_docs': self.num_docs}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], meta: Dict) -> 'VectorSpaceModel':
+        """Model restored from `to_arrays` output; IDF is read from the stored vector."""
+        model = cls.__new__(cls)
+        model.index = None
+        model.vocab = [str(t) for t in arrays['vocab']]
+        model.term_to_idx = {term: i for i, term in enumerate(model.vocab)}
+        model.global_df = {}
+        model.num_docs = meta.get('num_docs', 0)
+        model.idf_vector = arrays['idf']
+        return model
+
     def get_idf(self, term: str) -> float:
         """IDF = log2(N/n_i)"""
-        n_i = self.index.get_df(term)
+        if self.index is None:  # Restored from the registry
+            i = self.term_to_idx.get(term)
+            return float(self.idf_vector[i]) if i is not None else 0
+        n_i = self.index.get_df(term) + self.global_df.get(term, 0)
         if n_i == 0:
             return 0
         idf = math.log2(self.num_docs / n_i)
@@ -0,0 +1,101 @@
+# Professional Streamlit Opinion Intelligence Monitor - Keyword Matcher Service
+
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Tuple, Union
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == '_'
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a keyword set: finds every keyword (single or multi-word)
+    in one pass over the text, regardless of how many keywords there are.
+    Hits are only reported on word boundaries, so 'pago' does not match inside 'pagodas'.
+    """
+
+    def __init__(self, patterns: Union[Dict[str, str], Iterable[str]]):
+        # pattern -> value reported on a hit (the pattern itself for plain lists)
+        if isinstance(patterns, dict):
+            items = [(p.lower(), v) for p, v in patterns.items()]
+        else:
+            items = [(p.lower(), p) for p in patterns]
+        self.patterns: List[str] = [p for p, _ in items if p]
+        self.values: List[str] = [v for p, v in items if p]
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for idx, pattern in enumerate(self.patterns):
+            self._insert(pattern, idx)
+        self._build_failure_links()
+
+    def _insert(self, pattern: str, idx: int):
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(idx)
+
+    def _build_failure_links(self):
+        pending = deque(self._goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for ch, child in self._goto[node].items():
+                pending.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                # Inherit the outputs reachable through the failure link
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """All word-bounded hits as (start offset, pattern index), in text order."""
+        text = text.lower()
+        hits = []
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        length = len(text)
+        for pos, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            end = pos + 1
+            if end < length and _is_word_char(text[end]):
+                continue
+            for idx in out[node]:
+                start = end - len(self.patterns[idx])
+                if start == 0 or not _is_word_char(text[start - 1]):
+                    hits.append((start, idx))
+        return hits
+
+    def matches(self, text: str) -> List[str]:
+        """Distinct matched patterns, in the order they were given to the matcher."""
+        found = {idx for _, idx in self.find_all(text)}
+        return [self.patterns[idx] for idx in sorted(found)]
+
+    def values_found(self, text: str) -> List[str]:
+        """Value of every hit (repeated per occurrence), e.g. the category of each keyword."""
+        return [self.values[idx] for _, idx in self.find_all(text)]
+
+_matchers: Dict[tuple, KeywordMatcher] = {}
+_matchers_lock = threading.Lock()
+
+def get_matcher(patterns: Union[Dict[str, str], Iterable[str]]) -> KeywordMatcher:
+    """Returns the compiled matcher for a keyword set, building it only once per process."""
+    key = tuple(patterns.items()) if isinstance(patterns, dict) else tuple(patterns)
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is None:
+            matcher = KeywordMatcher(patterns)
+            _matchers[key] = matcher
+        return matcher
@@ -0,0 +1,127 @@
+# Professional Streamlit Opinion Intelligence Monitor - Streaming Pipeline Service
+
+import queue
+import threading
+from typing import Dict, Iterator, Optional
+import pandas as pd
+from src.config.constants import PIPELINE_QUEUE_SIZE, SCRAPE_MAX_REVIEWS
+from src.services.scraper import TrustpilotScraper
+from src.services.preprocessor import SpanishTextPreprocessor
+from src.services.feature_cache import FeatureCache
+from src.services.analyzer import SentimentAnalyzerES
+
+_END = object()  # Marks the end of a stage's output
+
+class _StageError:
+    """Carries an exception from a worker stage to the consumer."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+class StreamingAnalysisPipeline:
+    """
+    Scrape -> Preprocess -> Analyze as concurrent stages joined by bounded queues.
+    Each page travels through the stages on its own, so the first analyzed batch is
+    available after the first page; full queues block the upstream stage (backpressure),
+    keeping at most `queue_size` batches buffered per stage.
+    """
+
+    def __init__(self, domain: str, max_reviews: int = SCRAPE_MAX_REVIEWS,
+                 since: Optional[Dict] = None, queue_size: int = PIPELINE_QUEUE_SIZE,
+                 scraper: Optional[TrustpilotScraper] = None,
+                 preprocessor: Optional[SpanishTextPreprocessor] = None,
+                 analyzer: Optional[SentimentAnalyzerES] = None,
+                 repository=None, resume: bool = False):
+        self.domain = domain
+        self.max_reviews = max_reviews
+        self.since = since
+        self.queue_size = max(1, int(queue_size))
+        self.scraper = scraper or TrustpilotScraper(domain)
+        self.preprocessor = preprocessor or SpanishTextPreprocessor()
+        self.analyzer = analyzer or SentimentAnalyzerES()
+        self.repository = repository  # Optional: persist each raw batch as it arrives
+        self.resume = resume  # Continue an interrupted scrape from its checkpoint
+        self._stop = threading.Event()
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Blocking put that gives up if the consumer went away."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        """Blocking get that returns the end marker if the consumer went away."""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _scrape_stage(self, out_q: queue.Queue):
+        try:
+            for df_batch in self.scraper.iter_review_batches(self.max_reviews, since=self.since,
+                                                             resume=self.resume):
+                if self.repository is not None:
+                    self.repository.save_reviews(self.domain, df_batch)
+                if not self._put(out_q, df_batch):
+                    return
+        except Exception as e:
+            self._put(out_q, _StageError(e))
+        finally:
+            self._put(out_q, _END)
+
+    def _preprocess_stage(self, in_q: queue.Queue, out_q: queue.Queue):
+        try:
+            while True:
+                item = self._get(in_q)
+                if item is _END or isinstance(item, _StageError):
+                    self._put(out_q, item)
+                    return
+                processed = FeatureCache().process(self.preprocessor, list(item['text']), domain=self.domain)
+                df_proc = pd.DataFrame(processed)
+                df_merged = pd.concat([item.reset_index(drop=True), df_proc.drop(columns=['original'])], axis=1)
+                if not self._put(out_q, df_merged):
+                    return
+        except Exception as e:
+            self._put(out_q, _StageError(e))
+
+    def run(self) -> Iterator[pd.DataFrame]:
+        """Yields preprocessed batches with the batch-local analysis columns, one per page."""
+        raw_q = queue.Queue(maxsize=self.queue_size)
+        processed_q = queue.Queue(maxsize=self.queue_size)
+        workers = [
+            threading.Thread(target=self._scrape_stage, args=(raw_q,), daemon=True),
+            threading.Thread(target=self._preprocess_stage, args=(raw_q, processed_q), daemon=True),
+        ]
+        self._stop.clear()
+        for worker in workers:
+            worker.start()
+
+        try:
+            while True:
+                item = processed_q.get()
+                if item is _END:
+                    break
+                if isinstance(item, _StageError):
+                    raise item.error
+                yield self.analyzer.analyze_partial(item)
+        finally:
+            # Unblocks the stages if the consumer stops early
+            self._stop.set()
+            for q in (raw_q, processed_q):
+                while not q.empty():
+                    q.get_nowait()
+            for worker in workers:
+                worker.join(timeout=5)
+
+    def collect(self) -> pd.DataFrame:
+        """Runs the stream to completion and returns every batch concatenated."""
+        batches = list(self.run())
+        if not batches:
+            return pd.DataFrame()
+        return pd.concat(batches, ignore_index=True)
@@ -5,12 +5,16 @@ import spacy.cli
 import nltk
 from nltk.corpus import stopwords
 import re
+import hashlib
 import unicodedata
 from typing import List, Optional, Dict
 import pandas as pd
 
 class SpanishTextPreprocessor:
     """Service specialized for NLP preprocessing of Spanish e-commerce reviews."""
+
+    # Bump when clean_text changes: cached features of other versions are recomputed
+    VERSION = "1"
     
     def __init__(self):
         # NLTK Stopwords
@@ -72,11 +76,8 @@ class SpanishTextPreprocessor:
         text = ' '.join(text.split())
         return text
 
-    def remove_stopwords(self, text: str, domain: Optional[str] = None) -> str:
-        """Removes stopwords, short words, and optionally domain-specific noise."""
-        if not text: return ""
-        tokens = text.split()
-        
+    def stopwords_for(self, domain: Optional[str] = None) -> set:
+        """Stopword set applied to a domain's reviews (base list plus domain-name noise)."""
         current_stops = self.stop_words.copy()
         if domain:
             # Aggressive domain filtering (e.g., 'amazon.es' -> 'amazon', 'es', 'amazones')
@@ -91,7 +92,19 @@ class SpanishTextPreprocessor:
             # 3. Add variations (plurals, common misspellings if needed)
             current_stops.add(main_name + 'es') # e.g., amazones
             current_stops.add(main_name + 's')  # e.g., amazons
-            
+        return current_stops
+
+    @staticmethod
+    def stopword_fingerprint(stops: set) -> str:
+        """Stable identifier of a stopword set (cache invalidation)."""
+        return hashlib.blake2b("\n".join(sorted(stops)).encode('utf-8'), digest_size=8).hexdigest()
+
+    def remove_stopwords(self, text: str, domain: Optional[str] = None, stops: Optional[set] = None) -> str:
+        """Removes stopwords, short words, and optionally domain-specific noise."""
+        if not text: return ""
+        tokens = text.split()
+        
+        current_stops = stops if stops is not None else self.stopwords_for(domain)
         filtered = [w for w in tokens if w not in current_stops and len(w) > 2]
         return ' '.join(filtered)
 
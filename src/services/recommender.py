@@ -1,6 +1,6 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 class CollaborativeFilteringService:
     """Implements User-to-User and Item-to-Item filtering for sentiment prediction."""
@@ -10,6 +10,39 @@ class CollaborativeFilteringService:
         self.user_similarity = None
         self.item_similarity = None
 
+    def to_arrays(self) -> Optional[Tuple[Dict[str, np.ndarray], Dict]]:
+        """Registry export: user-item matrix, its labels and any similarity matrix.
+        Returns None (pickle fallback) when the labels are not all strings."""
+        if self.user_item_matrix is None:
+            return None
+        users, items = list(self.user_item_matrix.index), list(self.user_item_matrix.columns)
+        if not all(isinstance(label, str) for label in users + items):
+            return None
+        arrays = {
+            'matrix': self.user_item_matrix.to_numpy(dtype=np.float64),
+            'users': np.array(users, dtype=str) if users else np.array([], dtype='<U1'),
+            'items': np.array(items, dtype=str) if items else np.array([], dtype='<U1'),
+        }
+        for key in ('user_similarity', 'item_similarity'):
+            value = getattr(self, key)
+            if value is not None:
+                arrays[key] = np.asarray(value, dtype=np.float64)
+        return arrays, {'index_name': self.user_item_matrix.index.name,
+                        'columns_name': self.user_item_matrix.columns.name}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], meta: Dict) -> 'CollaborativeFilteringService':
+        """Service restored from `to_arrays` output (the matrix stays memory-mapped until refit)."""
+        service = cls()
+        service.user_item_matrix = pd.DataFrame(
+            arrays['matrix'], index=[str(u) for u in arrays['users']],
+            columns=[str(i) for i in arrays['items']], copy=False
+        ).rename_axis(index=meta.get('index_name'), columns=meta.get('columns_name'))
+        for key in ('user_similarity', 'item_similarity'):
+            if key in arrays:
+                setattr(service, key, arrays[key])
+        return service
+
     def fit(self, df: pd.DataFrame):
         """Builds user-item matrix from reviews (user_id, product_id, score)."""
         self.user_item_matrix = df.pivot_table(index='user_id', columns='product_id', values='sentimiento_score').fillna(0)
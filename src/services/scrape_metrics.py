@@ -0,0 +1,96 @@
+# Professional Streamlit Opinion Intelligence Monitor - Scrape Metrics Service
+
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+import pandas as pd
+
+class PageMetrics:
+    """What happened to one listing page: network, parsing and yield."""
+
+    def __init__(self, page: int):
+        self.page = page
+        self.status: Optional[int] = None
+        self.source = "network"        # network | cache (304, stored extraction) | reparse (304, stored body)
+        self.attempts = 0              # Requests sent, including throttled retries
+        self.latency = 0.0             # Seconds spent in HTTP requests
+        self.throttle_wait = 0.0       # Seconds waiting for the rate limiter / backoff
+        self.bytes = 0
+        self.parse_time = 0.0
+        self.cards_found = 0
+        self.reviews_extracted = 0
+        self.selector: Optional[str] = None  # Card selector variant that matched, or 'json' for the embedded payload
+        self.failed = False            # Error the run stopped on (5xx, retries exhausted, exception); not the final 404
+
+    def record_parse(self, stats: Dict, reviews: int):
+        self.parse_time = stats['parse_time']
+        self.cards_found = stats['cards_found']
+        self.selector = stats['selector']
+        self.reviews_extracted = reviews
+
+    def to_dict(self) -> Dict:
+        return dict(self.__dict__)
+
+class ScrapeMetrics:
+    """
+    Per-page metrics of one scraping run plus the aggregated summary.
+    Pages are added from the fetch threads, so additions are locked.
+    """
+
+    def __init__(self, domain: str):
+        self.domain = domain
+        self.elapsed = 0.0
+        self._pages: List[PageMetrics] = []
+        self._lock = threading.Lock()
+
+    def new_page(self, page: int) -> PageMetrics:
+        metrics = PageMetrics(page)
+        with self._lock:
+            self._pages.append(metrics)
+        return metrics
+
+    @property
+    def pages(self) -> List[PageMetrics]:
+        with self._lock:
+            return sorted(self._pages, key=lambda m: m.page)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """One row per page, in page order."""
+        return pd.DataFrame([m.to_dict() for m in self.pages])
+
+    def summary(self) -> Dict:
+        """Run totals and averages; tells whether time went to the network, throttling or parsing."""
+        pages = self.pages
+        latencies = sorted(m.latency for m in pages if m.attempts)
+        parsed = [m for m in pages if m.cards_found or m.reviews_extracted]
+        cards = sum(m.cards_found for m in pages)
+        reviews = sum(m.reviews_extracted for m in pages)
+        return {
+            'domain': self.domain,
+            'pages': len(pages),
+            'pages_failed': sum(1 for m in pages if m.failed),
+            'requests': sum(m.attempts for m in pages),
+            'bytes': sum(m.bytes for m in pages),
+            'network_time': sum(latencies),
+            'latency_mean': sum(latencies) / len(latencies) if latencies else 0.0,
+            'latency_p95': latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else 0.0,
+            'throttle_wait': sum(m.throttle_wait for m in pages),
+            'parse_time': sum(m.parse_time for m in pages),
+            'parse_mean': sum(m.parse_time for m in parsed) / len(parsed) if parsed else 0.0,
+            'cards_found': cards,
+            'reviews_extracted': reviews,
+            'yield': reviews / cards if cards else 0.0,
+            'selectors': dict(Counter(m.selector for m in pages if m.selector)),
+            'sources': dict(Counter(m.source for m in pages)),
+            'elapsed': self.elapsed,
+            'reviews_per_s': reviews / self.elapsed if self.elapsed > 0 else 0.0,
+        }
+
+    def format_summary(self) -> str:
+        """One-line run summary for the logs."""
+        s = self.summary()
+        return (f"{s['domain']}: {s['pages']} pages ({s['pages_failed']} failed), {s['requests']} requests, "
+                f"{s['bytes'] / 1024:.0f} KiB | network {s['network_time']:.2f}s "
+                f"(mean {s['latency_mean'] * 1000:.0f} ms, p95 {s['latency_p95'] * 1000:.0f} ms), "
+                f"throttle {s['throttle_wait']:.2f}s, parse {s['parse_time']:.2f}s | "
+                f"{s['reviews_extracted']}/{s['cards_found']} cards -> reviews, selectors {s['selectors']}")
@@ -1,118 +1,284 @@
 # Professional Streamlit Opinion Intelligence Monitor - Scraper Service
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import pandas as pd
 import time
 import re
-from typing import List, Dict, Optional
+import json
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from urllib.parse import urlparse
+from typing import List, Dict, Optional, Iterator, Tuple
 from datetime import datetime
-from src.config.constants import TRUSTPILOT_BASE_URL, SCRAPE_REVIEWS_PER_PAGE, TRUSTPILOT_SELECTORS
+from src.config.constants import (
+    TRUSTPILOT_BASE_URL, SCRAPE_REVIEWS_PER_PAGE, TRUSTPILOT_SELECTORS,
+    SCRAPE_CONCURRENCY, SCRAPE_PARSE_WORKERS, SCRAPE_CHECKPOINT_MIN_REVIEWS,
+    SCRAPE_RATE_INITIAL, SCRAPE_RATE_MAX, SCRAPE_MAX_RETRIES, HTTP_CACHE_ENABLED
+)
+from src.services.storage import content_hash, ScrapeCheckpoint
+from src.services.http_cache import HttpCache
+from src.services.http_replay import RecordingAdapter, ReplayAdapter
+from src.services.http_pool import SessionPool, transport_retry
+from src.services.scrape_metrics import ScrapeMetrics, PageMetrics
+from src.services.keyword_matcher import get_matcher
+from src.services.throttle import AdaptiveTokenBucket, parse_retry_after, backoff_delay
 
-class TrustpilotScraper:
-    """Service specialized for Trustpilot.com (Dynamic Analysis) as implemented in Laboratory Mode."""
-    
-    def __init__(self, domain: str):
-        self.domain = domain.lower().replace(" ", "").replace("https://", "").replace("http://", "").split('/')[0]
-        self.base_url = f"{TRUSTPILOT_BASE_URL}{self.domain}"
-        self.session = requests.Session()
-        
-        # Realistic headers form the notebook
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        })
+# Statuses the server uses to ask us to slow down (handled by the adaptive throttle)
+THROTTLE_STATUSES = (429, 503)
+
+# lxml is several times faster than the stdlib parser; keep html.parser as fallback
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Embedded page payload (Next.js); matched on raw bytes so no tree is built for it
+_NEXT_DATA_RE = re.compile(rb'<script[^>]*\bid="__NEXT_DATA__"[^>]*>(.*?)</script>', re.DOTALL)
+
+# Simple selector forms we can turn into a SoupStrainer: tag[attr="v"], tag[attr], tag.class
+_SIMPLE_SELECTOR_RE = re.compile(r'^(\w+)(?:\[([\w-]+)(?:="([^"]*)")?\]|\.([\w-]+))?$')
+
+class ExtractionPlan:
+    """
+    Compiled extraction plan for one domain: remembers which fallback selector variant
+    matched for each field so later pages and cards try it first.
+    """
+
+    _plans: Dict[str, "ExtractionPlan"] = {}
+    _plans_lock = threading.Lock()
+
+    def __init__(self):
+        self.chosen: Dict[str, str] = {}
+        self._strainers: Dict[str, Optional[SoupStrainer]] = {}
+
+    @classmethod
+    def for_domain(cls, domain: str) -> "ExtractionPlan":
+        """Returns the process-wide plan for a domain."""
+        with cls._plans_lock:
+            if domain not in cls._plans:
+                cls._plans[domain] = cls()
+            return cls._plans[domain]
+
+    def ordered(self, field: str) -> List[str]:
+        """Selectors for a field, with the one that matched last time first."""
+        selectors = TRUSTPILOT_SELECTORS[field]
+        chosen = self.chosen.get(field)
+        if chosen is None:
+            return selectors
+        return [chosen] + [s for s in selectors if s != chosen]
+
+    def remember(self, field: str, selector: str):
+        self.chosen[field] = selector
+
+    def forget(self, field: str):
+        self.chosen.pop(field, None)
+
+    def card_strainer(self) -> Optional[SoupStrainer]:
+        """SoupStrainer that keeps only the known review-card variant (None until one matched)."""
+        selector = self.chosen.get('review_card')
+        if selector is None:
+            return None
+        if selector not in self._strainers:
+            self._strainers[selector] = self._compile_strainer(selector)
+        return self._strainers[selector]
+
+    @staticmethod
+    def _compile_strainer(selector: str) -> Optional[SoupStrainer]:
+        match = _SIMPLE_SELECTOR_RE.match(selector)
+        if not match:
+            return None
+        tag, attr, value, css_class = match.groups()
+        if attr:
+            return SoupStrainer(tag, attrs={attr: value if value is not None else True})
+        if css_class:
+            return SoupStrainer(tag, class_=css_class)
+        return SoupStrainer(tag)
+
+def normalize_space(value) -> str:
+    """Collapses whitespace runs (newlines included) into single spaces; both extraction paths apply it to text and user."""
+    return ' '.join(str(value or '').split())
+
+class ReviewPageParser:
+    """
+    Parse-only half of the scraper: listing page bytes -> review records for one domain, using
+    (and teaching) the domain's extraction plan. Holds no network, cache or checkpoint state,
+    so parser processes build it for nothing.
+    """
+
+    # Multi-word entries are allowed; matching respects word boundaries
+    ECOMMERCE_KEYWORDS = (
+        'cliente', 'entrega', 'problema', 'servicio', 'pedido',
+        'devolución', 'reembolso', 'atención', 'producto', 'contacto',
+        'cancelación', 'retraso', 'garantía', 'envío', 'pago',
+        'estafa', 'fraude', 'repartidor', 'locker', 'prime'
+    )
+
+    def __init__(self, domain: str, plan: Optional[ExtractionPlan] = None):
+        self.domain = domain
+        self.plan = plan or ExtractionPlan.for_domain(domain)
 
     def safe_extract(self, element, selector: str, attribute: str = None, default: str = ""):
-        """Safely extracts data from an HTML element."""
+        """Safely extracts data from an HTML element (text nodes joined by single spaces)."""
         try:
             found = element.select_one(selector)
             if not found:
                 return default
             if attribute:
                 return found.get(attribute, default)
-            return found.get_text(strip=True)
+            return found.get_text(" ", strip=True)
         except Exception:
             return default
 
     def extract_keywords(self, text: str, top_n: int = 5) -> List[str]:
-        """Extracts relevant keywords from review text (E-commerce focused)."""
-        ecommerce_keywords = [
-            'cliente', 'entrega', 'problema', 'servicio', 'pedido',
-            'devolución', 'reembolso', 'atención', 'producto', 'contacto',
-            'cancelación', 'retraso', 'garantía', 'envío', 'pago',
-            'estafa', 'fraude', 'repartidor', 'locker', 'prime'
-        ]
-        text_lower = text.lower()
-        found_keywords = [kw for kw in ecommerce_keywords if kw in text_lower]
-        return found_keywords[:top_n]
-
-    def scrape_reviews(self, max_reviews: int = 50) -> pd.DataFrame:
-        """Executes full scraping across multiple pages."""
-        all_reviews = []
-        target_pages = (max_reviews // 20) + 1  # 20 per page average
-        
-        for page in range(1, target_pages + 1):
-            url = f"{self.base_url}?page={page}"
+        """Extracts relevant keywords from review text (E-commerce focused) in a single pass."""
+        return get_matcher(self.ECOMMERCE_KEYWORDS).matches(text)[:top_n]
+
+    def parse(self, content: bytes) -> Tuple[List[Dict], Dict]:
+        """
+        Turns the HTML of a listing page into review records (embedded JSON first, DOM as fallback),
+        plus {'parse_time', 'cards_found', 'selector'} for the page metrics.
+        """
+        start = time.perf_counter()
+        raw_count, page_reviews = self._extract_from_next_data(content)
+        if page_reviews is not None:
+            return page_reviews, {'parse_time': time.perf_counter() - start,
+                                  'cards_found': raw_count, 'selector': 'json'}
+
+        strainer = self.plan.card_strainer()
+        if strainer is not None:
+            # Only build the tree for review cards of the variant seen before
+            soup = BeautifulSoup(content, HTML_PARSER, parse_only=strainer)
+            page_reviews_elements, selector = self._select_cards(soup)
+            if not page_reviews_elements:
+                # Layout changed: forget the variant and rediscover it on the full page
+                self.plan.forget('review_card')
+                soup = BeautifulSoup(content, HTML_PARSER)
+                page_reviews_elements, selector = self._select_cards(soup)
+        else:
+            soup = BeautifulSoup(content, HTML_PARSER)
+            page_reviews_elements, selector = self._select_cards(soup)
+
+        page_reviews = []
+        for element in page_reviews_elements:
+            review_data = self._extract_review_details(element, self.plan)
+            if review_data:
+                page_reviews.append(review_data)
+        return page_reviews, {'parse_time': time.perf_counter() - start,
+                              'cards_found': len(page_reviews_elements), 'selector': selector}
+
+    def _extract_from_next_data(self, content: bytes) -> Tuple[int, Optional[List[Dict]]]:
+        """
+        Reads the reviews from the __NEXT_DATA__ blob as (raw entries, reviews).
+        Reviews are None if the blob is missing or unusable.
+        """
+        match = _NEXT_DATA_RE.search(content)
+        if not match:
+            return 0, None
+        try:
+            data = json.loads(match.group(1))
+        except ValueError:
+            return 0, None
+
+        raw_reviews = self._find_reviews_payload(data)
+        if raw_reviews is None:
+            return 0, None
+
+        page_reviews = []
+        for raw in raw_reviews:
+            review_data = self._review_from_json(raw)
+            if review_data:
+                page_reviews.append(review_data)
+        return len(raw_reviews), page_reviews
+
+    @classmethod
+    def _find_reviews_payload(cls, data, depth: int = 0) -> Optional[List[Dict]]:
+        """Locates the review list: props.pageProps.reviews, else the first list of review-like dicts."""
+        if depth == 0:
+            reviews = data.get('props', {}).get('pageProps', {}).get('reviews') if isinstance(data, dict) else None
+            if isinstance(reviews, list):
+                return reviews
+        if depth > 6:
+            return None
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if key == 'reviews' and isinstance(value, list) and \
+                        all(isinstance(r, dict) and 'text' in r and 'rating' in r for r in value):
+                    return value
+                found = cls._find_reviews_payload(value, depth + 1)
+                if found is not None:
+                    return found
+        return None
+
+    def _review_from_json(self, raw: Dict) -> Optional[Dict]:
+        """Maps one embedded JSON review onto the same record schema as `_extract_review_details`."""
+        try:
+            text = normalize_space(raw.get('text'))
+            if not text: return None
+
+            consumer = raw.get('consumer') or {}
+            user_name = normalize_space(consumer.get('displayName')) or "Anónimo"
+
             try:
-                response = self.session.get(url, timeout=15)
-                if response.status_code != 200:
-                    break
-                    
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Use constants
-                review_selectors = TRUSTPILOT_SELECTORS['review_card']
-                
-                page_reviews_elements = []
-                for selector in review_selectors:
-                    elements = soup.select(selector)
-                    if elements:
-                        page_reviews_elements = elements
-                        break
-                
-                for element in page_reviews_elements:
-                    review_data = self._extract_review_details(element)
-                    if review_data:
-                        all_reviews.append(review_data)
-                        
-                if len(all_reviews) >= max_reviews:
-                    break
-                    
-                time.sleep(1.5) # Rate limiting
-                
-            except Exception as e:
-                print(f"⚠️ Error on page {page}: {e}")
-                break
-                
-        df = pd.DataFrame(all_reviews)
-        if not df.empty:
-            df = df.head(max_reviews)
-            df['longitud'] = df['text'].apply(lambda x: len(str(x).split()))
-            df['timestamp_scraping'] = datetime.now().isoformat()
-        return df
+                rating = int(raw.get('rating', 3))
+            except (TypeError, ValueError):
+                rating = 3
+
+            dates = raw.get('dates') or {}
+            date_str = dates.get('publishedDate') or dates.get('experiencedDate') or ""
+
+            keywords = self.extract_keywords(text)
+
+            return {
+                "user_id": user_name,  # Using name as ID for simplicity
+                "user": user_name,
+                "text": text,
+                "rating": rating,
+                "product_id": self.domain, # Using domain as item ID
+                "date": date_str if date_str else datetime.now().strftime('%Y-%m-%d'),
+                "keywords": ", ".join(keywords) if keywords else "Ninguna",
+                "domain": self.domain
+            }
+        except Exception:
+            return None
+
+    def _select_cards(self, soup) -> Tuple[list, Optional[str]]:
+        """Finds the review cards and the selector variant that matched, trying the remembered one first."""
+        for selector in self.plan.ordered('review_card'):
+            elements = soup.select(selector)
+            if elements:
+                self.plan.remember('review_card', selector)
+                return elements, selector
+        return [], None
+
+    def _extract_review_details(self, element, plan: Optional[ExtractionPlan] = None) -> Optional[Dict]:
+        """Extracts structured data from a single review element (plan = remembered selector variants)."""
+        def selectors(field):
+            return plan.ordered(field) if plan else TRUSTPILOT_SELECTORS[field]
 
-    def _extract_review_details(self, element) -> Optional[Dict]:
-        """Extracts structured data from a single review element."""
         try:
-            # Text selectors from constants
+            # Text selectors from constants: a match over 10 chars wins (and is remembered);
+            # otherwise the first non-empty match is kept, so short reviews are not lost
             text = ""
-            for selector in TRUSTPILOT_SELECTORS['text']:
-                text = self.safe_extract(element, selector)
-                if text and len(text) > 10:
+            for selector in selectors('text'):
+                candidate = normalize_space(self.safe_extract(element, selector))
+                if candidate and len(candidate) > 10:
+                    text = candidate
+                    if plan: plan.remember('text', selector)
                     break
+                text = text or candidate
             
             if not text: return None
 
             # User selectors
             user_name = "Anónimo"
-            for selector in TRUSTPILOT_SELECTORS['user']:
-                user_name = self.safe_extract(element, selector)
-                if user_name: break
+            for selector in selectors('user'):
+                user_name = normalize_space(self.safe_extract(element, selector))
+                if user_name:
+                    if plan: plan.remember('user', selector)
+                    break
 
             # Rating logic (Robust Multi-language)
             rating = 3 
@@ -145,9 +311,11 @@ class TrustpilotScraper:
 
             # Date selectors
             date_str = ""
-            for selector in TRUSTPILOT_SELECTORS['date']:
+            for selector in selectors('date'):
                 date_str = self.safe_extract(element, selector, 'datetime')
-                if date_str: break
+                if date_str:
+                    if plan: plan.remember('date', selector)
+                    break
             
             # Keywords
             keywords = self.extract_keywords(text)
@@ -164,3 +332,459 @@ class TrustpilotScraper:
             }
         except Exception:
             return None
+
+def parse_listing_page(domain: str, content: bytes, plan: Optional[ExtractionPlan] = None) -> Tuple[List[Dict], Dict]:
+    """Listing page bytes -> (review records, parse stats) with the domain's (or the given) extraction plan."""
+    return ReviewPageParser(domain, plan).parse(content)
+
+class TrustpilotScraper:
+    """Service specialized for Trustpilot.com (Dynamic Analysis) as implemented in Laboratory Mode."""
+
+    # Bump whenever extraction output changes so cached results get re-parsed
+    EXTRACTOR_VERSION = "4"
+
+    ECOMMERCE_KEYWORDS = ReviewPageParser.ECOMMERCE_KEYWORDS  # Also used by the CSV importer
+    
+    # Realistic headers form the notebook
+    BROWSER_HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
+        'DNT': '1',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1'
+    }
+
+    def __init__(self, domain: str, concurrency: int = SCRAPE_CONCURRENCY,
+                 parse_workers: int = SCRAPE_PARSE_WORKERS, throttle: bool = True, initial_rate: float = SCRAPE_RATE_INITIAL,
+                 max_rate: float = SCRAPE_RATE_MAX, max_retries: int = SCRAPE_MAX_RETRIES,
+                 use_cache: bool = HTTP_CACHE_ENABLED, checkpoint: bool = True,
+                 record_dir: Optional[str] = None, replay_dir: Optional[str] = None):
+        """
+        `record_dir` saves every raw response as a fixture; `replay_dir` serves fixtures instead of the live site.
+        `checkpoint=False` disables checkpoints even for long or resumed runs.
+        """
+        self.domain = domain.lower().replace(" ", "").replace("https://", "").replace("http://", "").split('/')[0]
+        self.base_url = f"{TRUSTPILOT_BASE_URL}{self.domain}"
+        self.concurrency = max(1, int(concurrency))
+        self.parse_workers = max(0, int(parse_workers))
+        self.max_retries = max_retries
+        # One adaptive bucket per host, shared by every scraper instance and worker (the first one's settings apply)
+        self.throttle = AdaptiveTokenBucket.for_host(
+            urlparse(self.base_url).netloc, rate=initial_rate, max_rate=max_rate
+        ) if throttle else None
+        self.requests_made = 0
+        self.run_elapsed = 0.0
+        self.metrics = ScrapeMetrics(self.domain)  # Per-page metrics of the last run
+        self._counter_lock = threading.Lock()
+        # Replayed pages must always be parsed, so the conditional cache is bypassed
+        self.http_cache = HttpCache.shared() if use_cache and not replay_dir else None
+        self.plan = ExtractionPlan.for_domain(self.domain)
+        # Page cursor of the current run, so an interrupted backfill can resume (opened by begin_run)
+        self.use_checkpoint = checkpoint
+        self.checkpoint: Optional[ScrapeCheckpoint] = None
+        self._page_failed = False
+        # Per-run state of the page API (begin_run / accept_page / finish_run)
+        self.remaining = 0
+        self._run_since: Optional[Dict] = None
+        self._run_max_reviews = 0
+        self._run_start = 0.0
+
+        if replay_dir or record_dir:
+            # Record/replay runs keep a private session so fixtures never mix with the shared pool
+            if replay_dir:
+                adapter = ReplayAdapter(replay_dir)
+            else:
+                adapter = RecordingAdapter(record_dir, max_retries=transport_retry())
+            self.session = requests.Session()
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+            self.session.headers.update(self.BROWSER_HEADERS)
+        else:
+            # Warm keep-alive connections shared with every other scraper of this host
+            self.session = SessionPool.shared().session_for(
+                self.base_url, pool_size=self.concurrency, headers=self.BROWSER_HEADERS
+            )
+
+    def scrape_reviews(self, max_reviews: int = 50, concurrency: Optional[int] = None,
+                       since: Optional[Dict] = None, parse_workers: Optional[int] = None,
+                       resume: bool = False, return_metrics: bool = False):
+        """
+        Executes full scraping across multiple pages (serial or concurrent).
+        `since` is the repository high-water mark ({'date', 'signatures', 'count'}); when given,
+        only unseen reviews are returned and pagination stops at the first page that is already
+        stored, unless the stored history is still shorter than `max_reviews` (backfill).
+        `parse_workers` > 0 moves HTML parsing to a process pool (threads only download).
+        `resume=True` continues an interrupted run from its last completed page.
+        `return_metrics=True` returns (DataFrame, ScrapeMetrics) instead of the DataFrame alone.
+        """
+        all_reviews = [r for batch in self.iter_page_batches(max_reviews, concurrency, since, parse_workers, resume)
+                       for r in batch]
+        df = self.to_dataframe(all_reviews, max_reviews)
+        return (df, self.metrics) if return_metrics else df
+
+    def iter_review_batches(self, max_reviews: int = 50, concurrency: Optional[int] = None,
+                            since: Optional[Dict] = None, parse_workers: Optional[int] = None,
+                            resume: bool = False) -> Iterator[pd.DataFrame]:
+        """Streaming variant of `scrape_reviews`: yields one DataFrame per page as soon as it is parsed."""
+        for batch in self.iter_page_batches(max_reviews, concurrency, since, parse_workers, resume):
+            yield self.to_dataframe(batch, len(batch))
+
+    def iter_page_batches(self, max_reviews: int = 50, concurrency: Optional[int] = None,
+                          since: Optional[Dict] = None, parse_workers: Optional[int] = None,
+                          resume: bool = False) -> Iterator[List[Dict]]:
+        """
+        Yields the new reviews of each page, in page order, until `max_reviews` or a stop condition.
+        Runs of at least SCRAPE_CHECKPOINT_MIN_REVIEWS reviews (or with `resume=True`) checkpoint
+        every completed page; the checkpoint is removed only when the run ends without a failed
+        page. With `resume=True` the reviews of the interrupted run are yielded first and
+        pagination continues after its last completed page.
+        """
+        concurrency = concurrency or self.concurrency
+        parse_workers = self.parse_workers if parse_workers is None else parse_workers
+        start_page, restored = self.begin_run(max_reviews, since, resume)
+        completed = False
+        try:
+            if restored:
+                yield restored
+            pages = self._iter_pages(self.remaining, concurrency, parse_workers, start_page) if self.remaining > 0 else ()
+            for page, page_reviews in enumerate(pages, start_page):
+                batch, keep_going = self.accept_page(page, page_reviews)
+                if batch:
+                    yield batch
+                if not keep_going:
+                    break
+            completed = True
+        finally:
+            self.finish_run(completed)
+
+    # --- Per-page crawl API (shared by iter_page_batches and the CrawlScheduler) ---
+
+    def begin_run(self, max_reviews: int, since: Optional[Dict] = None,
+                  resume: bool = False) -> Tuple[int, List[Dict]]:
+        """
+        Starts a run: resets counters and metrics and opens the checkpoint. Returns the first page
+        to fetch and, with `resume=True`, the reviews of the interrupted run (already accepted).
+        """
+        self.requests_made = 0
+        self._page_failed = False
+        self.metrics = ScrapeMetrics(self.domain)
+        self._run_start = time.monotonic()
+        self._run_since = since
+        self._run_max_reviews = max_reviews
+        long_run = resume or max_reviews >= SCRAPE_CHECKPOINT_MIN_REVIEWS
+        self.checkpoint = ScrapeCheckpoint(self.domain) if self.use_checkpoint and long_run else None
+
+        start_page, restored = 1, []
+        state = self.checkpoint.load() if resume and self.checkpoint else None
+        if state:
+            start_page = state['last_page'] + 1
+            restored = state['reviews'][:max_reviews]
+            print(f"⏯️ Resuming {self.domain} from page {start_page} ({len(restored)} reviews restored)")
+        elif self.checkpoint:
+            self.checkpoint.start(max_reviews)
+        self.remaining = max_reviews - len(restored)
+        return start_page, restored
+
+    def fetch_page(self, page: int) -> Optional[List[Dict]]:
+        """Downloads and parses one listing page. None stops pagination; errors are logged and fail the run."""
+        try:
+            return self._fetch_page_reviews(page)
+        except Exception as e:
+            print(f"⚠️ Error on {self.domain} page {page}: {e}")
+            self._page_failed = True
+            return None
+
+    def accept_page(self, page: int, page_reviews: List[Dict]) -> Tuple[List[Dict], bool]:
+        """
+        Consumes a fetched page (pages must come in order): returns its unseen reviews, up to what
+        the run still needs, and whether pagination should go on. The page is checkpointed.
+        """
+        new_reviews = self._new_reviews(page_reviews, self._run_since)
+        batch = new_reviews[:max(self.remaining, 0)]
+        self.remaining -= len(batch)
+        if self.checkpoint:
+            self.checkpoint.record_page(page, batch)
+        if self._reached_known_history(page_reviews, new_reviews, self._run_since, self._run_max_reviews):
+            return batch, False  # Everything from here on is already in the repository
+        return batch, self.remaining > 0
+
+    def finish_run(self, completed: bool = True, elapsed: Optional[float] = None):
+        """
+        Ends a run: the checkpoint is removed only if the run completed without a failed page;
+        flushes the cache bookkeeping and reports the rate. `elapsed` overrides the run's wall time.
+        """
+        if completed and not self._page_failed and self.checkpoint:
+            self.checkpoint.clear()
+        if self.http_cache:
+            self.http_cache.flush()  # LRU bookkeeping of the cache hits of this run
+        self.run_elapsed = time.monotonic() - self._run_start if elapsed is None else elapsed
+        self.metrics.elapsed = self.run_elapsed
+        self._report_rate()
+
+    def _iter_pages(self, max_reviews: int, concurrency: int, parse_workers: int = 0,
+                    start_page: int = 1) -> Iterator[List[Dict]]:
+        """Yields the parsed reviews of every page in order; stops at the first failed page."""
+        # The first page is always fetched alone: it tells us the real page size
+        first_page = self.fetch_page(start_page)
+        if first_page is None:
+            return
+
+        yield first_page
+        last_page = start_page + self.pages_needed(first_page, max_reviews) - 1
+        if last_page <= start_page:
+            return
+        if parse_workers > 0:
+            # Workers start with the selector variants learned on page 1
+            with ProcessPoolExecutor(max_workers=parse_workers, initializer=_init_parse_worker,
+                                     initargs=(self.domain, dict(self.plan.chosen))) as parse_pool:
+                yield from self._iter_pages_concurrent(start_page + 1, last_page, concurrency,
+                                                       parse_pool, parse_workers)
+        elif concurrency <= 1:
+            yield from self._iter_pages_serial(start_page + 1, last_page)
+        else:
+            yield from self._iter_pages_concurrent(start_page + 1, last_page, concurrency)
+
+    @property
+    def effective_rate(self) -> float:
+        """Requests per second reached during the last run."""
+        return self.requests_made / self.run_elapsed if self.run_elapsed > 0 else 0.0
+
+    def _report_rate(self):
+        if self.throttle:
+            connections = SessionPool.shared().stats(self.base_url)
+            print(f"📶 {self.domain}: {self.requests_made} requests at {self.effective_rate:.2f} req/s effective "
+                  f"(adaptive limit {self.throttle.rate:.2f}, peak {self.throttle.peak_rate:.2f}, "
+                  f"throttled {self.throttle.throttled_count}x; connections {connections['created']} new, "
+                  f"{connections['reused']} reused)")
+        print(f"⏱️ {self.metrics.format_summary()}")
+
+    @staticmethod
+    def pages_needed(first_page: List[Dict], max_reviews: int) -> int:
+        """Pages needed for `max_reviews`, sized from the real count seen on page 1."""
+        per_page = len(first_page) or SCRAPE_REVIEWS_PER_PAGE
+        return max(1, math.ceil(max_reviews / per_page))
+
+    @staticmethod
+    def to_dataframe(all_reviews: List[Dict], max_reviews: int) -> pd.DataFrame:
+        """Builds the result DataFrame with the derived scraping columns."""
+        df = pd.DataFrame(all_reviews)
+        if not df.empty:
+            df = df.head(max_reviews)
+            df['longitud'] = df['text'].apply(lambda x: len(str(x).split()))
+            df['timestamp_scraping'] = datetime.now().isoformat()
+        return df
+
+    @staticmethod
+    def _is_known(review: Dict, since: Optional[Dict]) -> bool:
+        """True if the review is already stored (by content signature; its date says nothing)."""
+        return bool(since) and content_hash(review) in since.get('signatures', ())
+
+    @staticmethod
+    def _reached_known_history(page_reviews: List[Dict], new_reviews: List[Dict],
+                               since: Optional[Dict], max_reviews: int) -> bool:
+        """
+        Early stop: the whole page is stored and none of it is newer than the high-water mark,
+        so the following (older) pages were stored by an earlier run. Not applied while the stored
+        history holds fewer than `max_reviews` reviews, so a partial first crawl can be backfilled.
+        """
+        if not since or not page_reviews or new_reviews:
+            return False
+        if since.get('count', 0) < max_reviews:
+            return False
+        hwm_date = since.get('date') or ""
+        return all(str(r.get('date', '')) <= hwm_date for r in page_reviews)
+
+    def _new_reviews(self, page_reviews: List[Dict], since: Optional[Dict]) -> List[Dict]:
+        """Reviews of a page that are not in the repository yet."""
+        return [r for r in page_reviews if not self._is_known(r, since)]
+
+    def _iter_pages_serial(self, first_page: int, last_page: int) -> Iterator[List[Dict]]:
+        """One page at a time; pacing comes from the adaptive throttle."""
+        for page in range(first_page, last_page + 1):
+            page_reviews = self.fetch_page(page)
+            if page_reviews is None:
+                return
+            yield page_reviews
+
+    def _iter_pages_concurrent(self, first_page: int, last_page: int, concurrency: int,
+                               parse_pool: Optional[ProcessPoolExecutor] = None,
+                               parse_workers: int = 0) -> Iterator[List[Dict]]:
+        """
+        Keeps up to `concurrency` page requests in flight and yields them in page order.
+        With a `parse_pool`, fetch threads only download and hand the bytes to parser processes.
+        """
+        in_flight = {}
+        next_page = first_page
+        # Enough pages ahead to keep every parser process busy as well
+        window = concurrency + parse_workers
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            def submit_next():
+                nonlocal next_page
+                if next_page <= last_page:
+                    if parse_pool is None:
+                        in_flight[next_page] = pool.submit(self.fetch_page, next_page)
+                    else:
+                        in_flight[next_page] = pool.submit(self._download_and_dispatch, next_page, parse_pool)
+                    next_page += 1
+
+            try:
+                for _ in range(window):
+                    submit_next()
+
+                page = first_page
+                while page in in_flight:
+                    future = in_flight.pop(page)
+                    try:
+                        page_reviews = future.result()
+                        if parse_pool is not None:
+                            page_reviews = self._resolve_download(page_reviews)
+                    except Exception as e:
+                        print(f"⚠️ Error on page {page}: {e}")
+                        self._page_failed = True
+                        page_reviews = None
+
+                    if page_reviews is None:
+                        break
+                    # Refill before yielding so downloads overlap with the consumer's work
+                    submit_next()
+                    yield page_reviews
+                    page += 1
+            finally:
+                # Pages beyond the stop point (or after the consumer stopped) are no longer needed
+                for future in in_flight.values():
+                    future.cancel()
+
+    def _get(self, url: str, headers: Optional[Dict] = None, metrics: Optional[PageMetrics] = None):
+        """
+        Throttled GET. On 429/503 the adaptive bucket slows down and pauses for the
+        Retry-After (or a jittered exponential backoff) before retrying. Only 2xx/304
+        responses raise the rate; other errors (404, 5xx) leave it unchanged.
+        Returns the last response, even if it is still a throttling status.
+        """
+        metrics = metrics or PageMetrics(0)
+        response = None
+        for attempt in range(self.max_retries + 1):
+            wait_start = time.perf_counter()
+            if self.throttle:
+                self.throttle.acquire()
+            request_start = time.perf_counter()
+            metrics.throttle_wait += request_start - wait_start
+            response = self.session.get(url, timeout=15, headers=headers)
+            metrics.latency += time.perf_counter() - request_start
+            metrics.attempts += 1
+            with self._counter_lock:
+                self.requests_made += 1
+
+            status = response.status_code
+            if status not in THROTTLE_STATUSES:
+                if self.throttle and (200 <= status < 300 or status == 304):
+                    self.throttle.on_success()
+                return response
+
+            delay = backoff_delay(attempt, parse_retry_after(response.headers.get('Retry-After')))
+            if attempt == self.max_retries:
+                break
+            wait_start = time.perf_counter()
+            if self.throttle:
+                self.throttle.on_throttled(delay)
+            else:
+                time.sleep(delay)
+            metrics.throttle_wait += time.perf_counter() - wait_start
+        return response
+
+    def _fetch_page_reviews(self, page: int) -> Optional[List[Dict]]:
+        """Downloads and parses one listing page. Returns None when pagination must stop."""
+        download = self._download_page(page)
+        if download is None or 'reviews' in download:
+            return None if download is None else download['reviews']
+        page_reviews, stats = parse_listing_page(self.domain, download['body'], self.plan)
+        download['metrics'].record_parse(stats, len(page_reviews))
+        self._remember_parsed(download, page_reviews)
+        return page_reviews
+
+    def _download_page(self, page: int) -> Optional[Dict]:
+        """
+        Fetch half of `_fetch_page_reviews`. Returns None when pagination must stop,
+        {'reviews': ...} when the cache already holds the extraction, or
+        {'url', 'body', 'response', 'metrics'} for bytes that still need parsing.
+        """
+        url = f"{self.base_url}?page={page}"
+        metrics = self.metrics.new_page(page)
+
+        headers = self.http_cache.conditional_headers(url) if self.http_cache else {}
+        try:
+            response = self._get(url, headers=headers, metrics=metrics)
+        except Exception:
+            metrics.failed = True
+            raise
+        metrics.status = response.status_code
+        metrics.bytes = len(response.content)
+
+        if response.status_code == 304 and self.http_cache:
+            # Not modified: reuse the stored extraction without parsing
+            cached = self.http_cache.get_reviews(url, self.EXTRACTOR_VERSION)
+            if cached is not None:
+                metrics.source = "cache"
+                metrics.reviews_extracted = len(cached)
+                return {'reviews': cached}
+            body = self.http_cache.get_body(url)
+            if body is not None:
+                metrics.source = "reparse"
+                return {'url': url, 'body': body, 'response': None, 'metrics': metrics}
+            # Cache entry vanished meanwhile: fetch the full page again
+            try:
+                response = self._get(url, metrics=metrics)
+            except Exception:
+                metrics.failed = True
+                raise
+            metrics.status = response.status_code
+            metrics.bytes += len(response.content)
+
+        if response.status_code != 200:
+            if response.status_code != 404:  # 404 is the normal end of pagination
+                print(f"⚠️ Page {page} of {self.domain} returned HTTP {response.status_code}; stopping with partial data")
+                self._page_failed = True
+                metrics.failed = True
+            return None
+
+        return {'url': url, 'body': response.content, 'response': response, 'metrics': metrics}
+
+    def _remember_parsed(self, download: Dict, page_reviews: List[Dict]):
+        """Stores a fresh extraction in the HTTP cache (or refreshes a re-parsed cached body)."""
+        if not self.http_cache:
+            return
+        if download['response'] is not None:
+            self.http_cache.store(download['url'], download['response'], page_reviews, self.EXTRACTOR_VERSION)
+        else:
+            self.http_cache.update_reviews(download['url'], page_reviews, self.EXTRACTOR_VERSION)
+
+    def _download_and_dispatch(self, page: int, parse_pool: ProcessPoolExecutor) -> Optional[Dict]:
+        """Fetch-thread task: downloads a page and queues its bytes on the parser processes."""
+        download = self._download_page(page)
+        if download is not None and 'reviews' not in download:
+            download['parsed'] = parse_pool.submit(parse_page_bytes, self.domain, download['body'])
+        return download
+
+    def _resolve_download(self, download: Optional[Dict]) -> Optional[List[Dict]]:
+        """Waits for the parser process of a dispatched download and returns its reviews."""
+        if download is None or 'reviews' in download:
+            return None if download is None else download['reviews']
+        page_reviews, stats = download['parsed'].result()
+        download['metrics'].record_parse(stats, len(page_reviews))
+        self._remember_parsed(download, page_reviews)
+        return page_reviews
+
+    def _parse_page(self, content: bytes) -> List[Dict]:
+        """Turns the HTML of a listing page into review records (embedded JSON first, DOM as fallback)."""
+        return parse_listing_page(self.domain, content, self.plan)[0]
+
+# --- Parser worker processes (fetch/parse split) ---
+def _init_parse_worker(domain: str, chosen_selectors: Dict[str, str]):
+    """Seeds a parser process with the selector variants the parent already learned."""
+    ExtractionPlan.for_domain(domain).chosen.update(chosen_selectors)
+
+def parse_page_bytes(domain: str, content: bytes) -> Tuple[List[Dict], Dict]:
+    """Process-pool entry point: listing page bytes -> (review dicts, parse stats), as `parse_listing_page`."""
+    return parse_listing_page(domain, content)
@@ -0,0 +1,337 @@
+# Professional Streamlit Opinion Intelligence Monitor - Segment Store Service
+
+import os
+import re
+import io
+import gzip
+import json
+import time
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+from src.services.file_lock import file_lock, atomic_write
+from src.config.constants import SEGMENT_MAX_BYTES, SEGMENT_COMPACT_MIN, SEGMENT_COMPACT_TARGET, SEGMENT_GC_GRACE
+
+try:
+    import zstandard
+except ImportError:  # Optional: only needed for HISTORY_COLD_COMPRESSION = "zstd"
+    zstandard = None
+
+# seg-<first>-<last>.jsonl: a compacted segment covers the sequence range of the segments it merged
+_SEGMENT_RE = re.compile(r'^seg-(\d{6})-(\d{6})\.jsonl$')
+_COLD_SUFFIXES = {'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}
+
+def _parse_lines(lines: Iterable[str]) -> Iterator[Dict]:
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+class SegmentStore:
+    """
+    Append-only JSONL storage for one record stream (a domain's review history).
+
+    New records are appended to the active (newest) segment, so a save costs O(batch)
+    instead of rewriting the whole history. Segments roll over at `SEGMENT_MAX_BYTES`;
+    runs of small closed segments are merged in a background thread. A merged segment
+    is published with an atomic rename and supersedes the segments it covers; those are
+    deleted only after a grace period, so readers that listed them earlier never fail.
+    Appends and compactions also hold lock files in the directory, so other processes
+    sharing the store serialize with them; readers take no lock.
+    Old records can be moved to a compressed cold tier (`tier_out`); plain reads skip it.
+    """
+
+    _compacting: Dict[str, threading.Thread] = {}
+    _compacting_lock = threading.Lock()
+    _append_locks: Dict[str, threading.Lock] = {}
+
+    def __init__(self, directory: str, max_bytes: int = SEGMENT_MAX_BYTES,
+                 compact_min: int = SEGMENT_COMPACT_MIN, compact_target: int = SEGMENT_COMPACT_TARGET,
+                 dedupe_key=None):
+        """`dedupe_key(record)` lets compaction drop records repeated across the merged segments."""
+        self.directory = directory
+        self.dedupe_key = dedupe_key
+        self.max_bytes = max_bytes
+        self.compact_min = compact_min
+        self.compact_target = compact_target
+        os.makedirs(directory, exist_ok=True)
+        # Every store object of the same directory serializes its appends on one lock
+        with SegmentStore._compacting_lock:
+            self._lock = SegmentStore._append_locks.setdefault(directory, threading.Lock())
+
+    # --- Segment layout ---
+
+    def _all_segments(self) -> List[Tuple[int, int, str]]:
+        segments = []
+        for name in os.listdir(self.directory):
+            match = _SEGMENT_RE.match(name)
+            if match:
+                segments.append((int(match.group(1)), int(match.group(2)), name))
+        return segments
+
+    def _split_live(self) -> Tuple[List[Tuple[int, int, str]], List[Tuple[int, int, str]]]:
+        """(live, superseded) segments; the widest segment starting at a sequence number wins."""
+        live, superseded = [], []
+        covered = 0
+        for first, last, name in sorted(self._all_segments(), key=lambda s: (s[0], -s[1])):
+            if first > covered:
+                live.append((first, last, name))
+                covered = last
+            else:
+                superseded.append((first, last, name))
+        return live, superseded
+
+    def segments(self) -> List[str]:
+        """Paths of the live segments, oldest first."""
+        return [os.path.join(self.directory, name) for _, _, name in self._split_live()[0]]
+
+    def state(self) -> tuple:
+        """Cheap fingerprint of the store contents (changes on every append or compaction)."""
+        token = []
+        for path in self.segments():
+            try:
+                token.append((os.path.basename(path), os.path.getsize(path)))
+            except OSError:
+                pass
+        return tuple(token)
+
+    def is_empty(self) -> bool:
+        return not self._all_segments()
+
+    # --- Reading ---
+
+    def iter_records(self, include_cold: bool = False) -> Iterator[Dict]:
+        """Streams every hot record (cold ones first with `include_cold`), line by line; torn lines are skipped."""
+        if include_cold:
+            for path in self.cold_segments():
+                yield from self._iter_cold(path)
+        for path in self.segments():
+            try:
+                f = open(path, 'r', encoding='utf-8')
+            except FileNotFoundError:
+                continue  # Garbage-collected meanwhile; its records live in a merged segment
+            with f:
+                yield from _parse_lines(f)
+
+    # --- Cold tier ---
+
+    @property
+    def cold_dir(self) -> str:
+        return os.path.join(self.directory, "cold")
+
+    def cold_segments(self) -> List[str]:
+        """Paths of the compressed cold segments, oldest first."""
+        if not os.path.isdir(self.cold_dir):
+            return []
+        names = [n for n in os.listdir(self.cold_dir)
+                 if n.endswith(tuple(_COLD_SUFFIXES.values())) and not n.startswith('.')]
+        return [os.path.join(self.cold_dir, n) for n in sorted(names)]
+
+    @staticmethod
+    def _iter_cold(path: str) -> Iterator[Dict]:
+        if path.endswith(_COLD_SUFFIXES['zstd']):
+            if zstandard is None:
+                raise ImportError("Reading zstd cold segments requires zstandard (pip install zstandard)")
+            with open(path, 'rb') as raw:
+                yield from _parse_lines(io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw), encoding='utf-8'))
+        else:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                yield from _parse_lines(f)
+
+    @staticmethod
+    def _write_cold(path: str, lines: List[str], compression: str):
+        payload = "".join(lines).encode('utf-8')
+        with atomic_write(path) as f:
+            if compression == 'zstd':
+                f.write(zstandard.ZstdCompressor(level=10).compress(payload))
+            else:
+                f.write(gzip.compress(payload, compresslevel=6))
+
+    def tier_out(self, is_cold: Callable[[Dict], bool], compression: str = "gzip") -> List[Dict]:
+        """
+        Moves the records matching `is_cold` out of the live segments into compressed cold
+        segments and returns them. Each segment holding cold records yields one cold file
+        (named after the segment and its size/mtime, so a pass interrupted between the two
+        writes redoes the same file instead of duplicating it) and is rewritten with the rest;
+        an emptied segment is kept as an empty file so it keeps covering the segments it merged.
+        Runs under the compaction lock; the active segment is rewritten last, with appends held.
+        """
+        if compression not in _COLD_SUFFIXES:
+            raise ValueError(f"Unknown cold compression: {compression}")
+        if compression == 'zstd' and zstandard is None:
+            raise ImportError("zstd cold segments require zstandard (pip install zstandard)")
+        moved, done = [], set()
+        with file_lock(os.path.join(self.directory, ".compact.lock")):
+            live, _ = self._split_live()
+            for _, _, name in live[:-1]:
+                moved.extend(self._tier_segment(name, is_cold, compression))
+                done.add(name)
+            # The active segment (and any segment that rolled over meanwhile) takes appends
+            with self._lock, file_lock(os.path.join(self.directory, ".append.lock")):
+                live, _ = self._split_live()
+                for _, _, name in live:
+                    if name not in done:
+                        moved.extend(self._tier_segment(name, is_cold, compression))
+        return moved
+
+    def _tier_segment(self, name: str, is_cold: Callable[[Dict], bool], compression: str) -> List[Dict]:
+        """Splits one segment into a cold file and its hot remainder; returns the cold records."""
+        path = os.path.join(self.directory, name)
+        hot_lines, cold_lines, cold_records = [], [], []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if is_cold(record):
+                    cold_lines.append(line + "\n")
+                    cold_records.append(record)
+                else:
+                    hot_lines.append(line + "\n")
+        if not cold_lines:
+            return []
+        st = os.stat(path)
+        os.makedirs(self.cold_dir, exist_ok=True)
+        cold_name = f"{name[:-len('.jsonl')]}-{st.st_size}-{st.st_mtime_ns}{_COLD_SUFFIXES[compression]}"
+        self._write_cold(os.path.join(self.cold_dir, cold_name), cold_lines, compression)
+        with atomic_write(path, 'w', encoding='utf-8') as f:
+            f.writelines(hot_lines)
+        return cold_records
+
+    # --- Writing ---
+
+    def append(self, records: Iterable[Dict]) -> int:
+        """Appends records to the active segment (rolling over when it is full). Returns how many were written."""
+        lines = [json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records]
+        if not lines:
+            return 0
+        payload = "".join(lines).encode('utf-8')
+        with self._lock, file_lock(os.path.join(self.directory, ".append.lock")):
+            path = self._active_segment(len(payload))
+            with open(path, 'ab') as f:
+                if f.tell() > 0 and not self._ends_with_newline(path):
+                    f.write(b"\n")  # Seal a line torn by an earlier crash
+                f.write(payload)
+        self.maybe_compact()
+        return len(lines)
+
+    def write_initial(self, records: Iterable[Dict]) -> int:
+        """Writes the first segment in one go (migration); published with an atomic rename."""
+        path = os.path.join(self.directory, "seg-000001-000001.jsonl")
+        count = 0
+        with atomic_write(path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                count += 1
+        return count
+
+    @staticmethod
+    def _ends_with_newline(path: str) -> bool:
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _active_segment(self, incoming: int) -> str:
+        live, _ = self._split_live()
+        if live:
+            first, last, name = live[-1]
+            path = os.path.join(self.directory, name)
+            # Merged segments are never appended to, so compaction can rewrite them safely
+            if first == last and os.path.getsize(path) + incoming <= self.max_bytes:
+                return path
+            seq = last + 1
+        else:
+            seq = 1
+        return os.path.join(self.directory, f"seg-{seq:06d}-{seq:06d}.jsonl")
+
+    # --- Compaction ---
+
+    def _compaction_run(self) -> List[Tuple[int, int, str]]:
+        """Oldest run of consecutive small closed segments worth merging (may be empty)."""
+        live, _ = self._split_live()
+        closed = live[:-1]  # The active segment keeps receiving appends
+        run, run_bytes = [], 0
+        for segment in closed:
+            size = os.path.getsize(os.path.join(self.directory, segment[2]))
+            if size >= self.compact_target or run_bytes + size > self.compact_target:
+                if len(run) >= self.compact_min:
+                    return run
+                run, run_bytes = [], 0
+                if size >= self.compact_target:
+                    continue
+            run.append(segment)
+            run_bytes += size
+        return run if len(run) >= self.compact_min else []
+
+    def maybe_compact(self):
+        """Starts a background compaction if there is a run to merge and none is running yet."""
+        with SegmentStore._compacting_lock:
+            running = SegmentStore._compacting.get(self.directory)
+            if running is not None and running.is_alive():
+                return
+            if not self._compaction_run() and not self._expired_garbage():
+                return
+            worker = threading.Thread(target=self.compact, daemon=True)
+            SegmentStore._compacting[self.directory] = worker
+            worker.start()
+
+    def compact(self) -> int:
+        """
+        Merges the oldest run of small closed segments into one segment and deletes
+        superseded segments past the grace period. Returns the number of segments merged.
+        Skipped when another process is compacting the same store.
+        """
+        with file_lock(os.path.join(self.directory, ".compact.lock"), blocking=False) as acquired:
+            return self._compact_locked() if acquired else 0
+
+    def _compact_locked(self) -> int:
+        run = self._compaction_run()
+        merged = 0
+        if run:
+            first, last = run[0][0], run[-1][1]
+            path = os.path.join(self.directory, f"seg-{first:06d}-{last:06d}.jsonl")
+            seen = set()
+            with atomic_write(path, 'w', encoding='utf-8') as out:
+                for _, _, name in run:
+                    with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                        for line in f:
+                            line = line.strip()
+                            if not line:
+                                continue
+                            if self.dedupe_key is not None:
+                                try:
+                                    key = self.dedupe_key(json.loads(line))
+                                except ValueError:
+                                    continue
+                                if key in seen:
+                                    continue
+                                seen.add(key)
+                            out.write(line + "\n")
+            merged = len(run)
+        for name in self._expired_garbage():
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+        return merged
+
+    def _expired_garbage(self) -> List[str]:
+        """Superseded segments whose replacement is older than the grace period."""
+        live, superseded = self._split_live()
+        now = time.time()
+        expired = []
+        for first, last, name in superseded:
+            cover = next((s for s in live if s[0] <= first and last <= s[1]), None)
+            try:
+                if cover and now - os.path.getmtime(os.path.join(self.directory, cover[2])) >= SEGMENT_GC_GRACE:
+                    expired.append(name)
+            except OSError:
+                pass
+        return expired
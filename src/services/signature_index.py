@@ -0,0 +1,290 @@
+# Professional Streamlit Opinion Intelligence Monitor - Signature Index Service
+
+import os
+import json
+import mmap
+import bisect
+import threading
+from typing import Dict, Iterable, Optional
+from src.services.file_lock import atomic_write
+from src.config.constants import SIGNATURE_BLOOM_ENABLED, SIGNATURE_BLOOM_BITS_PER_KEY, SIGNATURE_LOG_MAX
+
+DIGEST_SIZE = 16  # Bytes per content hash (blake2b digest_size)
+_BLOOM_HASHES = 7
+
+class _SortedDigests:
+    """Read-only sequence view over a file of sorted fixed-size digests (for bisect)."""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        self._len = len(buffer) // DIGEST_SIZE if buffer is not None else 0
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, i: int) -> bytes:
+        start = i * DIGEST_SIZE
+        return self._buffer[start:start + DIGEST_SIZE]
+
+    def __contains__(self, digest: bytes) -> bool:
+        i = bisect.bisect_left(self, digest)
+        return i < self._len and self[i] == digest
+
+    def __iter__(self):
+        for i in range(self._len):
+            yield self[i]
+
+class SignatureIndex:
+    """
+    Persistent set of review content hashes kept next to a history (sidecar files):
+
+      signatures.idx    sorted digests, memory-mapped and binary-searched
+      signatures.log    digests appended since the last merge (held in memory)
+      signatures.bloom  optional Bloom filter over both, memory-mapped and updated in place
+      signatures.json   count and newest review date
+
+    A lookup is a Bloom probe (most new reviews stop there) and, on a hit, a set lookup or
+    binary search, so checking a batch costs O(batch) and opening the index never reads
+    the history. The log is merged into the sorted file once it holds `SIGNATURE_LOG_MAX` digests.
+    Updates must be serialized by the caller (the repository's domain lock); every batch
+    first re-reads what other processes changed.
+    """
+
+    _instances: Dict[str, "SignatureIndex"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, directory: str, bloom: bool = SIGNATURE_BLOOM_ENABLED, log_max: int = SIGNATURE_LOG_MAX):
+        self.directory = directory
+        self.use_bloom = bloom
+        self.log_max = log_max
+        self.base_path = os.path.join(directory, "signatures.idx")
+        self.log_path = os.path.join(directory, "signatures.log")
+        self.bloom_path = os.path.join(directory, "signatures.bloom")
+        self.meta_path = os.path.join(directory, "signatures.json")
+        self._lock = threading.RLock()
+        self._base_file = self._base_map = None
+        self._bloom_file = self._bloom_map = None
+        self._base_stat = None
+        self._log = set()
+        self._log_size = 0
+        self.meta = {'count': 0, 'newest_date': "", 'bloom_capacity': 0}
+        os.makedirs(directory, exist_ok=True)
+        self._open()
+
+    @classmethod
+    def for_directory(cls, directory: str) -> "SignatureIndex":
+        """Process-wide index object of a history directory."""
+        with cls._instances_lock:
+            index = cls._instances.get(directory)
+            if index is None:
+                index = cls._instances[directory] = cls(directory)
+            return index
+
+    # --- Opening / refreshing ---
+
+    def exists(self) -> bool:
+        return os.path.exists(self.meta_path)
+
+    def _open(self):
+        self._close_maps()
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                self.meta.update(json.load(f))
+        self._base = _SortedDigests(None)
+        if os.path.exists(self.base_path) and os.path.getsize(self.base_path) > 0:
+            self._base_file = open(self.base_path, 'rb')
+            self._base_map = mmap.mmap(self._base_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._base = _SortedDigests(self._base_map)
+        self._base_stat = self._stat(self.base_path)
+        self._log, self._log_size = set(), 0
+        self._read_log_tail()
+        self._open_bloom()
+
+    def _open_bloom(self):
+        if not self.use_bloom:
+            return
+        capacity = self.meta.get('bloom_capacity', 0)
+        expected = self._bloom_bytes(capacity)
+        if capacity and os.path.exists(self.bloom_path) and os.path.getsize(self.bloom_path) == expected:
+            self._bloom_file = open(self.bloom_path, 'r+b')
+            self._bloom_map = mmap.mmap(self._bloom_file.fileno(), 0)
+
+    def _close_maps(self):
+        for m in (self._base_map, self._bloom_map):
+            if m is not None:
+                m.close()
+        for f in (self._base_file, self._bloom_file):
+            if f is not None:
+                f.close()
+        self._base_file = self._base_map = self._bloom_file = self._bloom_map = None
+
+    @staticmethod
+    def _stat(path: str):
+        try:
+            st = os.stat(path)
+            return (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _read_log_tail(self):
+        """Loads digests appended to the log (by this or another process) since the last read."""
+        if not os.path.exists(self.log_path):
+            return
+        size = os.path.getsize(self.log_path)
+        if size < self._log_size:
+            self._log, self._log_size = set(), 0  # Log was merged and truncated
+        whole = size - size % DIGEST_SIZE  # Ignore a digest torn by a crash
+        if whole <= self._log_size:
+            return
+        with open(self.log_path, 'rb') as f:
+            f.seek(self._log_size)
+            data = f.read(whole - self._log_size)
+        self._log.update(data[i:i + DIGEST_SIZE] for i in range(0, len(data), DIGEST_SIZE))
+        self._log_size = whole
+
+    def _refresh(self):
+        """Picks up changes made by other processes (merged base file, resized filter, new log entries)."""
+        capacity = self.meta.get('bloom_capacity', 0)
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                self.meta.update(json.load(f))
+        if self._stat(self.base_path) != self._base_stat or self.meta.get('bloom_capacity', 0) != capacity:
+            self._open()
+        else:
+            self._read_log_tail()
+
+    # --- Bloom filter ---
+
+    @staticmethod
+    def _bloom_bytes(capacity: int) -> int:
+        return max(1, (capacity * SIGNATURE_BLOOM_BITS_PER_KEY + 7) // 8)
+
+    def _bloom_positions(self, digest: bytes):
+        bits = len(self._bloom_map) * 8
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % bits for i in range(_BLOOM_HASHES)]
+
+    def _bloom_might_contain(self, digest: bytes) -> bool:
+        if self._bloom_map is None:
+            return True
+        bloom = self._bloom_map
+        return all(bloom[p >> 3] & (1 << (p & 7)) for p in self._bloom_positions(digest))
+
+    def _bloom_add(self, digest: bytes):
+        bloom = self._bloom_map
+        for p in self._bloom_positions(digest):
+            bloom[p >> 3] |= 1 << (p & 7)
+
+    def _rebuild_bloom(self, capacity: int):
+        """Sizes a new filter for `capacity` digests and fills it from the index (amortized by doubling)."""
+        if self._bloom_map is not None:
+            self._bloom_map.close()
+            self._bloom_file.close()
+        with atomic_write(self.bloom_path) as f:
+            f.truncate(self._bloom_bytes(capacity))
+        self._bloom_file = open(self.bloom_path, 'r+b')
+        self._bloom_map = mmap.mmap(self._bloom_file.fileno(), 0)
+        for digest in self._base:
+            self._bloom_add(digest)
+        for digest in self._log:
+            self._bloom_add(digest)
+        self.meta['bloom_capacity'] = capacity
+
+    # --- Queries ---
+
+    def __len__(self) -> int:
+        return self.meta.get('count', 0)
+
+    @property
+    def newest_date(self) -> str:
+        return self.meta.get('newest_date', "")
+
+    def _contains(self, digest: bytes) -> bool:
+        if not self._bloom_might_contain(digest):
+            return False
+        return digest in self._log or digest in self._base
+
+    def __contains__(self, digest: bytes) -> bool:
+        with self._lock:
+            return self._contains(digest)
+
+    def contains_batch(self, digests: Iterable[bytes]) -> list:
+        """Membership of every digest of a batch, after picking up changes from other processes."""
+        with self._lock:
+            self._refresh()
+            return [self._contains(d) for d in digests]
+
+    # --- Updates ---
+
+    def add(self, digests: Iterable[bytes], newest_date: Optional[str] = None) -> int:
+        """Adds digests not indexed yet; bloom bits are set before the log so the filter never misses."""
+        with self._lock:
+            self._refresh()
+            new, seen = [], set()
+            for digest in digests:
+                if digest not in seen and not self._contains(digest):
+                    new.append(digest)
+                    seen.add(digest)
+            if not new:
+                return 0
+
+            count = self.meta.get('count', 0) + len(new)
+            if self.use_bloom:
+                if self._bloom_map is None or count > self.meta.get('bloom_capacity', 0):
+                    self._rebuild_bloom(max(1024, 2 * count))
+                for digest in new:
+                    self._bloom_add(digest)
+                self._bloom_map.flush()
+
+            with open(self.log_path, 'ab') as f:
+                f.write(b"".join(new))
+            self._log.update(new)
+            self._log_size += len(new) * DIGEST_SIZE
+
+            self.meta['count'] = count
+            if newest_date and str(newest_date) > self.meta.get('newest_date', ""):
+                self.meta['newest_date'] = str(newest_date)
+            self._write_meta()
+
+            if len(self._log) >= self.log_max:
+                self._merge_log()
+            return len(new)
+
+    def rebuild(self, records: Iterable[Dict], hash_fn):
+        """Re-creates the index from a full history stream (first use or missing sidecar files)."""
+        with self._lock:
+            digests, newest = set(), ""
+            for record in records:
+                digests.add(hash_fn(record))
+                date = str(record.get('date') or "")
+                if date > newest:
+                    newest = date
+            self._close_maps()
+            self._write_base(sorted(digests))
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+            if os.path.exists(self.bloom_path):
+                os.remove(self.bloom_path)
+            self.meta = {'count': len(digests), 'newest_date': newest, 'bloom_capacity': 0}
+            self._write_meta()
+            self._open()
+            if self.use_bloom:
+                self._rebuild_bloom(max(1024, 2 * len(digests)))
+                self._write_meta()
+
+    def _merge_log(self):
+        """Folds the log into the sorted base file (atomic rename), then empties the log."""
+        merged = sorted(set(self._base) | self._log)
+        self._close_maps()
+        self._write_base(merged)
+        open(self.log_path, 'wb').close()
+        self._open()
+
+    def _write_base(self, digests):
+        with atomic_write(self.base_path) as f:
+            f.write(b"".join(digests))
+
+    def _write_meta(self):
+        with atomic_write(self.meta_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
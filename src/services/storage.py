@@ -1,129 +1,562 @@
 import json
 import os
+import hashlib
+import heapq
+import importlib
+import numpy as np
 import pandas as pd
 import pickle
-from datetime import datetime
-from typing import List, Dict, Optional
-from src.config.constants import DATA_DIR
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import List, Dict, Iterable, Iterator, Optional
+from src.config.constants import (DATA_DIR, CHECKPOINT_DIR, STORAGE_BACKEND, CATEGORY_KEYWORDS, HISTORY_HOT_DAYS,
+                                  HISTORY_HOT_MIN_REVIEWS,
+                                  HISTORY_COLD_COMPRESSION, HISTORY_ROLLUPS_ENABLED, HISTORY_TIERING_INTERVAL,
+                                  HISTORY_CHUNK_SIZE)
+from src.services.segment_store import SegmentStore
+from src.services.signature_index import SignatureIndex, DIGEST_SIZE
+from src.services.doc_frequency import record_document_frequencies
+from src.services.file_lock import file_lock, atomic_write
+from src.services.keyword_matcher import get_matcher
+
+def review_signature(record) -> tuple:
+    """Legacy identity of a review: (user, date, text prefix). Distinct reviews sharing a prefix collide."""
+    return (record.get('user', ''), record.get('date', ''), str(record.get('text', ''))[:50])
+
+def _hash_field(value) -> str:
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return str(value)
+
+def content_hash(record) -> bytes:
+    """Identity of a review used for de-duplication: blake2b digest of its user, date and full text."""
+    payload = "\x1f".join(_hash_field(record.get(k)) for k in ('user', 'date', 'text'))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=DIGEST_SIZE).digest()
+
+def _clean_domain(domain: str) -> str:
+    return domain.lower().replace(" ", "").split('/')[0]
+
+def until_bound(until: Optional[str]) -> Optional[str]:
+    """Upper bound for an inclusive `until` date: '2024-05-31' also covers '2024-05-31T18:00:00'."""
+    return until + "\uffff" if until else None
+
+def in_window(date, since: Optional[str], until: Optional[str]) -> bool:
+    """True if an ISO date string falls in the inclusive [since, until] window (open ends allowed)."""
+    if not since and not until:
+        return True
+    if not date or (isinstance(date, float) and date != date):
+        return False
+    date = str(date)
+    return (not since or date >= since) and (not until or date <= until_bound(until))
+
+def chunked_frames(records: Iterable[Dict], chunk_size: int, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Groups a record stream into DataFrames of `chunk_size` rows (the last one may be shorter)."""
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield pd.DataFrame(chunk, columns=columns)
 
 class ReviewRepository:
-    """Handles local persistence of review data (JSON-based Data Lake)."""
-    
+    """
+    Handles local persistence of review data (Data Lake of append-only JSONL segments per domain).
+    Legacy `<domain>_history.json` files are migrated to segments the first time they are touched.
+    Writers of a domain hold its lock file (data/locks/<domain>.lock), so concurrent sessions
+    in other processes cannot store the same review twice; loads never wait for it.
+    Reviews older than HISTORY_HOT_DAYS are periodically moved to a compressed cold tier,
+    optionally summarized as daily rollups; `load_history` reads the hot tier by default.
+    The newest HISTORY_HOT_MIN_REVIEWS reviews always stay hot, and the save that creates a
+    history never tiers it, so a history of old reviews (e.g. a CSV import) still loads.
+    """
+
+    _domain_locks: Dict[str, threading.Lock] = {}
+    _cache_lock = threading.Lock()
+
     def __init__(self):
         # Ensure data directory exists
         if not os.path.exists(DATA_DIR):
             os.makedirs(DATA_DIR)
             
     def _get_filepath(self, domain: str) -> str:
-        """Returns the standard filepath for a domain's history."""
-        clean_domain = domain.lower().replace(" ", "").split('/')[0]
-        return os.path.join(DATA_DIR, f"{clean_domain}_history.json")
+        """Returns the legacy (single JSON file) filepath for a domain's history."""
+        return os.path.join(DATA_DIR, f"{_clean_domain(domain)}_history.json")
+
+    def _get_store(self, domain: str) -> SegmentStore:
+        """Segment store of a domain, migrating the legacy JSON history on first use."""
+        store = SegmentStore(os.path.join(DATA_DIR, f"{_clean_domain(domain)}_history"),
+                             dedupe_key=content_hash)
+        self._migrate_legacy(domain, store)
+        return store
+
+    def _migrate_legacy(self, domain: str, store: SegmentStore):
+        legacy_path = self._get_filepath(domain)
+        if not os.path.exists(legacy_path):
+            return
+        with self._domain_lock(domain):
+            if not os.path.exists(legacy_path):
+                return  # Migrated by another thread meanwhile
+            if store.is_empty():
+                try:
+                    with open(legacy_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    store.write_initial(data)
+                except Exception as e:
+                    print(f"Error migrating history for {domain}: {e}")
+            # The original file is kept as a backup next to the segments
+            os.replace(legacy_path, legacy_path + ".migrated")
+
+    @contextmanager
+    def _domain_lock(self, domain: str):
+        """Serializes a domain's writers across threads and processes (readers never take it)."""
+        domain = _clean_domain(domain)
+        with ReviewRepository._cache_lock:
+            thread_lock = ReviewRepository._domain_locks.setdefault(domain, threading.Lock())
+        with thread_lock, file_lock(os.path.join(DATA_DIR, "locks", f"{domain}.lock")):
+            yield
+
+    def _signature_index(self, store: SegmentStore) -> SignatureIndex:
+        """Persistent content-hash index of a domain, built from its segments (cold ones too) the first time."""
+        index = SignatureIndex.for_directory(store.directory)
+        if not index.exists() and not store.is_empty():
+            index.rebuild(store.iter_records(include_cold=True), content_hash)
+        return index
 
     def save_reviews(self, domain: str, df_new: pd.DataFrame) -> int:
         """
-        Saves new reviews to the domain's history file.
+        Appends new reviews to the domain's active history segment.
         Returns the number of new reviews added.
         """
         if df_new.empty:
             return 0
-            
-        filepath = self._get_filepath(domain)
-        
-        # Load existing
-        current_data = []
-        if os.path.exists(filepath):
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    current_data = json.load(f)
-            except Exception as e:
-                print(f"Error loading history for {domain}: {e}")
-                current_data = []
-        
-        # Create a set of existing (user, date, text) tuples to avoid duplicates
-        existing_signatures = {
-            (r.get('user', ''), r.get('date', ''), r.get('text', '')[:50]) 
-            for r in current_data
-        }
-        
-        # Filter new reviews
-        new_count = 0
-        for _, row in df_new.iterrows():
-            # Create signature
-            sig = (row.get('user', ''), row.get('date', ''), row.get('text', '')[:50])
-            
-            if sig not in existing_signatures:
-                # Convert row to dict and handle timestamps
-                record = row.to_dict()
+
+        store = self._get_store(domain)
+        with self._domain_lock(domain):
+            index = self._signature_index(store)
+            records = df_new.to_dict('records')
+            hashes = [content_hash(r) for r in records]
+
+            # Filter new reviews: only the batch is hashed and looked up, never the history
+            new_records, new_hashes = [], []
+            batch_seen = set()
+            for record, digest, known in zip(records, hashes, index.contains_batch(hashes)):
+                if known or digest in batch_seen:
+                    continue
+                # Handle timestamps
                 if 'timestamp_scraping' not in record:
                     record['timestamp_scraping'] = datetime.now().isoformat()
-                    
-                current_data.append(record)
-                existing_signatures.add(sig)
-                new_count += 1
-                
-        # Save back if there are changes
-        if new_count > 0:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(current_data, f, ensure_ascii=False, indent=2)
-                
-        return new_count
-
-    def load_history(self, domain: str) -> pd.DataFrame:
-        """Loads the full review history for a domain."""
-        filepath = self._get_filepath(domain)
-        if not os.path.exists(filepath):
-            return pd.DataFrame()
-            
+
+                new_records.append(record)
+                new_hashes.append(digest)
+                batch_seen.add(digest)
+
+            # Only the new records are written; earlier segments are never rewritten.
+            # Records go first so a crash in between can only leave a duplicate, never a lost review.
+            if new_records:
+                store.append(new_records)
+                newest = max((str(r.get('date')) for r in new_records if r.get('date')), default=None)
+                index.add(new_hashes, newest_date=newest)
+
+            self._maybe_apply_retention(domain, store)
+
+        if new_records:
+            # Outside the domain lock: a first-time statistics build reads every domain
+            record_document_frequencies(new_records)
+        return len(new_records)
+
+    def _iter_history_records(self, domain: str, since: Optional[str], until: Optional[str],
+                              columns: Optional[List[str]], full: Optional[bool]) -> Iterator[Dict]:
+        """Records of a domain in the [since, until] window, projected to `columns`, as they are read."""
+        store = self._get_store(domain)
+        if full is None:
+            # A window reaching past the last tiering cutoff needs the cold segments too
+            full = bool(since) and since < self._cold_cutoff(store)
+        for record in store.iter_records(include_cold=full):
+            if not in_window(record.get('date'), since, until):
+                continue
+            yield {c: record.get(c) for c in columns} if columns is not None else record
+
+    def load_history(self, domain: str, since: Optional[str] = None, until: Optional[str] = None,
+                     columns: Optional[List[str]] = None, limit: Optional[int] = None,
+                     full: Optional[bool] = None) -> pd.DataFrame:
+        """
+        Loads a domain's review history, streaming its segments record by record and keeping
+        only the reviews in the inclusive [since, until] date window, the requested `columns`
+        and at most `limit` rows. Reads the hot tier only (reviews newer than HISTORY_HOT_DAYS)
+        unless `full` is set or `since` reaches into the cold tier.
+        """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return pd.DataFrame(data)
+            records = self._iter_history_records(domain, since, until, columns, full)
+            return pd.DataFrame(list(islice(records, limit)), columns=columns)
         except Exception:
+            return pd.DataFrame(columns=columns)
+
+    def iter_history(self, domain: str, since: Optional[str] = None, until: Optional[str] = None,
+                     columns: Optional[List[str]] = None, chunk_size: int = HISTORY_CHUNK_SIZE,
+                     full: Optional[bool] = None) -> Iterator[pd.DataFrame]:
+        """Same selection as `load_history`, yielded as DataFrames of `chunk_size` reviews."""
+        yield from chunked_frames(self._iter_history_records(domain, since, until, columns, full),
+                                  chunk_size, columns)
+
+    def _cold_cutoff(self, store: SegmentStore) -> str:
+        """Date before which reviews may live in the cold tier ('' when nothing was tiered)."""
+        if not store.cold_segments():
+            return ""
+        try:
+            with open(self._tiering_state_path(store), 'r', encoding='utf-8') as f:
+                return json.load(f).get('cutoff', "")
+        except (OSError, ValueError):
+            return "\uffff"  # Unknown: assume any window may need the cold tier
+
+    # --- Tiering ---
+
+    def _tiering_state_path(self, store: SegmentStore) -> str:
+        return os.path.join(store.directory, "tiering.json")
+
+    def _maybe_apply_retention(self, domain: str, store: SegmentStore):
+        """Runs a tiering pass from a save at most every HISTORY_TIERING_INTERVAL seconds (domain lock held)."""
+        state_path = self._tiering_state_path(store)
+        if not os.path.exists(state_path):
+            # New history: start the interval instead of tiering the save that created it
+            with atomic_write(state_path, 'w', encoding='utf-8') as f:
+                json.dump({'last_run': datetime.now().isoformat(), 'cutoff': "", 'moved': 0}, f)
+            return
+        if datetime.now().timestamp() - os.path.getmtime(state_path) < HISTORY_TIERING_INTERVAL:
+            return
+        try:
+            self._apply_retention(store)
+        except Exception as e:
+            print(f"Error tiering history for {domain}: {e}")
+
+    def apply_retention(self, domain: str, max_age_days: int = HISTORY_HOT_DAYS,
+                        compression: str = HISTORY_COLD_COMPRESSION,
+                        rollups: bool = HISTORY_ROLLUPS_ENABLED,
+                        keep_newest: int = HISTORY_HOT_MIN_REVIEWS) -> int:
+        """
+        Moves reviews dated more than `max_age_days` ago to compressed cold segments and, with
+        `rollups`, adds them to the domain's daily aggregates. The `keep_newest` most recent
+        reviews stay hot whatever their age. Returns how many were moved.
+        """
+        store = self._get_store(domain)
+        with self._domain_lock(domain):
+            return self._apply_retention(store, max_age_days, compression, rollups, keep_newest)
+
+    def _apply_retention(self, store: SegmentStore, max_age_days: int = HISTORY_HOT_DAYS,
+                         compression: str = HISTORY_COLD_COMPRESSION,
+                         rollups: bool = HISTORY_ROLLUPS_ENABLED,
+                         keep_newest: int = HISTORY_HOT_MIN_REVIEWS) -> int:
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).strftime("%Y-%m-%d")
+        if keep_newest > 0:
+            # Never tier past the day of the `keep_newest`-th newest hot review
+            newest = heapq.nlargest(keep_newest, (str(r['date'])[:10] for r in store.iter_records() if r.get('date')))
+            if len(newest) == keep_newest:
+                cutoff = min(cutoff, newest[-1])
+            else:
+                cutoff = ""  # Fewer hot reviews than the minimum: nothing moves
+        moved = store.tier_out(lambda r: bool(r.get('date')) and str(r['date'])[:10] < cutoff, compression)
+        if moved and rollups:
+            self._add_to_rollups(store, moved)
+        # The recorded cutoff bounds every cold review, including those moved by earlier passes
+        recorded = max(cutoff, self._cold_cutoff(store))
+        with atomic_write(self._tiering_state_path(store), 'w', encoding='utf-8') as f:
+            json.dump({'last_run': datetime.now().isoformat(), 'cutoff': recorded, 'moved': len(moved)}, f)
+        return len(moved)
+
+    def _rollups_path(self, store: SegmentStore) -> str:
+        return os.path.join(store.directory, "rollups.json")
+
+    def _add_to_rollups(self, store: SegmentStore, records: List[Dict]):
+        """Daily aggregates: count, mean rating, rating histogram and dominant-category counts."""
+        path = self._rollups_path(store)
+        days = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                days = json.load(f)
+        matcher = get_matcher(CATEGORY_KEYWORDS)
+        for record in records:
+            day = days.setdefault(str(record['date'])[:10], {
+                'count': 0, 'rating_sum': 0.0, 'rated': 0, 'ratings': {}, 'categories': {}
+            })
+            day['count'] += 1
+            try:
+                rating = int(record.get('rating'))
+                day['rating_sum'] += rating
+                day['rated'] += 1
+                day['ratings'][str(rating)] = day['ratings'].get(str(rating), 0) + 1
+            except (TypeError, ValueError):
+                pass
+            cats = matcher.values_found(str(record.get('text') or ""))
+            category = max(set(cats), key=cats.count) if cats else "Opinión General"
+            day['categories'][category] = day['categories'].get(category, 0) + 1
+            day['rating_mean'] = round(day['rating_sum'] / day['rated'], 4) if day['rated'] else None
+        with atomic_write(path, 'w', encoding='utf-8') as f:
+            json.dump(dict(sorted(days.items())), f, ensure_ascii=False)
+
+    def load_rollups(self, domain: str) -> pd.DataFrame:
+        """Daily aggregates of the reviews moved to the cold tier (one row per day)."""
+        path = self._rollups_path(self._get_store(domain))
+        if not os.path.exists(path):
             return pd.DataFrame()
+        with open(path, 'r', encoding='utf-8') as f:
+            days = json.load(f)
+        return pd.DataFrame([{'date': day, **values} for day, values in days.items()])
+
+    def get_high_water_mark(self, domain: str) -> Optional[Dict]:
+        """
+        Returns what is already stored for a domain so the scraper can skip it:
+        {'date': newest review date, 'signatures': container of known content hashes,
+        'count': number of stored reviews}. Returns None when there is no history yet.
+        """
+        store = self._get_store(domain)
+        with self._domain_lock(domain):
+            index = self._signature_index(store)
+        if not len(index):
+            return None
+        return {
+            'date': index.newest_date,
+            'signatures': index,
+            'count': len(index)
+        }
+
+    def stored_domains(self) -> List[str]:
+        """Domains with a stored history (segment directories or not yet migrated JSON files)."""
+        domains = set()
+        for name in os.listdir(DATA_DIR):
+            if name.endswith("_history") and os.path.isdir(os.path.join(DATA_DIR, name)):
+                domains.add(name[:-len("_history")])
+            elif name.endswith("_history.json"):
+                domains.add(name[:-len("_history.json")])
+        return sorted(domains)
 
     def get_global_corpus(self) -> List[str]:
-        """Loads ALL text content from ALL domains for global training."""
+        """Loads ALL text content (cold tier included) from ALL domains for global training."""
         all_texts = []
-        # Iterate over all json files in data dir
-        for filename in os.listdir(DATA_DIR):
-            if filename.endswith("_history.json"):
-                try:
-                    filepath = os.path.join(DATA_DIR, filename)
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        texts = [d.get('text', '') for d in data if d.get('text')]
-                        all_texts.extend(texts)
-                except:
-                    pass
+        for domain in self.stored_domains():
+            try:
+                all_texts.extend(d.get('text', '') for d in self._get_store(domain).iter_records(include_cold=True)
+                                 if d.get('text'))
+            except Exception:
+                pass
         return all_texts
 
+def get_repository(backend: str = STORAGE_BACKEND):
+    """Review repository for the configured storage backend ("jsonl", "sqlite" or "parquet")."""
+    if backend == "sqlite":
+        from src.services.storage_sqlite import SQLiteReviewRepository
+        return SQLiteReviewRepository()
+    if backend == "parquet":
+        from src.services.storage_parquet import ParquetReviewRepository
+        return ParquetReviewRepository()
+    if backend != "jsonl":
+        raise ValueError(f"Unknown storage backend: {backend}")
+    return ReviewRepository()
+
+class ScrapeCheckpoint:
+    """
+    Page cursor of an in-progress scrape, stored as JSONL next to the history files:
+    a header line, then one line per completed page with the reviews it contributed.
+    Each page is an append (no rewrite of earlier pages); a line torn by a crash is ignored on load.
+    """
+
+    def __init__(self, domain: str, checkpoint_dir: str = CHECKPOINT_DIR):
+        self.domain = _clean_domain(domain)
+        self.checkpoint_dir = checkpoint_dir
+        self.filepath = os.path.join(checkpoint_dir, f"{self.domain}_checkpoint.jsonl")
+
+    def start(self, max_reviews: int):
+        """Begins a new checkpoint, discarding any previous one (the directory is created here, on first write)."""
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        header = {'domain': self.domain, 'max_reviews': max_reviews, 'started': datetime.now().isoformat()}
+        with open(self.filepath, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+
+    def record_page(self, page: int, reviews: List[Dict]):
+        """Marks `page` as completed together with the reviews it added."""
+        line = json.dumps({'page': page, 'reviews': reviews}, ensure_ascii=False, default=str)
+        with open(self.filepath, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+            f.flush()
+
+    def load(self) -> Optional[Dict]:
+        """
+        Returns {'last_page', 'reviews', 'max_reviews', 'started'} of the interrupted run,
+        or None when there is nothing to resume.
+        """
+        if not os.path.exists(self.filepath):
+            return None
+        with open(self.filepath, 'rb') as f:
+            raw = f.read()
+        header, last_page, reviews = None, 0, []
+        valid_bytes = 0
+        for line in raw.splitlines(keepends=True):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("incomplete line")
+                entry = json.loads(line)
+            except ValueError:
+                break  # Partial line from a crash mid-write: everything before it is valid
+            valid_bytes += len(line)
+            if header is None:
+                header = entry
+                continue
+            last_page = entry['page']
+            reviews.extend(entry['reviews'])
+        if valid_bytes < len(raw):
+            # Drop the torn tail so later appends start on a clean line
+            with open(self.filepath, 'r+b') as f:
+                f.truncate(valid_bytes)
+        if header is None:
+            return None
+        return {
+            'last_page': last_page,
+            'reviews': reviews,
+            'max_reviews': header.get('max_reviews'),
+            'started': header.get('started')
+        }
+
+    def clear(self):
+        """Removes the checkpoint once the scrape completed."""
+        if os.path.exists(self.filepath):
+            os.remove(self.filepath)
+
+class _LazyArrays(dict):
+    """Array files of a saved model, memory-mapped the first time each one is accessed."""
+
+    def __init__(self, paths: Dict[str, str]):
+        super().__init__()
+        self._paths = paths
+
+    def __missing__(self, key: str):
+        array = np.load(self._paths[key], mmap_mode='r')
+        self[key] = array
+        return array
+
+    def __contains__(self, key) -> bool:
+        return key in self._paths
+
+    def keys(self):
+        return self._paths.keys()
+
 class ModelRegistry:
-    """Handles persistence of trained Machine Learning models (Pickle-based)."""
-    
+    """
+    Handles persistence of trained Machine Learning models.
+
+    Models exposing `to_arrays()` / `from_arrays(arrays, meta)` are stored as NumPy `.npy`
+    files plus a JSON manifest (`<name>.manifest.json`, published last with an atomic rename);
+    loading them memory-maps each array on first access. Any other object is pickled as before,
+    and existing `.pkl` models keep loading. Loads are cached in-process until the file's mtime changes;
+    every load still returns its own object, so callers never share mutable model state.
+    Saves hold a per-model file lock and publish every file atomically, so loads never take a lock.
+    """
+
+    # (directory, name) -> (mtime_ns, path, payload): manifest + lazy arrays, or the raw pickle bytes
+    _cache: Dict[tuple, tuple] = {}
+    _cache_lock = threading.Lock()
+
     def __init__(self):
         self.model_dir = os.path.join(DATA_DIR, "models")
         if not os.path.exists(self.model_dir):
             os.makedirs(self.model_dir)
+
+    def _manifest_path(self, name: str) -> str:
+        return os.path.join(self.model_dir, f"{name}.manifest.json")
+
+    def _pickle_path(self, name: str) -> str:
+        return os.path.join(self.model_dir, f"{name}.pkl")
+            
+    def _model_lock(self, name: str):
+        return file_lock(os.path.join(self.model_dir, f".{name}.lock"))
             
     def save_model(self, name: str, model_obj):
-        """Saves a model object to a .pkl file."""
-        filepath = os.path.join(self.model_dir, f"{name}.pkl")
+        """Saves a model as NumPy arrays + manifest when it supports it, else as a .pkl file."""
         try:
-            with open(filepath, 'wb') as f:
-                pickle.dump(model_obj, f)
+            exported = model_obj.to_arrays() if hasattr(model_obj, 'to_arrays') else None
+            with self._model_lock(name):
+                if exported is not None:
+                    self._save_arrays(name, model_obj, *exported)
+                else:
+                    with atomic_write(self._pickle_path(name)) as f:
+                        pickle.dump(model_obj, f)
             return True
         except Exception as e:
             print(f"Error saving model {name}: {e}")
             return False
 
+    def _save_arrays(self, name: str, model_obj, arrays: Dict[str, np.ndarray], meta: Dict):
+        token = f"{datetime.now():%Y%m%d%H%M%S%f}"
+        files = {}
+        for key, array in arrays.items():
+            filename = f"{name}.{key}.{token}.npy"
+            with atomic_write(os.path.join(self.model_dir, filename)) as f:
+                np.save(f, np.ascontiguousarray(array), allow_pickle=False)
+            files[key] = filename
+        cls = type(model_obj)
+        manifest = {
+            'format': 'arrays',
+            'class': f"{cls.__module__}:{cls.__qualname__}",
+            'arrays': files,
+            'meta': meta,
+            'saved': datetime.now().isoformat(),
+        }
+        manifest_path = self._manifest_path(name)
+        previous = set()
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                previous = set(json.load(f).get('arrays', {}).values())
+        with atomic_write(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, default=str)
+
+        # Older array files go; the previous version stays for readers that loaded its manifest lazily
+        current = set(files.values()) | previous
+        prefix = f"{name}."
+        for filename in os.listdir(self.model_dir):
+            if filename.startswith(prefix) and filename.endswith(".npy") and filename not in current:
+                try:
+                    os.remove(os.path.join(self.model_dir, filename))
+                except OSError:
+                    pass
+        if os.path.exists(self._pickle_path(name)):
+            os.remove(self._pickle_path(name))  # Superseded legacy pickle
+
     def load_model(self, name: str):
-        """Loads a model object from a .pkl file."""
-        filepath = os.path.join(self.model_dir, f"{name}.pkl")
-        if not os.path.exists(filepath):
-            return None
-        try:
-            with open(filepath, 'rb') as f:
-                return pickle.load(f)
-        except Exception as e:
-            print(f"Error loading model {name}: {e}")
-            return None
+        """Loads a model (array manifest or legacy .pkl); unchanged files are served from the cache."""
+        for path, loader in ((self._manifest_path(name), self._read_manifest),
+                             (self._pickle_path(name), self._read_pickle)):
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            key = (self.model_dir, name)
+            try:
+                with ModelRegistry._cache_lock:
+                    cached = ModelRegistry._cache.get(key)
+                if cached is not None and cached[0] == mtime and cached[1] == path:
+                    payload = cached[2]
+                else:
+                    payload = loader(path)
+                    with ModelRegistry._cache_lock:
+                        ModelRegistry._cache[key] = (mtime, path, payload)
+                if path.endswith(".pkl"):
+                    return pickle.loads(payload)  # A fresh object per load from the cached bytes
+                manifest, arrays = payload
+                module_name, qualname = manifest['class'].split(':')
+                cls = getattr(importlib.import_module(module_name), qualname)
+                # A fresh object per load over the shared read-only arrays
+                return cls.from_arrays(arrays, manifest.get('meta', {}))
+            except Exception as e:
+                print(f"Error loading model {name}: {e}")
+                return None
+        return None
+
+    def _read_manifest(self, path: str) -> tuple:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        arrays = _LazyArrays({k: os.path.join(self.model_dir, v) for k, v in manifest['arrays'].items()})
+        return manifest, arrays
+
+    @staticmethod
+    def _read_pickle(path: str) -> bytes:
+        with open(path, 'rb') as f:
+            return f.read()
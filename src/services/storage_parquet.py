@@ -0,0 +1,305 @@
+# Professional Streamlit Opinion Intelligence Monitor - Parquet Storage Backend
+
+import os
+import json
+import uuid
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+import pandas as pd
+from src.config.constants import DATA_DIR, PARQUET_DIR, HISTORY_CHUNK_SIZE
+from src.services.storage import ReviewRepository, content_hash, until_bound, _clean_domain
+from src.services.doc_frequency import record_document_frequencies
+from src.services.signature_index import SignatureIndex
+from src.services.file_lock import file_lock
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency: only needed for STORAGE_BACKEND = "parquet"
+    pa = ds = pq = None
+
+def _schema():
+    # Fixed file schema so every partition file unifies; `domain` and `month` live in the path
+    return pa.schema([
+        ('user_id', pa.string()),
+        ('user', pa.string()),
+        ('text', pa.string()),
+        ('rating', pa.int64()),
+        ('product_id', pa.string()),
+        ('date', pa.string()),
+        ('keywords', pa.string()),  # As the scraper produces it ("a, b, c"), like the other backends
+        ('longitud', pa.int64()),
+        ('timestamp_scraping', pa.string()),
+        ('extra', pa.string()),  # Any other field, as JSON
+    ])
+
+def _partitioning(fields=('domain', 'month')):
+    return ds.partitioning(pa.schema([(f, pa.string()) for f in fields]), flavor='hive')
+
+def _month(date) -> str:
+    date = str(date or "")
+    return date[:7] if len(date) >= 7 and date[4] == '-' else "unknown"
+
+def _as_int(value) -> Optional[int]:
+    try:
+        if value is None or value != value:
+            return None
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _as_str(value) -> Optional[str]:
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return str(value)
+
+def _keywords_str(value) -> Optional[str]:
+    """Keywords as the scraper's comma-separated string (lists are joined the same way)."""
+    if isinstance(value, (list, tuple)) or hasattr(value, 'tolist'):
+        return ", ".join(str(k) for k in list(value))
+    return _as_str(value)
+
+class ParquetReviewRepository:
+    """
+    ReviewRepository backend on Parquet, partitioned as domain=<d>/month=<YYYY-MM>/.
+    Each save appends new part files (history is never rewritten); reads push the domain and
+    date window down to partition pruning and row-group statistics, and project only the
+    requested columns, so e.g. the global corpus reads nothing but `text`.
+    De-duplication uses the same persistent signature index as the JSONL backend, kept in
+    `_signatures/<domain>/` (underscore directories are ignored by dataset discovery).
+    Histories of the JSON backend are imported the first time a domain is used.
+    """
+
+    _imported: set = set()
+    _domain_locks: Dict[str, threading.Lock] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, root: str = PARQUET_DIR):
+        if pa is None:
+            raise ImportError("The parquet storage backend requires pyarrow (pip install pyarrow)")
+        if not os.path.exists(DATA_DIR):
+            os.makedirs(DATA_DIR)
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _domain_dir(self, domain: str) -> str:
+        return os.path.join(self.root, f"domain={domain}")
+
+    def _part_files(self, domain: str) -> List[str]:
+        files = []
+        for dirpath, _, filenames in os.walk(self._domain_dir(domain)):
+            files.extend(os.path.join(dirpath, f) for f in filenames if f.endswith('.parquet'))
+        return sorted(files)
+
+    # --- Reading ---
+
+    def _dataset(self, domain: Optional[str] = None):
+        """Dataset over every domain, or only over the partition directory of one domain."""
+        if domain is not None:
+            base = self._domain_dir(domain)
+            if not os.path.isdir(base):
+                return None
+            return ds.dataset(base, format='parquet', partitioning=_partitioning(('month',)))
+        if not any(name.startswith("domain=") for name in os.listdir(self.root)):
+            return None
+        return ds.dataset(self.root, format='parquet', partitioning=_partitioning())
+
+    def _scan(self, domain: Optional[str], columns: Optional[List[str]],
+              since: Optional[str], until: Optional[str]) -> tuple:
+        """(dataset, projected columns, filter expression) for a read; dataset is None when empty."""
+        dataset = self._dataset(domain)
+        if dataset is None:
+            return None, None, None
+
+        condition = None
+        def add(expr):
+            nonlocal condition
+            condition = expr if condition is None else condition & expr
+
+        if since:
+            add(ds.field('month') >= _month(since))
+            add(ds.field('date') >= since)
+        if until:
+            add(ds.field('month') <= _month(until))
+            add(ds.field('date') <= until_bound(until))
+
+        projected = None
+        if columns is not None:
+            names = dataset.schema.names
+            projected = [c for c in columns if c in names]
+            if 'extra' in names and any(c not in names and c != 'domain' for c in columns):
+                projected.append('extra')  # Requested fields that only live in the extra JSON
+        return dataset, projected, condition
+
+    def _to_frame(self, table, domain: Optional[str], columns: Optional[List[str]]) -> pd.DataFrame:
+        df = table.to_pandas()
+        if 'extra' in df.columns:
+            extras = df.pop('extra')
+            if extras.notna().any():
+                df = pd.concat([df, pd.DataFrame([json.loads(e) if e else {} for e in extras])], axis=1)
+        df = df.drop(columns=['month'], errors='ignore')
+        if domain is not None and (columns is None or 'domain' in columns):
+            df['domain'] = domain
+        return df.reindex(columns=columns) if columns is not None else df
+
+    def read(self, domain: Optional[str] = None, columns: Optional[List[str]] = None,
+             since: Optional[str] = None, until: Optional[str] = None,
+             limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Reviews as a DataFrame with projection (`columns`), pushdown of the domain and the
+        [since, until] date window (ISO strings, inclusive) and at most `limit` rows.
+        Month partitions outside the window are never opened.
+        """
+        domain = _clean_domain(domain) if domain is not None else None
+        dataset, projected, condition = self._scan(domain, columns, since, until)
+        if dataset is None:
+            return pd.DataFrame(columns=columns) if columns else pd.DataFrame()
+        if limit is not None:
+            table = dataset.head(int(limit), columns=projected, filter=condition)
+        else:
+            table = dataset.to_table(columns=projected, filter=condition)
+        return self._to_frame(table, domain, columns)
+
+    def load_history(self, domain: str, since: Optional[str] = None, until: Optional[str] = None,
+                     columns: Optional[List[str]] = None, limit: Optional[int] = None) -> pd.DataFrame:
+        """Loads a domain's history (optionally a date window, some columns, up to `limit` rows)."""
+        domain = _clean_domain(domain)
+        self._ensure_imported(domain)
+        return self.read(domain, columns, since, until, limit)
+
+    def iter_history(self, domain: str, since: Optional[str] = None, until: Optional[str] = None,
+                     columns: Optional[List[str]] = None, chunk_size: int = HISTORY_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+        """Same selection as `load_history`, scanned batch by batch and yielded as `chunk_size`-row DataFrames."""
+        domain = _clean_domain(domain)
+        self._ensure_imported(domain)
+        dataset, projected, condition = self._scan(domain, columns, since, until)
+        if dataset is None:
+            return
+        pending, pending_rows = [], 0
+        for batch in dataset.to_batches(columns=projected, filter=condition, batch_size=chunk_size):
+            if batch.num_rows == 0:
+                continue
+            pending.append(self._to_frame(pa.Table.from_batches([batch]), domain, columns))
+            pending_rows += batch.num_rows
+            while pending_rows >= chunk_size:
+                frame = pd.concat(pending, ignore_index=True)
+                yield frame.iloc[:chunk_size].reset_index(drop=True)
+                rest = frame.iloc[chunk_size:].reset_index(drop=True)
+                pending, pending_rows = ([rest] if len(rest) else []), len(rest)
+        if pending_rows:
+            yield pd.concat(pending, ignore_index=True)
+
+    @contextmanager
+    def _domain_lock(self, domain: str):
+        """Serializes a domain's writers across threads and processes (readers never take it)."""
+        with ParquetReviewRepository._lock:
+            thread_lock = ParquetReviewRepository._domain_locks.setdefault((self.root, domain), threading.Lock())
+        with thread_lock, file_lock(os.path.join(self.root, "_locks", f"{domain}.lock")):
+            yield
+
+    def _signature_index(self, domain: str) -> SignatureIndex:
+        """Persistent content-hash index of a domain, built from a (user, date, text) projection the first time."""
+        index = SignatureIndex.for_directory(os.path.join(self.root, "_signatures", domain))
+        if not index.exists() and self._part_files(domain):
+            df = self.read(domain, columns=['user', 'date', 'text'])
+            index.rebuild(df.to_dict('records'), content_hash)
+        return index
+
+    def get_high_water_mark(self, domain: str) -> Optional[Dict]:
+        """Same contract as `ReviewRepository.get_high_water_mark`."""
+        domain = _clean_domain(domain)
+        self._ensure_imported(domain)
+        with self._domain_lock(domain):
+            index = self._signature_index(domain)
+        if not len(index):
+            return None
+        return {'date': index.newest_date, 'signatures': index, 'count': len(index)}
+
+    def stored_domains(self) -> List[str]:
+        domains = {name[len("domain="):] for name in os.listdir(self.root) if name.startswith("domain=")}
+        return sorted(domains | set(ReviewRepository().stored_domains()))
+
+    def get_global_corpus(self) -> List[str]:
+        """Loads ALL text content from ALL domains, reading only the `text` column."""
+        for domain in self.stored_domains():
+            self._ensure_imported(domain)
+        df = self.read(columns=['text'])
+        if df.empty:
+            return []
+        return [t for t in df['text'] if t]
+
+    # --- Writing ---
+
+    def _write_partitions(self, domain: str, records: List[Dict]):
+        """Appends one new part file per month touched by `records`."""
+        names = _schema().names
+        by_month: Dict[str, List[Dict]] = {}
+        for record in records:
+            by_month.setdefault(_month(record.get('date')), []).append(record)
+
+        for month, rows in by_month.items():
+            columns = {name: [] for name in names}
+            for r in rows:
+                columns['user_id'].append(_as_str(r.get('user_id')))
+                columns['user'].append(_as_str(r.get('user')))
+                columns['text'].append(_as_str(r.get('text')))
+                columns['rating'].append(_as_int(r.get('rating')))
+                columns['product_id'].append(_as_str(r.get('product_id')))
+                columns['date'].append(_as_str(r.get('date')))
+                columns['keywords'].append(_keywords_str(r.get('keywords')))
+                columns['longitud'].append(_as_int(r.get('longitud')))
+                columns['timestamp_scraping'].append(_as_str(r.get('timestamp_scraping')))
+                extra = {k: v for k, v in r.items() if k not in names and k != 'domain'}
+                columns['extra'].append(json.dumps(extra, ensure_ascii=False, default=str) if extra else None)
+
+            partition_dir = os.path.join(self._domain_dir(domain), f"month={month}")
+            os.makedirs(partition_dir, exist_ok=True)
+            path = os.path.join(partition_dir, f"part-{datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}.parquet")
+            # Dot-prefixed files are ignored by dataset discovery until the rename publishes them
+            tmp_path = os.path.join(partition_dir, "." + os.path.basename(path) + ".tmp")
+            pq.write_table(pa.table(columns, schema=_schema()), tmp_path, compression='zstd')
+            os.replace(tmp_path, path)
+
+    def _ensure_imported(self, domain: str):
+        """Copies the JSON backend history of a domain into Parquet once (when it has no files yet)."""
+        with ParquetReviewRepository._lock:
+            key = (self.root, domain)
+            if key in ParquetReviewRepository._imported:
+                return
+            ParquetReviewRepository._imported.add(key)
+        if self._part_files(domain) or domain not in ReviewRepository().stored_domains():
+            return
+        records = list(ReviewRepository()._get_store(domain).iter_records(include_cold=True))
+        if records:
+            self._write_partitions(domain, records)
+
+    def save_reviews(self, domain: str, df_new: pd.DataFrame) -> int:
+        """Appends the reviews not stored yet as new part files; returns how many were added."""
+        if df_new.empty:
+            return 0
+        domain = _clean_domain(domain)
+        self._ensure_imported(domain)
+        now = datetime.now().isoformat()
+        with self._domain_lock(domain):
+            index = self._signature_index(domain)
+            records = df_new.to_dict('records')
+            hashes = [content_hash(r) for r in records]
+            new_records, new_hashes, batch_seen = [], [], set()
+            for record, digest, known in zip(records, hashes, index.contains_batch(hashes)):
+                if known or digest in batch_seen:
+                    continue
+                record.setdefault('timestamp_scraping', now)
+                new_records.append(record)
+                new_hashes.append(digest)
+                batch_seen.add(digest)
+            # Part files first: a crash in between can only leave a duplicate, never a lost review
+            if new_records:
+                self._write_partitions(domain, new_records)
+                newest = max((str(r.get('date')) for r in new_records if r.get('date')), default=None)
+                index.add(new_hashes, newest_date=newest)
+        if new_records:
+            record_document_frequencies(new_records)
+        return len(new_records)
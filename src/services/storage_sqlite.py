@@ -0,0 +1,231 @@
+# Professional Streamlit Opinion Intelligence Monitor - SQLite Storage Backend
+
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+import pandas as pd
+from src.config.constants import DATA_DIR, SQLITE_PATH, HISTORY_CHUNK_SIZE
+from src.services.storage import ReviewRepository, content_hash, until_bound, _clean_domain
+from src.services.doc_frequency import record_document_frequencies
+
+# Review fields stored as real columns; anything else travels in the `extra` JSON column
+_COLUMNS = ('user_id', 'user', 'text', 'rating', 'product_id', 'date', 'timestamp_scraping')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    domain TEXT NOT NULL,
+    signature BLOB NOT NULL,  -- content_hash() digest
+    user_id TEXT,
+    user TEXT,
+    text TEXT,
+    rating INTEGER,
+    product_id TEXT,
+    date TEXT,
+    timestamp_scraping TEXT,
+    extra TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_reviews_signature ON reviews(domain, signature);
+CREATE INDEX IF NOT EXISTS idx_reviews_domain_date ON reviews(domain, date);
+CREATE INDEX IF NOT EXISTS idx_reviews_user_id ON reviews(user_id);
+"""
+
+def _plain(value):
+    """NumPy scalars as Python values and NaN as None."""
+    if hasattr(value, 'item') and not isinstance(value, (list, dict)):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+def _to_db_value(value):
+    """Plain SQLite value for a review column (lists/dicts as JSON, NaN as NULL)."""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return _plain(value)
+
+class _StoredSignatures:
+    """Membership view of a domain's stored content hashes, answered by indexed EXISTS queries."""
+
+    def __init__(self, repository: "SQLiteReviewRepository", domain: str, count: int):
+        self.repository = repository
+        self.domain = domain
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, digest: bytes) -> bool:
+        # Unique index on (domain, signature); the connection is per thread, so any thread may ask
+        return self.repository._connect().execute(
+            "SELECT EXISTS(SELECT 1 FROM reviews WHERE domain = ? AND signature = ?)", (self.domain, digest)
+        ).fetchone()[0] == 1
+
+class SQLiteReviewRepository:
+    """
+    ReviewRepository backend on SQLite (stdlib): one `reviews` table with a unique index on
+    (domain, signature), so de-duplication is an `INSERT OR IGNORE` instead of an in-memory
+    signature set, and history/corpus reads are indexed queries.
+    Histories of the JSON backend are imported the first time a domain is used.
+    """
+
+    _local = threading.local()
+    _imported: set = set()
+    _import_lock = threading.Lock()
+
+    def __init__(self, db_path: str = SQLITE_PATH):
+        if not os.path.exists(DATA_DIR):
+            os.makedirs(DATA_DIR)
+        self.db_path = db_path
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread and database (sqlite3 connections must not cross threads)."""
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get(self.db_path)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")  # Readers never wait for the writer
+            conn.execute("PRAGMA synchronous=NORMAL")
+            connections[self.db_path] = conn
+        return conn
+
+    def _row_values(self, domain: str, record: Dict) -> tuple:
+        extra = {k: v for k, v in record.items() if k not in _COLUMNS}
+        return (domain, content_hash(record),
+                *(_to_db_value(record.get(col)) for col in _COLUMNS),
+                json.dumps({k: _plain(v) for k, v in extra.items()}, ensure_ascii=False, default=str))
+
+    def _insert(self, domain: str, records: List[Dict]) -> List[Dict]:
+        """Inserts a batch in one transaction; returns the records actually stored.
+
+        Each INSERT OR IGNORE reports its own row count, so a row already stored
+        (or stored by a concurrent writer in between) is never claimed twice.
+        """
+        conn = self._connect()
+        sql = (f"INSERT OR IGNORE INTO reviews (domain, signature, {', '.join(_COLUMNS)}, extra) "
+               f"VALUES ({', '.join('?' * (len(_COLUMNS) + 3))})")
+        inserted = []
+        with conn:
+            for record in records:
+                if conn.execute(sql, self._row_values(domain, record)).rowcount == 1:
+                    inserted.append(record)
+        return inserted
+
+    def _ensure_imported(self, domain: str):
+        """Copies the JSON backend history of a domain into SQLite once (when it has no rows yet)."""
+        with SQLiteReviewRepository._import_lock:
+            key = (self.db_path, domain)
+            if key in SQLiteReviewRepository._imported:
+                return
+            SQLiteReviewRepository._imported.add(key)
+            exists = self._connect().execute(
+                "SELECT 1 FROM reviews WHERE domain = ? LIMIT 1", (domain,)
+            ).fetchone()
+            if exists or domain not in ReviewRepository().stored_domains():
+                return
+            records = list(ReviewRepository()._get_store(domain).iter_records(include_cold=True))
+            if records:
+                self._insert(domain, records)
+
+    def save_reviews(self, domain: str, df_new: pd.DataFrame) -> int:
+        """Inserts the new reviews; returns how many were not stored yet."""
+        if df_new.empty:
+            return 0
+        domain = _clean_domain(domain)
+        self._ensure_imported(domain)
+        now = datetime.now().isoformat()
+        records = []
+        for record in df_new.to_dict('records'):
+            if 'timestamp_scraping' not in record:
+                record['timestamp_scraping'] = now
+            records.append(record)
+        new_records = self._insert(domain, records)
+        if new_records:
+            record_document_frequencies(new_records)
+        return len(new_records)
+
+    def _rows_to_dataframe(self, cursor: sqlite3.Cursor) -> pd.DataFrame:
+        return pd.DataFrame(list(self._row_records(cursor, _COLUMNS, True, None)))
+
+    @staticmethod
+    def _row_records(rows: Iterable[tuple], selected: tuple, with_extra: bool,
+                     columns: Optional[List[str]]) -> Iterator[Dict]:
+        for row in rows:
+            record = {col: row[i] for i, col in enumerate(selected)}
+            if with_extra and row[-1]:
+                record.update(json.loads(row[-1]))
+            yield {c: record.get(c) for c in columns} if columns is not None else record
+
+    def _history_query(self, domain: str, since: Optional[str], until: Optional[str],
+                       columns: Optional[List[str]], limit: Optional[int]) -> tuple:
+        """(cursor, selected columns, reads extra) with the window, projection and limit done in SQL."""
+        domain = _clean_domain(domain)
+        self._ensure_imported(domain)
+        if columns is None:
+            selected, with_extra = _COLUMNS, True
+        else:
+            selected = tuple(c for c in _COLUMNS if c in columns)
+            with_extra = any(c not in _COLUMNS for c in columns)  # Fields kept in the extra JSON
+        where, params = ["domain = ?"], [domain]
+        if since:
+            where.append("date >= ?")
+            params.append(since)
+        if until:
+            where.append("date <= ?")
+            params.append(until_bound(until))
+        sql = (f"SELECT {', '.join(selected + (('extra',) if with_extra else ())) or 'id'} FROM reviews "
+               f"WHERE {' AND '.join(where)} ORDER BY id")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return self._connect().execute(sql, params), selected, with_extra
+
+    def load_history(self, domain: str, since: Optional[str] = None, until: Optional[str] = None,
+                     columns: Optional[List[str]] = None, limit: Optional[int] = None) -> pd.DataFrame:
+        """Loads a domain's reviews in the [since, until] window (index on domain, date), only `columns`, up to `limit`."""
+        cursor, selected, with_extra = self._history_query(domain, since, until, columns, limit)
+        return pd.DataFrame(list(self._row_records(cursor, selected, with_extra, columns)), columns=columns)
+
+    def iter_history(self, domain: str, since: Optional[str] = None, until: Optional[str] = None,
+                     columns: Optional[List[str]] = None, chunk_size: int = HISTORY_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+        """Same selection as `load_history`, fetched and yielded `chunk_size` rows at a time."""
+        cursor, selected, with_extra = self._history_query(domain, since, until, columns, None)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield pd.DataFrame(list(self._row_records(rows, selected, with_extra, columns)), columns=columns)
+
+    def get_high_water_mark(self, domain: str) -> Optional[Dict]:
+        """Same contract as `ReviewRepository.get_high_water_mark`; signatures are looked up on the index."""
+        domain = _clean_domain(domain)
+        self._ensure_imported(domain)
+        count, newest = self._connect().execute(
+            "SELECT COUNT(*), MAX(date) FROM reviews WHERE domain = ?", (domain,)
+        ).fetchone()
+        if not count:
+            return None
+        return {'date': newest or "", 'signatures': _StoredSignatures(self, domain, count), 'count': count}
+
+    def stored_domains(self) -> List[str]:
+        domains = {d for (d,) in self._connect().execute("SELECT DISTINCT domain FROM reviews")}
+        return sorted(domains | set(ReviewRepository().stored_domains()))
+
+    def get_global_corpus(self) -> List[str]:
+        """Loads ALL text content from ALL domains for global training."""
+        for domain in self.stored_domains():
+            self._ensure_imported(domain)
+        return [t for (t,) in self._connect().execute("SELECT text FROM reviews WHERE text IS NOT NULL AND text != ''")]
+
+    def get_user_reviews(self, user_id: str) -> pd.DataFrame:
+        """Every stored review of one reviewer across domains (index on user_id)."""
+        cursor = self._connect().execute(
+            f"SELECT {', '.join(_COLUMNS)}, extra FROM reviews WHERE user_id = ? ORDER BY id", (user_id,)
+        )
+        return self._rows_to_dataframe(cursor)
@@ -0,0 +1,132 @@
+# Professional Streamlit Opinion Intelligence Monitor - Throttling Service
+
+import time
+import random
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from src.config.constants import (
+    SCRAPE_RATE_INITIAL, SCRAPE_RATE_MIN, SCRAPE_RATE_MAX,
+    SCRAPE_RATE_INCREASE, SCRAPE_RATE_DECREASE, SCRAPE_BACKOFF_BASE, SCRAPE_BACKOFF_MAX
+)
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts of up to `capacity` requests."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._history = deque(maxlen=256)  # Grant timestamps for the effective rate
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Blocks until a token is available (and any server-imposed pause is over)."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    self._history.append(now)
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate if self.rate > 0 else 1.0)
+            time.sleep(min(max(wait, 0.01), 5.0))
+
+    def pause(self, seconds: float):
+        """Stops granting tokens for `seconds` (e.g. honoring Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+    @property
+    def effective_rate(self) -> float:
+        """Requests per second actually granted over the recent window."""
+        with self._lock:
+            if len(self._history) < 2:
+                return 0.0
+            span = self._history[-1] - self._history[0]
+            return (len(self._history) - 1) / span if span > 0 else 0.0
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+    Token bucket with AIMD rate control: the rate grows additively while responses are
+    healthy and is cut multiplicatively when the server signals throttling (429/503).
+    """
+
+    _registry: Dict[str, "AdaptiveTokenBucket"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, rate: float = SCRAPE_RATE_INITIAL, min_rate: float = SCRAPE_RATE_MIN,
+                 max_rate: float = SCRAPE_RATE_MAX, increase: float = SCRAPE_RATE_INCREASE,
+                 decrease: float = SCRAPE_RATE_DECREASE):
+        super().__init__(rate)
+        self.settings = {'rate': rate, 'min_rate': min_rate, 'max_rate': max_rate,
+                         'increase': increase, 'decrease': decrease}
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.peak_rate = rate
+        self.throttled_count = 0
+
+    @classmethod
+    def for_host(cls, host: str, **kwargs) -> "AdaptiveTokenBucket":
+        """
+        Returns the process-wide bucket of a host so every scraper shares its budget and learned rate.
+        The first caller configures it; a later call asking for different settings gets a warning
+        and the existing bucket, since one host must keep a single budget.
+        """
+        with cls._registry_lock:
+            bucket = cls._registry.get(host)
+            if bucket is None:
+                bucket = cls._registry[host] = cls(**kwargs)
+            else:
+                requested = cls(**kwargs).settings
+                if requested != bucket.settings:
+                    print(f"⚠️ Throttle for {host} already configured with {bucket.settings}; "
+                          f"ignoring {requested}")
+            return bucket
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+            self.peak_rate = max(self.peak_rate, self.rate)
+
+    def on_throttled(self, pause_seconds: float):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.throttled_count += 1
+        self.pause(pause_seconds)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After in seconds from either delta-seconds or an HTTP-date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None,
+                  base: float = SCRAPE_BACKOFF_BASE, cap: float = SCRAPE_BACKOFF_MAX) -> float:
+    """Jittered exponential backoff; a server-provided Retry-After is always honored as the floor."""
+    ceiling = min(cap, base * (2 ** attempt))
+    delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+    if retry_after is not None:
+        delay = max(retry_after, delay)
+    return delay
@@ -1,7 +1,7 @@
 import streamlit as st
 import io
 import pandas as pd
-from src.config.constants import SIDEBAR_HEADER, ANALYZE_BUTTON, DEFAULT_DOMAIN, DEFAULT_COMPARE_DOMAIN, SCRAPE_MAX_REVIEWS
+from src.config.constants import SIDEBAR_HEADER, ANALYZE_BUTTON, DEFAULT_DOMAIN, DEFAULT_COMPARE_DOMAIN, SCRAPE_MAX_REVIEWS, PIPELINE_STREAMING
 from src.services.exporter import ReportExporter
 
 def render_sidebar():
@@ -43,6 +43,13 @@ def render_sidebar():
             - **500 reseñas**: Límite máximo para garantizar la velocidad de análisis y evitar bloqueos por seguridad/privacidad de la plataforma.
             """
         )
+
+        stream_mode = st.checkbox(
+            "⚡ Análisis en streaming",
+            value=st.session_state.get('stream_mode', PIPELINE_STREAMING),
+            help="Analiza cada página en cuanto se descarga y muestra el avance durante el scraping."
+        )
+        st.session_state.stream_mode = stream_mode
         
         # Status detection
         has_data = not st.session_state.df.empty if 'df' in st.session_state else False
@@ -57,7 +64,7 @@ def render_sidebar():
                 keys_to_clear = [
                     'data_ready', 'df', 'df_comp', 'export_data', 'export_type', 
                     'analyzed_domain', 'compare_domain_name', 'figures',
-                    'compare_mode', 'compare_domain'
+                    'compare_mode', 'compare_domain', 'scrape_metrics', 'stream_mode'
                 ]
                 for key in keys_to_clear:
                     if key in st.session_state:
@@ -70,6 +77,25 @@ def render_sidebar():
                             del st.session_state[key]
                 st.rerun()
         
+        # Scraping diagnostics of the last run (network vs throttling vs parsing)
+        scrape_metrics = st.session_state.get('scrape_metrics')
+        if scrape_metrics:
+            with st.expander("⏱️ Métricas del último scraping"):
+                for metrics_domain, summary in scrape_metrics.items():
+                    st.markdown(f"**{metrics_domain}**")
+                    st.caption(
+                        f"{summary['pages']} páginas ({summary['pages_failed']} fallidas) · "
+                        f"{summary['requests']} peticiones · {summary['bytes'] / 1024:.0f} KiB"
+                    )
+                    st.caption(
+                        f"🌐 Red {summary['network_time']:.2f}s (p95 {summary['latency_p95'] * 1000:.0f} ms) · "
+                        f"🚦 Espera {summary['throttle_wait']:.2f}s · 🧩 Parseo {summary['parse_time']:.2f}s"
+                    )
+                    st.caption(
+                        f"{summary['reviews_extracted']}/{summary['cards_found']} tarjetas → reseñas · "
+                        f"selectores: {', '.join(summary['selectors']) or '—'}"
+                    )
+
         st.markdown("---")
         
         # Export Suite
@@ -156,4 +182,4 @@ def render_sidebar():
         st.caption(f"© {current_year} Business Intelligence v.{APP_VERSION}")
         st.caption("📢 **Nota:** Herramienta desarrollada con fines educativos universitarios.")
         
-    return domain_input, max_reviews, analyze_clicked, compare_mode, compare_domain
+    return domain_input, max_reviews, analyze_clicked, compare_mode, compare_domain, stream_mode